@@ -0,0 +1,204 @@
+"""Move sequences compiled to a single sticker permutation.
+
+Replaying an algorithm with `Cube.rotate_layer` makes a new `Cube` for every move.
+`compile_algorithm` composes the layer permutations of a sequence once, and caches
+the result by sequence, so applying it to a cube is a single gather however long the
+sequence is.
+
+The permutations also give the group structure of the algorithms without touching a
+cube: `Algorithm` supports composition with `*`, `inverse` and powers with `**`, and
+its `order` is found from the cycle decomposition of its permutation. The functions
+on bare permutations are `invert`, `power`, `cycles` and `order`.
+
+"""
+
+from __future__ import annotations
+
+from functools import lru_cache, reduce
+from math import lcm
+from operator import itemgetter
+from typing import Callable, Iterable, List, Tuple, Union
+
+import attr
+
+from py_rubiks.cube import (
+    LAYER_PERMUTATIONS,
+    STICKER_COUNT,
+    Cube,
+    Move,
+    Permutation,
+    Stickers,
+    compose,
+)
+from py_rubiks.notation import parse_moves
+
+
+IDENTITY: Permutation = tuple(range(STICKER_COUNT))
+
+# The number of compiled sequences kept by `compile_algorithm`
+_CACHE_SIZE = 4096
+
+
+def invert(permutation: Permutation) -> Permutation:
+    """Return the permutation that undoes `permutation`."""
+    inverse = [0] * len(permutation)
+    for idx, source in enumerate(permutation):
+        inverse[source] = idx
+    return tuple(inverse)
+
+
+def power(permutation: Permutation, exponent: int) -> Permutation:
+    """Return `permutation` applied `exponent` times, by repeated squaring.
+
+    A negative `exponent` applies the inverse.
+
+    """
+    if exponent < 0:
+        permutation, exponent = invert(permutation), -exponent
+    result = tuple(range(len(permutation)))
+    while exponent:
+        if exponent & 1:
+            result = compose(result, permutation)
+        permutation = compose(permutation, permutation)
+        exponent >>= 1
+    return result
+
+
+def cycles(permutation: Permutation) -> List[Tuple[int, ...]]:
+    """Return the cycles of `permutation` that are longer than one.
+
+    Each cycle lists indices in the order that their contents move. The sticker at
+    `cycle[0]` moves to `cycle[1]` and so on, with the last one moving to
+    `cycle[0]`. The cycles are ordered by their smallest index, which comes first.
+
+    """
+    # `new[idx] == old[permutation[idx]]`, so the sticker at `idx` moves to
+    # `inverse[idx]`
+    inverse = invert(permutation)
+    seen = [False] * len(permutation)
+    found = []
+    for start in range(len(permutation)):
+        if seen[start] or permutation[start] == start:
+            continue
+        cycle = []
+        idx = start
+        while not seen[idx]:
+            seen[idx] = True
+            cycle.append(idx)
+            idx = inverse[idx]
+        found.append(tuple(cycle))
+    return found
+
+
+def order(permutation: Permutation) -> int:
+    """Return the number of times `permutation` must be applied to get back."""
+    return reduce(lcm, map(len, cycles(permutation)), 1)
+
+
+@attr.s(auto_attribs=True, frozen=True, slots=True)
+class Algorithm:
+    """A sequence of moves along with the sticker permutation that it applies.
+
+    Attributes:
+        moves: The moves in the order that they are applied.
+        permutation: The permutation of the whole sequence, for each sticker index
+            the index that it takes its sticker from, as for `LAYER_PERMUTATIONS`.
+
+    """
+
+    moves: Tuple[Move, ...]
+    permutation: Permutation
+    _apply: Callable[[Stickers], Stickers] = attr.ib(
+        init=False, eq=False, repr=False
+    )
+
+    def __attrs_post_init__(self) -> None:
+        object.__setattr__(self, "_apply", itemgetter(*self.permutation))
+
+    @classmethod
+    def from_moves(cls, moves: Iterable[Move]) -> Algorithm:
+        moves = tuple(moves)
+        permutation = reduce(
+            compose,
+            (LAYER_PERMUTATIONS[(move.face_ref, move.steps)] for move in moves),
+            IDENTITY,
+        )
+        return cls(moves, permutation)
+
+    @property
+    def is_identity(self) -> bool:
+        """Return `True` if the moves leave every cube unchanged."""
+        return self.permutation == IDENTITY
+
+    @property
+    def order(self) -> int:
+        """Return the number of times the moves must be repeated to get back."""
+        return order(self.permutation)
+
+    def cycles(self) -> List[Tuple[int, ...]]:
+        """Return the sticker cycles of the moves, as for `cycles`."""
+        return cycles(self.permutation)
+
+    def inverse(self) -> Algorithm:
+        """Return the algorithm that undoes this one."""
+        return Algorithm(
+            tuple(move.reverse() for move in reversed(self.moves)),
+            invert(self.permutation),
+        )
+
+    def __mul__(self, other: Algorithm) -> Algorithm:
+        """Return the algorithm that applies `self` and then `other`."""
+        if not isinstance(other, Algorithm):
+            return NotImplemented
+        return Algorithm(
+            self.moves + other.moves, compose(self.permutation, other.permutation)
+        )
+
+    def __pow__(self, exponent: int) -> Algorithm:
+        """Return the algorithm repeated `exponent` times, the inverse if negative.
+
+        The exponent is first reduced modulo `order`, as repeating the moves that
+        many times is the identity, so the result has fewer than `order` repeats of
+        the moves whatever the exponent.
+
+        """
+        if exponent < 0:
+            return self.inverse() ** -exponent
+        exponent %= self.order
+        return Algorithm(self.moves * exponent, power(self.permutation, exponent))
+
+    def apply(self, cube: Cube) -> Cube:
+        """Return `cube` after the moves, keeping its other attributes."""
+        return Cube.from_stickers(
+            self._apply(cube.stickers), cube.universal_front_face, cube.from_move
+        )
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def _compile_moves(moves: Tuple[Move, ...]) -> Algorithm:
+    return Algorithm.from_moves(moves)
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def _compile_text(text: str) -> Algorithm:
+    return _compile_moves(tuple(parse_moves(text)))
+
+
+def compile_algorithm(moves: Union[str, Iterable[Move]]) -> Algorithm:
+    """Return the `Algorithm` for a move sequence, cached by sequence.
+
+    Args:
+        moves: The moves, or a sequence in standard notation.
+
+    Raises:
+        ValueError: If `moves` is not valid notation.
+
+    """
+    if isinstance(moves, str):
+        return _compile_text(moves)
+    return _compile_moves(tuple(moves))
+
+
+def apply_algorithm(cube: Cube, moves: Union[str, Iterable[Move]]) -> Cube:
+    """Return `cube` after a sequence of moves, applied as one permutation."""
+    return compile_algorithm(moves).apply(cube)
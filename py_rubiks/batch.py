@@ -0,0 +1,235 @@
+"""Batch solving of streamed scrambles.
+
+Scrambles are read one per line, either as a move sequence in standard notation
+(`R U R' U2`) or as a standard 54 character facelet string, see
+`Cube.from_facelets`. A line can also be a JSON object with the scramble under
+`"scramble"` and an optional `"id"` that is copied to the result.
+
+The scrambles are solved with the two-phase solver on a pool of worker processes
+that each load the move and pruning tables once, and the results are yielded in
+input order. Only a bounded window of scrambles is in flight, so the input is
+streamed rather than read up front.
+
+Run `python -m py_rubiks.batch scrambles.txt` to write one JSON result per line to
+stdout, see `--help` for the options.
+
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+from contextlib import nullcontext
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional
+
+import attr
+
+from py_rubiks.algorithm import Algorithm
+from py_rubiks.cube import FACE_ORDER, STICKER_COUNT, Cube, Move
+from py_rubiks.notation import format_moves, parse_moves
+from py_rubiks.solver import solve
+from py_rubiks.tables import get_move_tables, get_pruning_tables
+
+
+# Colour each face by its name when building a cube from a move sequence
+_SOLVED_CUBE = Cube.from_stickers(
+    tuple(face_ref.name for face_ref in FACE_ORDER for _ in range(9))
+)
+
+# Scrambles in flight per worker, enough to keep the workers busy while the oldest
+# result is waited on
+_WINDOW_PER_WORKER = 16
+
+
+@attr.s(auto_attribs=True, frozen=True, slots=True)
+class Scramble:
+    """A scramble to solve, its position in the input and its optional id.
+
+    Attributes:
+        error: Why the input record is invalid, reported instead of solving it.
+
+    """
+
+    index: int
+    text: str
+    id: Any = None
+    error: Optional[str] = None
+
+
+@attr.s(auto_attribs=True, frozen=True, slots=True)
+class BatchResult:
+    """The outcome of solving one `Scramble`.
+
+    Attributes:
+        moves: The solution, `None` if the scramble could not be parsed or solved.
+        elapsed: The time taken to parse and solve the scramble, in seconds.
+        error: Why there is no solution.
+
+    """
+
+    scramble: Scramble
+    moves: Optional[List[Move]]
+    elapsed: float
+    error: Optional[str] = None
+
+    def to_json(self) -> Dict[str, Any]:
+        result: Dict[str, Any] = {"index": self.scramble.index}
+        if self.scramble.id is not None:
+            result["id"] = self.scramble.id
+        if self.moves is not None:
+            result["solution"] = format_moves(self.moves)
+            result["length"] = len(self.moves)
+        else:
+            result["error"] = self.error
+        result["elapsed"] = round(self.elapsed, 6)
+        return result
+
+
+def parse_scramble(text: str) -> Cube:
+    """Return the cube described by a move sequence or a facelet string.
+
+    Raises:
+        ValueError: If `text` is neither.
+
+    """
+    text = text.strip()
+    if len(text) == STICKER_COUNT and not any(char.isspace() for char in text):
+        return Cube.from_facelets(text)
+    # Scrambles are rarely repeated, so they are compiled without the cache
+    return Algorithm.from_moves(parse_moves(text)).apply(_SOLVED_CUBE)
+
+
+def read_scrambles(lines: Iterable[str]) -> Iterator[Scramble]:
+    """Yield a `Scramble` for each non-blank line, numbered from 0.
+
+    A line that fails to parse as JSON is yielded as is, so the error is reported
+    against that scramble. A JSON record whose scramble is not a string is yielded
+    with an error.
+
+    """
+    index = 0
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        scramble = Scramble(index, line)
+        if line.startswith("{"):
+            try:
+                record = json.loads(line)
+                text = record["scramble"]
+            except (ValueError, KeyError, TypeError):
+                pass
+            else:
+                if isinstance(text, str):
+                    scramble = Scramble(index, text, record.get("id"))
+                else:
+                    error = "scramble must be a string"
+                    scramble = Scramble(index, line, record.get("id"), error)
+        yield scramble
+        index += 1
+
+
+def solve_scramble(
+    scramble: Scramble,
+    max_length: int = 22,
+    timeout: float = 1.0,
+    cache_dir: Optional[Path] = None,
+) -> BatchResult:
+    """Parse and solve a single scramble, reporting any error in the result."""
+    start_time = time.monotonic()
+    if scramble.error is not None:
+        return BatchResult(scramble, None, 0.0, scramble.error)
+    try:
+        moves = solve(parse_scramble(scramble.text), max_length, timeout, cache_dir)
+    except Exception as err:
+        error = str(err) or type(err).__name__
+        return BatchResult(scramble, None, time.monotonic() - start_time, error)
+    return BatchResult(scramble, moves, time.monotonic() - start_time)
+
+
+def load_tables(cache_dir: Optional[Path] = None) -> None:
+    """Load the two-phase solver's tables, to be used as a worker initializer."""
+    get_move_tables(cache_dir)
+    get_pruning_tables(cache_dir)
+
+
+def solve_batch(
+    scrambles: Iterable[Scramble],
+    workers: Optional[int] = None,
+    max_length: int = 22,
+    timeout: float = 1.0,
+    cache_dir: Optional[Path] = None,
+) -> Iterator[BatchResult]:
+    """Solve scrambles on a process pool, yielding the results in input order.
+
+    Args:
+        scrambles: The scrambles to solve, consumed as results are yielded.
+        workers: The number of worker processes, defaults to the number of CPUs. With
+            a single worker the scrambles are solved in the current process.
+        max_length, timeout, cache_dir: As for `solver.solve`, per scramble.
+
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        load_tables(cache_dir)
+        for scramble in scrambles:
+            yield solve_scramble(scramble, max_length, timeout, cache_dir)
+        return
+
+    with ProcessPoolExecutor(
+        workers, initializer=load_tables, initargs=(cache_dir,)
+    ) as executor:
+        window = _WINDOW_PER_WORKER * workers
+        pending: Deque[Future[BatchResult]] = deque()
+        for scramble in scrambles:
+            pending.append(
+                executor.submit(
+                    solve_scramble, scramble, max_length, timeout, cache_dir
+                )
+            )
+            if len(pending) >= window:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "input",
+        nargs="?",
+        default="-",
+        help="The file of scrambles, one per line, defaults to stdin",
+    )
+    parser.add_argument(
+        "--workers", type=int, help="The number of processes, defaults to the CPUs"
+    )
+    parser.add_argument(
+        "--max-length",
+        type=int,
+        default=22,
+        help="Stop searching once a solution this short is found",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=1.0,
+        help="Seconds to spend looking for a shorter solution per scramble",
+    )
+    args = parser.parse_args(argv)
+
+    with nullcontext(sys.stdin) if args.input == "-" else open(args.input) as lines:
+        for result in solve_batch(
+            read_scrambles(lines), args.workers, args.max_length, args.timeout
+        ):
+            print(json.dumps(result.to_json()), flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""Bidirectional (meet-in-the-middle) search.
+
+Breadth-first frontiers are grown from both the start and the goal, always expanding
+the smaller one by a full level, until a state reached from one side has already been
+reached from the other. Reaching depth `d` this way visits about `2 * b ** (d / 2)`
+states instead of the `b ** d` of a search from one side, which makes short queries
+such as partial scrambles fast without any tables.
+
+The frontiers hold the stickers as face codes, one byte each, but the visited states
+are keyed on their compact `visited.state_key`, a single integer below 2 ** 67. Each
+side keeps the move that first reached every key so the path can be rebuilt once the
+frontiers meet.
+The moves found from the goal side lead away from the goal, so they are reversed and
+undone in reverse order to make the second half of the path.
+
+"""
+
+from __future__ import annotations
+
+import math
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from py_rubiks.cube import MOVE_GETTERS, MOVES, Cube, Move
+from py_rubiks.ida import Iteration, SearchResult, SearchTimeout
+from py_rubiks.symmetry import face_codes
+from py_rubiks.visited import codes_key
+
+
+# Maps each visited key to the key it was reached from and the index of the move
+_Parents = Dict[int, Tuple[Optional[int], int]]
+
+
+def _solved_like(cube: Cube) -> Cube:
+    """Return the solved cube with the same centres as `cube`."""
+    centres = [cube.stickers[offset + 4] for offset in range(0, 54, 9)]
+    return Cube.from_stickers(tuple(centre for centre in centres for _ in range(9)))
+
+
+def _path_to(key: int, parents: _Parents) -> List[Move]:
+    """Return the moves from the root of `parents` to `key`."""
+    moves = []
+    parent, move_idx = parents[key]
+    while parent is not None:
+        moves.append(MOVES[move_idx])
+        parent, move_idx = parents[parent]
+    moves.reverse()
+    return moves
+
+
+def bidirectional_search(
+    start: Cube,
+    goal: Optional[Cube] = None,
+    max_depth: int = 8,
+    on_iteration: Optional[Callable[[Iteration], None]] = None,
+    timeout: Optional[float] = None,
+) -> SearchResult:
+    """Return a shortest sequence of moves from `start` to `goal`.
+
+    Args:
+        start: The state to search from.
+        goal: The state to reach, defaults to the solved cube with the same centres as
+            `start`.
+        max_depth: Give up once both frontiers together reach this depth. The
+            frontiers grow about 13 times with each level, the default gives up after
+            a few seconds and about 100000 states.
+        on_iteration: Called with the stats of each level as it is expanded, the
+            bound is the combined depth of both frontiers.
+        timeout: Give up after this many seconds.
+
+    Raises:
+        ValueError: If `start` and `goal` have different centres, no sequence of moves
+            can join them, or either is not a valid set of pieces.
+        RuntimeError: If there is no solution within `max_depth` moves.
+        SearchTimeout: If there is no solution within `timeout` seconds.
+
+    """
+    if goal is None:
+        goal = _solved_like(start)
+    for offset in range(4, 54, 9):
+        if start.stickers[offset] != goal.stickers[offset]:
+            raise ValueError("The start and goal cubes have different centres")
+
+    start_codes = face_codes(start)
+    goal_codes = face_codes(goal)
+    start_key = codes_key(start_codes)
+    goal_key = codes_key(goal_codes)
+    if start_key == goal_key:
+        return SearchResult([], [])
+
+    deadline = time.monotonic() + timeout if timeout is not None else math.inf
+    forward: _Parents = {start_key: (None, 0)}
+    backward: _Parents = {goal_key: (None, 0)}
+    forward_frontier = [(start_key, start_codes)]
+    backward_frontier = [(goal_key, goal_codes)]
+    forward_depth = backward_depth = 0
+    iterations: List[Iteration] = []
+
+    while forward_depth + backward_depth < max_depth:
+        start_time = time.monotonic()
+        expand_forward = len(forward_frontier) <= len(backward_frontier)
+        if expand_forward:
+            parents, others, frontier = forward, backward, forward_frontier
+        else:
+            parents, others, frontier = backward, forward, backward_frontier
+
+        next_frontier = []
+        meetings = []
+        nodes = 0
+        for count, (key, codes) in enumerate(frontier):
+            if count & 0x3FF == 0 and time.monotonic() > deadline:
+                iterations.append(
+                    Iteration(
+                        forward_depth + backward_depth + 1,
+                        nodes,
+                        time.monotonic() - start_time,
+                    )
+                )
+                raise SearchTimeout(iterations)
+            for move_idx, getter in enumerate(MOVE_GETTERS):
+                successor_codes = bytes(getter(codes))
+                successor = codes_key(successor_codes)
+                nodes += 1
+                if successor in parents:
+                    continue
+                parents[successor] = (key, move_idx)
+                next_frontier.append((successor, successor_codes))
+                if successor in others:
+                    meetings.append(successor)
+
+        if expand_forward:
+            forward_frontier = next_frontier
+            forward_depth += 1
+        else:
+            backward_frontier = next_frontier
+            backward_depth += 1
+        iteration = Iteration(
+            forward_depth + backward_depth, nodes, time.monotonic() - start_time
+        )
+        iterations.append(iteration)
+        if on_iteration:
+            on_iteration(iteration)
+
+        if meetings:
+            # Each side has been fully expanded to its depth, so the shortest path
+            # meets at one of the keys found while expanding this level
+            best = min(
+                meetings,
+                key=lambda key: len(_path_to(key, forward))
+                + len(_path_to(key, backward)),
+            )
+            moves = _path_to(best, forward)
+            moves.extend(move.reverse() for move in reversed(_path_to(best, backward)))
+            return SearchResult(moves, iterations)
+        if not next_frontier:
+            break  # Every state has been visited
+
+    raise RuntimeError("No solution found")
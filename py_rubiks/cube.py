@@ -4,7 +4,8 @@ from __future__ import annotations
 
 from copy import copy
 from enum import Enum
-from typing import Generator, List, Optional
+from operator import itemgetter
+from typing import Any, Dict, Generator, List, Mapping, Optional, Tuple
 
 import attr
 
@@ -110,11 +111,11 @@ class CubeFace:
             other_row = other.state[row_idx]
             if my_row == other_row:
                 continue
-            for col_idx in range(len(my_row)):
-                my_colour = my_row[col_idx]
-                other_colour = other_row[col_idx]
-                if not any(
-                    [my_colour == other_colour, my_colour == "*", other_colour == "*"]
+            for my_colour, other_colour in zip(my_row, other_row):
+                if (
+                    my_colour != other_colour
+                    and my_colour != "*"
+                    and other_colour != "*"
                 ):
                     return False
         return True
@@ -129,11 +130,11 @@ class Move:
 
     def is_reverse(self, other: Move) -> bool:
         """Return `True` if other would undo `self`."""
-        if not self.face_ref == other.face_ref:
-            return False
-        if self.steps == 1 and other.steps == 3 or self.steps == 2 and other.steps == 2:
-            return True
-        return False
+        return other == self.reverse()
+
+    def reverse(self) -> Move:
+        """Return the move that undoes `self`."""
+        return Move(self.face_ref, 4 - self.steps)
 
 
 class FaceRef(Enum):
@@ -145,162 +146,452 @@ class FaceRef(Enum):
     D = "bottom"
 
 
-@attr.s(auto_attribs=True, frozen=True, slots=True)
+Stickers = Tuple[str, ...]  # 54 stickers, face by face in `FACE_ORDER`, row major
+Permutation = Tuple[int, ...]
+
+FACE_ORDER = (FaceRef.F, FaceRef.R, FaceRef.B, FaceRef.L, FaceRef.U, FaceRef.D)
+STICKER_COUNT = 54
+
+# Outward unit normal of each face, with x to the right, y up and z towards the viewer
+FACE_NORMALS = {
+    FaceRef.F: (0, 0, 1),
+    FaceRef.R: (1, 0, 0),
+    FaceRef.B: (0, 0, -1),
+    FaceRef.L: (-1, 0, 0),
+    FaceRef.U: (0, 1, 0),
+    FaceRef.D: (0, -1, 0),
+}
+
+
+def _sticker_position(face_ref: FaceRef, row: int, col: int) -> Tuple[int, int, int]:
+    """Return the 3D position of a sticker, the face's own axis is set to +/- 2.
+
+    Each face is laid out as in the standard net: the top face's bottom edge and the
+    bottom face's top edge border the front face, the back face is viewed from behind.
+
+    """
+    across = col - 1
+    down = 1 - row
+    if face_ref == FaceRef.F:
+        return (across, down, 2)
+    elif face_ref == FaceRef.R:
+        return (2, down, -across)
+    elif face_ref == FaceRef.B:
+        return (-across, down, -2)
+    elif face_ref == FaceRef.L:
+        return (-2, down, across)
+    elif face_ref == FaceRef.U:
+        return (across, 2, row - 1)
+    else:  # Bottom
+        return (across, -2, 1 - row)
+
+
+STICKER_POSITIONS = tuple(
+    _sticker_position(face_ref, row, col)
+    for face_ref in FACE_ORDER
+    for row in range(3)
+    for col in range(3)
+)
+
+
+def _quarter_turn(face_ref: FaceRef) -> Permutation:
+    """Return the permutation for a clockwise quarter turn of the given layer.
+
+    A permutation `perm` maps a state to a new state such that
+    `new[idx] == old[perm[idx]]`.
+
+    """
+    nx, ny, nz = FACE_NORMALS[face_ref]
+    index_of = {position: idx for idx, position in enumerate(STICKER_POSITIONS)}
+    perm = list(range(STICKER_COUNT))
+    for idx, (x, y, z) in enumerate(STICKER_POSITIONS):
+        along = x * nx + y * ny + z * nz
+        if along < 1:
+            continue  # Not part of this layer
+        # Clockwise when looking at the face is -90 degrees about the outward normal
+        target = (
+            nx * along - (ny * z - nz * y),
+            ny * along - (nz * x - nx * z),
+            nz * along - (nx * y - ny * x),
+        )
+        perm[index_of[target]] = idx
+    return tuple(perm)
+
+
+def compose(first: Permutation, second: Permutation) -> Permutation:
+    """Return the permutation equivalent to applying `first` and then `second`."""
+    return tuple(first[idx] for idx in second)
+
+
+def _build_layer_permutations() -> Dict[Tuple[FaceRef, int], Permutation]:
+    permutations = {}
+    for face_ref in FACE_ORDER:
+        quarter = _quarter_turn(face_ref)
+        perm = quarter
+        for steps in range(1, 4):
+            permutations[(face_ref, steps)] = perm
+            perm = compose(perm, quarter)
+    return permutations
+
+
+# Sticker permutation for each of the 18 layer turns, keyed by `(face_ref, steps)`
+LAYER_PERMUTATIONS = _build_layer_permutations()
+
+# The 18 layer turns in the order that `Cube.successors` enumerates them
+MOVES = tuple(Move(face_ref, steps) for face_ref in FACE_ORDER for steps in range(1, 4))
+
+# Opposite faces turn about the same axis, so their turns commute
+FACE_AXES = {
+    FaceRef.F: 0,
+    FaceRef.B: 0,
+    FaceRef.R: 1,
+    FaceRef.L: 1,
+    FaceRef.U: 2,
+    FaceRef.D: 2,
+}
+
+
+def _build_canonical_next_faces() -> Dict[Optional[FaceRef], Tuple[FaceRef, ...]]:
+    """Return the faces that may be turned after each face, `None` being the start.
+
+    Turning the same face twice in a row is never needed and turns of opposite faces
+    reach the same state in either order, so they are only made in `FACE_ORDER`. This
+    also rules out the same-axis triples such as F B F.
+
+    """
+    next_faces: Dict[Optional[FaceRef], Tuple[FaceRef, ...]] = {None: FACE_ORDER}
+    for last_idx, last_face in enumerate(FACE_ORDER):
+        next_faces[last_face] = tuple(
+            face_ref
+            for idx, face_ref in enumerate(FACE_ORDER)
+            if FACE_AXES[face_ref] != FACE_AXES[last_face] or idx > last_idx
+        )
+    return next_faces
+
+
+CANONICAL_NEXT_FACES = _build_canonical_next_faces()
+
+_LAYER_GETTERS = {key: itemgetter(*perm) for key, perm in LAYER_PERMUTATIONS.items()}
+
+# `MOVE_GETTERS[move_idx](stickers)` applies `MOVES[move_idx]` to a sticker tuple
+MOVE_GETTERS = tuple(_LAYER_GETTERS[(move.face_ref, move.steps)] for move in MOVES)
+
+# The indices in `MOVES` of the moves that may follow each face in canonical order
+CANONICAL_NEXT_MOVES = {
+    last_face: tuple(
+        move_idx for move_idx, move in enumerate(MOVES) if move.face_ref in next_faces
+    )
+    for last_face, next_faces in CANONICAL_NEXT_FACES.items()
+}
+
+# The standard facelet string lists the faces in this order, each face is in the same
+# row major order as in `Cube.stickers`
+FACELET_ORDER = (FaceRef.U, FaceRef.R, FaceRef.F, FaceRef.D, FaceRef.L, FaceRef.B)
+_FACE_LETTERS = frozenset(face_ref.name for face_ref in FaceRef)
+
+_FROM_FACELETS = itemgetter(
+    *(
+        FACELET_ORDER.index(face_ref) * 9 + idx
+        for face_ref in FACE_ORDER
+        for idx in range(9)
+    )
+)
+_TO_FACELETS = itemgetter(
+    *(
+        FACE_ORDER.index(face_ref) * 9 + idx
+        for face_ref in FACELET_ORDER
+        for idx in range(9)
+    )
+)
+
+# The length of `Cube.to_bytes`, the six centre colours and a 9 byte state key
+CUBE_BYTES = 15
+
+
+@attr.s(frozen=True, slots=True, init=False, eq=False)
 class Cube:
     """Model class for a Rubiks cube.
 
     Each `Cube` is considered to be immutable, rotation operations will return new
     `Cube` instances.
 
+    The state is held as a flat tuple of 54 stickers, face by face in `FACE_ORDER`
+    with each face in row major order. The `CubeFace` attributes are views built from
+    this tuple on access, layer rotations are applied as a single precomputed
+    permutation of the tuple.
+
+    The hash of the stickers is computed once when the cube is built. Cubes with
+    different hashes compare unequal without looking at the stickers, and
+    `state_str` is cached on first use.
+
     If the `Cube` is being instantiated from a cube rotation, the `universal_front_face`
     attribute should reference the face that was the original front face. This allows
     the cube to be rotated back to its original orientation.
 
     """
 
-    front: CubeFace
-    right: CubeFace
-    back: CubeFace
-    left: CubeFace
-    top: CubeFace
-    bottom: CubeFace
+    stickers: Stickers = attr.ib()
 
-    universal_front_face: Optional[FaceRef] = attr.ib(cmp=False, default=None)
-    from_move: Optional[Move] = attr.ib(cmp=False, default=None)
+    universal_front_face: Optional[FaceRef] = attr.ib(default=None)
+    from_move: Optional[Move] = attr.ib(default=None)
 
-    @property
-    def state_str(self) -> str:
-        return "".join(
-            face.state_str
-            for face in [
-                self.front,
-                self.right,
-                self.back,
-                self.left,
-                self.top,
-                self.bottom,
-            ]
+    _hash: int = attr.ib(init=False, repr=False)
+    _state_str: Optional[str] = attr.ib(init=False, repr=False, default=None)
+
+    def __attrs_post_init__(self) -> None:
+        object.__setattr__(self, "_hash", hash(self.stickers))
+
+    def __eq__(self, other: object) -> bool:
+        if self is other:
+            return True
+        if not isinstance(other, Cube):
+            return NotImplemented
+        return self._hash == other._hash and self.stickers == other.stickers
+
+    def __hash__(self) -> int:
+        return self._hash
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        # String hashes differ between processes, so the hash is not pickled
+        return (
+            Cube.from_stickers,
+            (self.stickers, self.universal_front_face, self.from_move),
         )
 
-    def __copy__(self) -> Cube:
-        return Cube(
-            copy(self.front),
-            copy(self.right),
-            copy(self.back),
-            copy(self.left),
-            copy(self.top),
-            copy(self.bottom),
-            copy(self.universal_front_face),
-            copy(self.from_move),
+    def __init__(
+        self,
+        front: CubeFace,
+        right: CubeFace,
+        back: CubeFace,
+        left: CubeFace,
+        top: CubeFace,
+        bottom: CubeFace,
+        universal_front_face: Optional[FaceRef] = None,
+        from_move: Optional[Move] = None,
+    ) -> None:
+        stickers = tuple(
+            colour
+            for face in (front, right, back, left, top, bottom)
+            for row in face.state
+            for colour in row
         )
+        self.__attrs_init__(stickers, universal_front_face, from_move)
+
+    @classmethod
+    def from_stickers(
+        cls,
+        stickers: Stickers,
+        universal_front_face: Optional[FaceRef] = None,
+        from_move: Optional[Move] = None,
+    ) -> Cube:
+        """Return a new `Cube` directly from a flat tuple of 54 stickers."""
+        cube = cls.__new__(cls)
+        cube.__attrs_init__(stickers, universal_front_face, from_move)
+        return cube
+
+    @classmethod
+    def from_facelets(
+        cls, facelets: str, colours: Optional[Mapping[FaceRef, str]] = None
+    ) -> Cube:
+        """Return the `Cube` for a standard 54 character facelet string.
+
+        The string gives the face letter of each sticker, faces in `FACELET_ORDER`,
+        for example `UUUUUUUUURRRRRRRRRFFFFFFFFFDDDDDDDDDLLLLLLLLLBBBBBBBBB` is solved.
 
-    def rotate_layer(self, face_ref: FaceRef, steps: int) -> Cube:
-        """Return a new `Cube` where the specified layer has been rotated `steps` times.
+        Args:
+            facelets: The facelet string.
+            colours: The colour of each face, defaults to the face letters.
 
-        If the non-facing layer is required to be rotated, the cube is rotated such that
-        the required layer is the facing layer. The facing layer is then rotated and
-        the cube is rotated back to its original orientation before returning.
+        Raises:
+            ValueError: If `facelets` is not 54 face letters.
 
-        NOTE: The face rotation is clockwise.
+        """
+        if len(facelets) != STICKER_COUNT or not _FACE_LETTERS.issuperset(facelets):
+            raise ValueError(f"Invalid facelet string {facelets!r}")
+        stickers = _FROM_FACELETS(facelets)
+        if colours is not None:
+            colour_of = {face_ref.name: colours[face_ref] for face_ref in FaceRef}
+            stickers = tuple(map(colour_of.__getitem__, stickers))
+        return cls.from_stickers(stickers)
 
-        Args:
-            steps: The number of rotations to complete.
+    def to_facelets(self) -> str:
+        """Return the standard facelet string, faces are identified by their centres.
 
-        Returns:
-            A new `Cube` where the required layer has been rotated `steps` times.
+        Raises:
+            ValueError: If a sticker does not match any of the centres.
 
         """
-        rotated = copy(self)
+        stickers = self.stickers
+        letter_of = {
+            stickers[idx * 9 + 4]: face_ref.name
+            for idx, face_ref in enumerate(FACE_ORDER)
+        }
+        try:
+            return "".join(map(letter_of.__getitem__, _TO_FACELETS(stickers)))
+        except KeyError as err:
+            raise ValueError(f"{err.args[0]!r} does not match any centre") from None
+
+    def to_bytes(self) -> bytes:
+        """Return a `CUBE_BYTES` long encoding of the stickers.
+
+        The encoding is the centre colours in `FACE_ORDER` followed by the
+        `visited.state_key` of the state. `universal_front_face` and `from_move` are
+        not included.
+
+        Raises:
+            ValueError: If the colours are not single Latin-1 characters or the
+                stickers do not describe a set of valid pieces.
 
-        if face_ref == FaceRef.F:
+        """
+        # Imported here as `visited` depends on this module
+        from py_rubiks.visited import state_key
 
-            for _ in range(steps):
-                previous = copy(rotated)
+        centres = "".join(self.stickers[offset + 4] for offset in range(0, 54, 9))
+        if len(centres) != len(FACE_ORDER):
+            raise ValueError("Colours must be single characters")
+        try:
+            encoded = centres.encode("latin-1")
+        except UnicodeEncodeError:
+            raise ValueError("Colours must be Latin-1 characters") from None
+        return encoded + state_key(self).to_bytes(CUBE_BYTES - len(encoded), "big")
 
-                new_front = rotated.front.rotate(steps)
+    @classmethod
+    def from_bytes(cls, data: bytes) -> Cube:
+        """Return the `Cube` encoded by `to_bytes`.
 
-                # Front has borders with top, right, bottom, left
+        Raises:
+            ValueError: If `data` is not a valid encoding.
 
-                # Right edge of left face becomes bottom edge of top face
-                new_top = rotated.top.replace_edge(
-                    EdgeRef.BOTTOM, previous.left.right_edge
-                )
+        """
+        from py_rubiks.visited import N_STATE_KEYS, cube_from_key
+
+        if len(data) != CUBE_BYTES:
+            raise ValueError(f"Expected {CUBE_BYTES} bytes, got {len(data)}")
+        key = int.from_bytes(data[len(FACE_ORDER) :], "big")
+        if key >= N_STATE_KEYS:
+            raise ValueError("Invalid state key")
+        return cube_from_key(key, data[: len(FACE_ORDER)].decode("latin-1"))
+
+    def _face(self, face_idx: int) -> CubeFace:
+        offset = face_idx * 9
+        stickers = self.stickers
+        return CubeFace(
+            [
+                list(stickers[offset : offset + 3]),
+                list(stickers[offset + 3 : offset + 6]),
+                list(stickers[offset + 6 : offset + 9]),
+            ]
+        )
 
-                # Bottom edge of top face becomes left edge of the right face
-                new_right = rotated.right.replace_edge(
-                    EdgeRef.LEFT, previous.top.bottom_edge
-                )
+    @property
+    def front(self) -> CubeFace:
+        return self._face(0)
 
-                # Left edge of right face becomes top edge of bottom face
-                new_bottom = rotated.bottom.replace_edge(
-                    EdgeRef.TOP, previous.right.left_edge
-                )
+    @property
+    def right(self) -> CubeFace:
+        return self._face(1)
 
-                # Top edge of bottom face becomes right edge of left face
-                new_left = rotated.left.replace_edge(
-                    EdgeRef.RIGHT, previous.bottom.top_edge
-                )
+    @property
+    def back(self) -> CubeFace:
+        return self._face(2)
 
-                # 'Update' the frozen rotated `Cube`
-                rotated = attr.evolve(
-                    rotated,
-                    front=new_front,
-                    top=new_top,
-                    right=new_right,
-                    bottom=new_bottom,
-                    left=new_left,
-                )
+    @property
+    def left(self) -> CubeFace:
+        return self._face(3)
 
-        else:
-            # Rotate the cube such that the specified face is the front face
-            # then rotate the front layer, and finally rotate the cube back to it's
-            # original orientation
-            rotated = self.rotate_cube(face_ref)
-            rotated = rotated.rotate_layer(FaceRef.F, steps)
-            rotated = rotated.rotate_cube(rotated.universal_front_face)  # type: ignore
+    @property
+    def top(self) -> CubeFace:
+        return self._face(4)
+
+    @property
+    def bottom(self) -> CubeFace:
+        return self._face(5)
+
+    @property
+    def state_str(self) -> str:
+        if self._state_str is None:
+            object.__setattr__(self, "_state_str", "".join(self.stickers))
+        return self._state_str  # type: ignore
 
-        return rotated
+    @property
+    def is_solved(self) -> bool:
+        """Return `True` if every sticker matches the centre of its face."""
+        stickers = self.stickers
+        for offset in range(0, STICKER_COUNT, 9):
+            centre = stickers[offset + 4]
+            for idx in range(offset, offset + 9):
+                if stickers[idx] != centre:
+                    return False
+        return True
+
+    def __copy__(self) -> Cube:
+        return Cube.from_stickers(
+            self.stickers, copy(self.universal_front_face), copy(self.from_move),
+        )
+
+    def rotate_layer(self, face_ref: FaceRef, steps: int) -> Cube:
+        """Return a new `Cube` where the specified layer has been rotated `steps` times.
+
+        The rotation is a single lookup of the precomputed sticker permutation for the
+        layer, the orientation of the cube is unchanged.
+
+        NOTE: The face rotation is clockwise.
+
+        Args:
+            steps: The number of rotations to complete.
+
+        Returns:
+            A new `Cube` where the required layer has been rotated `steps` times.
+
+        """
+        steps %= 4
+        if not steps:
+            return copy(self)
+        return Cube.from_stickers(
+            _LAYER_GETTERS[(face_ref, steps)](self.stickers),
+            self.universal_front_face,
+            self.from_move,
+        )
 
     def rotate_cube(self, face_ref: FaceRef) -> Cube:
         """Return a new `Cube` such that the specified face is the front face."""
         # Faces in the axis of cube rotation rotate with the cube.
         # Other faces are either mirrored or cloned depending on their index reference
         if face_ref == FaceRef.F:
-            dup = attr.evolve(copy(self), universal_front_face=FaceRef.F)
-            return dup
+            return Cube.from_stickers(self.stickers, FaceRef.F, self.from_move)
         elif face_ref == FaceRef.R:
             return Cube(
-                front=copy(self.right),
-                right=copy(self.back),
-                back=copy(self.left),
-                left=copy(self.front),
+                front=self.right,
+                right=self.back,
+                back=self.left,
+                left=self.front,
                 top=self.top.rotate(1),  # Right edge becomes bottom edge
                 bottom=self.bottom.rotate(3),  # Right edge becomes top edge
                 universal_front_face=FaceRef.L,  # Original front is new left
             )
         elif face_ref == FaceRef.B:
             return Cube(
-                front=copy(self.back),
-                right=copy(self.left),
-                back=copy(self.front),
-                left=copy(self.right),
+                front=self.back,
+                right=self.left,
+                back=self.front,
+                left=self.right,
                 top=self.top.rotate(2),  # Top edge becomes bottom edge
                 bottom=self.bottom.rotate(2),
                 universal_front_face=FaceRef.B,
             )
         elif face_ref == FaceRef.L:
             return Cube(
-                front=copy(self.left),
-                right=copy(self.front),
-                back=copy(self.right),
-                left=copy(self.back),
+                front=self.left,
+                right=self.front,
+                back=self.right,
+                left=self.back,
                 top=self.top.rotate(3),  # Top edge becomes left edge
                 bottom=self.bottom.rotate(1),  # Left edge becomes top edge
                 universal_front_face=FaceRef.R,
             )
         elif face_ref == FaceRef.U:
             return Cube(
-                front=copy(self.top),
+                front=self.top,
                 right=self.right.rotate(3),  # Top edge becomes left edge
                 back=self.bottom.mirror(EdgeRef.TOP),  # Top edge becomes bottom edge
                 left=self.left.rotate(1),  # Top edge becomes left edge
@@ -308,41 +599,50 @@ class Cube:
                     EdgeRef.LEFT
                 ),  # Top edge becomes bottom edge - double mirror to account for index
                 # reference flip
-                bottom=copy(self.front),
+                bottom=self.front,
                 universal_front_face=FaceRef.D,
             )
         else:  # Bottom
             return Cube(
-                front=copy(self.bottom),
+                front=self.bottom,
                 right=self.right.rotate(1),  # Bottom edge becomes left edge
                 back=self.top.mirror(EdgeRef.TOP).mirror(
                     EdgeRef.LEFT
                 ),  # Top edge becomes bottom edge
                 left=self.left.rotate(3),  # Top edge becomes left edge
-                top=copy(self.front),
+                top=self.front,
                 bottom=self.back.mirror(EdgeRef.BOTTOM),  # Top edge becomes bottom edge
                 universal_front_face=FaceRef.U,
             )
 
-    def successors(self) -> Generator[Cube, None, None]:
+    def successors(self, canonical: bool = False) -> Generator[Cube, None, None]:
         """Yield successor cubes from the current state.
 
         This function will not yield the parent of the current state.
 
         Each face can be rotated 3 times which means the root node has 18 successors.
 
+        Args:
+            canonical: Only yield the turns allowed by `CANONICAL_NEXT_FACES` after
+                `from_move`, so that turns of opposite faces are only made in one
+                order. By default only turns of the same face are skipped.
+
         Yields:
             Successor `Cube` instances.
 
         """
-        for face_ref in FaceRef:
+        stickers = self.stickers
+        from_face = self.from_move.face_ref if self.from_move else None
+        if canonical:
+            faces = CANONICAL_NEXT_FACES[from_face]
+        else:
+            faces = tuple(face_ref for face_ref in FACE_ORDER if face_ref != from_face)
+        for face_ref in faces:
             for step in range(1, 4):
-                if self.from_move:
-                    if self.from_move.face_ref == face_ref:
-                        continue
-                successor = self.rotate_layer(face_ref, step)
-                successor = attr.evolve(successor, from_move=Move(face_ref, step))
-                yield successor
+                yield Cube.from_stickers(
+                    _LAYER_GETTERS[(face_ref, step)](stickers),
+                    from_move=Move(face_ref, step),
+                )
 
     def fuzzy_match(self, other: Cube) -> bool:
         """Return `True` if self's faces match the other's faces.
@@ -356,16 +656,7 @@ class Cube:
             True or False.
 
         """
-        if not self.front.fuzzy_match(other.front):
-            return False
-        if not self.right.fuzzy_match(other.right):
-            return False
-        if not self.back.fuzzy_match(other.back):
-            return False
-        if not self.left.fuzzy_match(other.left):
-            return False
-        if not self.top.fuzzy_match(other.top):
-            return False
-        if not self.bottom.fuzzy_match(other.bottom):
-            return False
+        for mine, theirs in zip(self.stickers, other.stickers):
+            if mine != theirs and mine != "*" and theirs != "*":
+                return False
         return True
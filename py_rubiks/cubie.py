@@ -0,0 +1,439 @@
+"""Cubie level model of a Rubiks Cube.
+
+A `CubieCube` describes a state by where each of the 8 corner and 12 edge pieces
+(cubies) are and how they are twisted, rather than by the colour of each sticker.
+The corner and edge naming follows the usual convention where `URF` is the corner
+between the top, right and front faces and so on.
+
+"""
+
+from __future__ import annotations
+
+from enum import IntEnum
+from math import comb
+from typing import Dict, Sequence, Tuple
+
+import attr
+
+from py_rubiks.cube import FACE_ORDER, Cube, FaceRef
+
+
+class Corner(IntEnum):
+    URF = 0
+    UFL = 1
+    ULB = 2
+    UBR = 3
+    DFR = 4
+    DLF = 5
+    DBL = 6
+    DRB = 7
+
+
+class Edge(IntEnum):
+    UR = 0
+    UF = 1
+    UL = 2
+    UB = 3
+    DR = 4
+    DF = 5
+    DL = 6
+    DB = 7
+    FR = 8
+    FL = 9
+    BL = 10
+    BR = 11
+
+
+def _sticker(face_ref: FaceRef, number: int) -> int:
+    """Return the flat sticker index of the 1-based `number` sticker of a face."""
+    return FACE_ORDER.index(face_ref) * 9 + number - 1
+
+
+U, R, F, D, L, B = FaceRef.U, FaceRef.R, FaceRef.F, FaceRef.D, FaceRef.L, FaceRef.B
+
+# Sticker indices of each corner position, the top or bottom sticker is listed first
+# followed by the others in clockwise order
+CORNER_STICKERS = (
+    (_sticker(U, 9), _sticker(R, 1), _sticker(F, 3)),
+    (_sticker(U, 7), _sticker(F, 1), _sticker(L, 3)),
+    (_sticker(U, 1), _sticker(L, 1), _sticker(B, 3)),
+    (_sticker(U, 3), _sticker(B, 1), _sticker(R, 3)),
+    (_sticker(D, 3), _sticker(F, 9), _sticker(R, 7)),
+    (_sticker(D, 1), _sticker(L, 9), _sticker(F, 7)),
+    (_sticker(D, 7), _sticker(B, 9), _sticker(L, 7)),
+    (_sticker(D, 9), _sticker(R, 9), _sticker(B, 7)),
+)
+
+# Sticker indices of each edge position, the reference sticker is listed first
+EDGE_STICKERS = (
+    (_sticker(U, 6), _sticker(R, 2)),
+    (_sticker(U, 8), _sticker(F, 2)),
+    (_sticker(U, 4), _sticker(L, 2)),
+    (_sticker(U, 2), _sticker(B, 2)),
+    (_sticker(D, 6), _sticker(R, 8)),
+    (_sticker(D, 2), _sticker(F, 8)),
+    (_sticker(D, 4), _sticker(L, 8)),
+    (_sticker(D, 8), _sticker(B, 8)),
+    (_sticker(F, 6), _sticker(R, 4)),
+    (_sticker(F, 4), _sticker(L, 6)),
+    (_sticker(B, 6), _sticker(L, 4)),
+    (_sticker(B, 4), _sticker(R, 6)),
+)
+
+# Faces of each corner and edge cubie in the same order as their stickers
+CORNER_FACES = (
+    (U, R, F),
+    (U, F, L),
+    (U, L, B),
+    (U, B, R),
+    (D, F, R),
+    (D, L, F),
+    (D, B, L),
+    (D, R, B),
+)
+EDGE_FACES = (
+    (U, R),
+    (U, F),
+    (U, L),
+    (U, B),
+    (D, R),
+    (D, F),
+    (D, L),
+    (D, B),
+    (F, R),
+    (F, L),
+    (B, L),
+    (B, R),
+)
+
+_CORNER_LOOKUP = {faces[1:]: corner for corner, faces in enumerate(CORNER_FACES)}
+_EDGE_LOOKUP = {
+    faces[::direction]: (edge, flip)
+    for edge, faces in enumerate(EDGE_FACES)
+    for flip, direction in enumerate((1, -1))
+}
+
+
+# Number of values of each coordinate
+N_TWIST = 3 ** 7
+N_FLIP = 2 ** 11
+N_SLICE = comb(12, 4)
+N_SLICE_SORTED = N_SLICE * 24
+N_CORNERS = 40320  # 8!
+N_UD_EDGES = 40320  # 8!
+N_SLICE_PERM = 24  # 4!
+
+
+def perm_rank(perm: Sequence[int]) -> int:
+    """Return the rank of a permutation of `range(len(perm))`, the identity is 0."""
+    rank = 0
+    size = len(perm)
+    for idx in range(size - 1):
+        value = perm[idx]
+        smaller = 0
+        for other in range(idx + 1, size):
+            if perm[other] < value:
+                smaller += 1
+        rank = (size - idx) * rank + smaller
+    return rank
+
+
+def perm_from_rank(rank: int, size: int) -> Tuple[int, ...]:
+    """Return the permutation of `range(size)` with the given `perm_rank`."""
+    digits = []
+    for base in range(1, size + 1):
+        rank, digit = divmod(rank, base)
+        digits.append(digit)
+    available = list(range(size))
+    return tuple(available.pop(digit) for digit in reversed(digits))
+
+
+def twist_from_co(co: Sequence[int]) -> int:
+    """Return the corner orientation coordinate, `0 <= twist < N_TWIST`."""
+    twist = 0
+    for orientation in co[:7]:
+        twist = 3 * twist + orientation
+    return twist
+
+
+def co_from_twist(twist: int) -> Tuple[int, ...]:
+    co = [0] * 8
+    for idx in range(6, -1, -1):
+        twist, co[idx] = divmod(twist, 3)
+    co[7] = -sum(co) % 3
+    return tuple(co)
+
+
+def flip_from_eo(eo: Sequence[int]) -> int:
+    """Return the edge orientation coordinate, `0 <= flip < N_FLIP`."""
+    flip = 0
+    for orientation in eo[:11]:
+        flip = 2 * flip + orientation
+    return flip
+
+
+def eo_from_flip(flip: int) -> Tuple[int, ...]:
+    eo = [0] * 12
+    for idx in range(10, -1, -1):
+        flip, eo[idx] = divmod(flip, 2)
+    eo[11] = sum(eo) % 2
+    return tuple(eo)
+
+
+def slice_sorted_from_ep(ep: Sequence[int]) -> int:
+    """Return the position and order of the FR, FL, BL and BR edges.
+
+    The value is `24 * slice + permutation` where `slice` is the position of the four
+    edges ignoring their order, so the solved state has a value of 0 and
+    `slice_sorted < 24` when the four edges are in the middle layer.
+
+    """
+    location = 0
+    found = 0
+    for position in range(11, -1, -1):
+        if ep[position] >= Edge.FR:
+            found += 1
+            location += comb(11 - position, found)
+    slice_edges = [edge - Edge.FR for edge in ep if edge >= Edge.FR]
+    return 24 * location + perm_rank(slice_edges)
+
+
+def ep_from_slice_sorted(slice_sorted: int) -> Tuple[int, ...]:
+    """Return an edge permutation with the given `slice_sorted` coordinate.
+
+    The other edges fill the remaining positions in order.
+
+    """
+    location, rank = divmod(slice_sorted, 24)
+    slice_edges = iter(Edge.FR + edge for edge in perm_from_rank(rank, 4))
+    other_edges = iter(range(Edge.FR))
+    remaining = 4
+    ep = []
+    for position in range(12):
+        if remaining and location >= comb(11 - position, remaining):
+            location -= comb(11 - position, remaining)
+            ep.append(next(slice_edges))
+            remaining -= 1
+        else:
+            ep.append(next(other_edges))
+    return tuple(ep)
+
+
+def _parity(perm: Sequence[int]) -> int:
+    """Return 0 for an even permutation and 1 for an odd one."""
+    parity = 0
+    for idx in range(len(perm)):
+        for other in range(idx):
+            if perm[other] > perm[idx]:
+                parity ^= 1
+    return parity
+
+
+@attr.s(auto_attribs=True, frozen=True, slots=True)
+class CubieCube:
+    """Model class for a Rubiks cube at the cubie level.
+
+    `cp[i]` is the corner that sits in corner position `i` and `co[i]` is its twist
+    (0, 1 or 2 clockwise turns). `ep` and `eo` do the same for the edges with a flip
+    of 0 or 1. Centres are fixed so they are not tracked.
+
+    Each `CubieCube` is considered to be immutable, moves return new instances.
+
+    """
+
+    cp: Tuple[int, ...] = tuple(range(8))
+    co: Tuple[int, ...] = (0,) * 8
+    ep: Tuple[int, ...] = tuple(range(12))
+    eo: Tuple[int, ...] = (0,) * 12
+
+    @classmethod
+    def from_cube(cls, cube: Cube) -> CubieCube:
+        """Return the `CubieCube` for the facelet `cube`.
+
+        The faces are identified by the colour of their centre sticker.
+
+        Raises:
+            ValueError: If the stickers do not describe a solvable cube.
+
+        """
+        return cls.from_stickers(cube.stickers)
+
+    @classmethod
+    def from_stickers(cls, stickers: Sequence[str]) -> CubieCube:
+        """Return the `CubieCube` for a flat sequence of stickers, as `from_cube`."""
+        face_of = {
+            stickers[idx * 9 + 4]: face_ref for idx, face_ref in enumerate(FACE_ORDER)
+        }
+        if len(face_of) != 6:
+            raise ValueError("The centre stickers must all be different colours")
+
+        try:
+            cp = []
+            co = []
+            for corner_slot in CORNER_STICKERS:
+                faces = [face_of[stickers[idx]] for idx in corner_slot]
+                for twist in range(3):
+                    if faces[twist] in (U, D):
+                        break
+                else:
+                    raise ValueError("Corner without a top or bottom sticker")
+                cp.append(
+                    _CORNER_LOOKUP[(faces[(twist + 1) % 3], faces[(twist + 2) % 3])]
+                )
+                co.append(twist)
+
+            ep = []
+            eo = []
+            for edge_slot in EDGE_STICKERS:
+                faces = [face_of[stickers[idx]] for idx in edge_slot]
+                edge, flip = _EDGE_LOOKUP[(faces[0], faces[1])]
+                ep.append(edge)
+                eo.append(flip)
+        except KeyError as err:
+            raise ValueError(f"Invalid sticker combination: {err}") from err
+
+        cubie = cls(tuple(cp), tuple(co), tuple(ep), tuple(eo))
+        cubie.verify()
+        return cubie
+
+    def to_cube(self, centres: Sequence[str]) -> Cube:
+        """Return the facelet `Cube` for `self`.
+
+        Args:
+            centres: The colour of each face in `FACE_ORDER`.
+
+        """
+        colour_of = dict(zip(FACE_ORDER, centres))
+        stickers = [colour_of[face_ref] for face_ref in FACE_ORDER for _ in range(9)]
+        for position, (corner, twist) in enumerate(zip(self.cp, self.co)):
+            corner_faces = CORNER_FACES[corner]
+            for offset in range(3):
+                sticker = CORNER_STICKERS[position][(offset + twist) % 3]
+                stickers[sticker] = colour_of[corner_faces[offset]]
+        for position, (edge, flip) in enumerate(zip(self.ep, self.eo)):
+            edge_faces = EDGE_FACES[edge]
+            for offset in range(2):
+                sticker = EDGE_STICKERS[position][(offset + flip) % 2]
+                stickers[sticker] = colour_of[edge_faces[offset]]
+        return Cube.from_stickers(tuple(stickers))
+
+    def multiply(self, other: CubieCube) -> CubieCube:
+        """Return the state reached by applying `other` to `self`."""
+        cp, co, ep, eo = self.cp, self.co, self.ep, self.eo
+        return CubieCube(
+            tuple(cp[idx] for idx in other.cp),
+            tuple((co[idx] + twist) % 3 for idx, twist in zip(other.cp, other.co)),
+            tuple(ep[idx] for idx in other.ep),
+            tuple((eo[idx] + flip) % 2 for idx, flip in zip(other.ep, other.eo)),
+        )
+
+    def inverse(self) -> CubieCube:
+        """Return the state that undoes `self` when multiplied."""
+        cp = [0] * 8
+        co = [0] * 8
+        for position, (corner, twist) in enumerate(zip(self.cp, self.co)):
+            cp[corner] = position
+            co[corner] = -twist % 3
+        ep = [0] * 12
+        eo = [0] * 12
+        for position, (edge, flip) in enumerate(zip(self.ep, self.eo)):
+            ep[edge] = position
+            eo[edge] = flip
+        return CubieCube(tuple(cp), tuple(co), tuple(ep), tuple(eo))
+
+    def rotate_layer(self, face_ref: FaceRef, steps: int) -> CubieCube:
+        """Return a new `CubieCube` where the specified layer has been rotated.
+
+        NOTE: The face rotation is clockwise.
+
+        """
+        return self.multiply(MOVE_CUBES[(face_ref, steps % 4)])
+
+    def verify(self) -> None:
+        """Raise `ValueError` if `self` cannot be reached from the solved state."""
+        if sorted(self.cp) != list(range(8)) or sorted(self.ep) != list(range(12)):
+            raise ValueError("Each cubie must appear exactly once")
+        if sum(self.co) % 3:
+            raise ValueError("A single corner is twisted")
+        if sum(self.eo) % 2:
+            raise ValueError("A single edge is flipped")
+        if _parity(self.cp) != _parity(self.ep):
+            raise ValueError("Two pieces are swapped")
+
+    # Coordinates, see the module level functions for their definitions
+
+    @property
+    def twist(self) -> int:
+        return twist_from_co(self.co)
+
+    @classmethod
+    def from_twist(cls, twist: int) -> CubieCube:
+        return cls(co=co_from_twist(twist))
+
+    @property
+    def flip(self) -> int:
+        return flip_from_eo(self.eo)
+
+    @classmethod
+    def from_flip(cls, flip: int) -> CubieCube:
+        return cls(eo=eo_from_flip(flip))
+
+    @property
+    def slice_sorted(self) -> int:
+        return slice_sorted_from_ep(self.ep)
+
+    @classmethod
+    def from_slice_sorted(cls, slice_sorted: int) -> CubieCube:
+        return cls(ep=ep_from_slice_sorted(slice_sorted))
+
+    @property
+    def slice(self) -> int:
+        """Return the position of the FR, FL, BL and BR edges, ignoring their order."""
+        return self.slice_sorted // 24
+
+    @property
+    def corners(self) -> int:
+        """Return the corner permutation coordinate, `0 <= corners < N_CORNERS`."""
+        return perm_rank(self.cp)
+
+    @classmethod
+    def from_corners(cls, corners: int) -> CubieCube:
+        return cls(cp=perm_from_rank(corners, 8))
+
+    @property
+    def ud_edges(self) -> int:
+        """Return the permutation coordinate of the eight top and bottom layer edges.
+
+        Raises:
+            ValueError: If a middle layer edge is in the top or bottom layer.
+
+        """
+        if any(edge >= Edge.FR for edge in self.ep[:8]):
+            raise ValueError("The middle layer edges are not in the middle layer")
+        return perm_rank(self.ep[:8])
+
+    @classmethod
+    def from_ud_edges(cls, ud_edges: int) -> CubieCube:
+        return cls(ep=perm_from_rank(ud_edges, 8) + tuple(range(8, 12)))
+
+
+SOLVED_CUBIE = CubieCube()
+
+
+def _build_move_cubes() -> Dict[Tuple[FaceRef, int], CubieCube]:
+    """Derive the cubie moves from the facelet layer permutations."""
+    solved = Cube.from_stickers(
+        tuple(face_ref.name for face_ref in FACE_ORDER for _ in range(9))
+    )
+    move_cubes = {}
+    for face_ref in FACE_ORDER:
+        move_cubes[(face_ref, 0)] = SOLVED_CUBIE
+        for steps in range(1, 4):
+            rotated = solved.rotate_layer(face_ref, steps)
+            move_cubes[(face_ref, steps)] = CubieCube.from_cube(rotated)
+    return move_cubes
+
+
+# Cubie state of each layer turn applied to the solved cube, keyed by
+# `(face_ref, steps)`
+MOVE_CUBES = _build_move_cubes()
@@ -0,0 +1,94 @@
+"""Batched frontier expansion with NumPy.
+
+Searches over wide frontiers, such as breadth-first and beam searches, spend most of
+their time creating `Cube` instances one successor at a time. Here a frontier is an
+`(N, 54)` array of sticker codes and all of its successors are made with a single
+gather through the move permutations, so the per-state cost is a few array
+operations rather than Python objects.
+
+Sticker codes are indices into a sequence of colours, by default the centre colours of
+the first cube in `FACE_ORDER`, so a solved face is coded by its index in `FACE_ORDER`.
+
+"""
+
+from __future__ import annotations
+
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from py_rubiks.cube import FACE_ORDER, LAYER_PERMUTATIONS, MOVES, STICKER_COUNT, Cube
+
+
+# Row `move_idx` is the permutation of `MOVES[move_idx]`
+MOVE_PERMUTATIONS = np.array(
+    [LAYER_PERMUTATIONS[(move.face_ref, move.steps)] for move in MOVES], dtype=np.intp
+)
+
+
+def centre_colours(cube: Cube) -> Tuple[str, ...]:
+    """Return the centre colours of `cube` in `FACE_ORDER`."""
+    return tuple(cube.stickers[9 * idx + 4] for idx in range(len(FACE_ORDER)))
+
+
+def encode(
+    cubes: Sequence[Cube], colours: Optional[Sequence[str]] = None
+) -> np.ndarray:
+    """Return the `(N, 54)` uint8 array of sticker codes for `cubes`.
+
+    Args:
+        cubes: The states to encode.
+        colours: The colour of each code, defaults to the centres of the first cube.
+
+    Raises:
+        ValueError: If a sticker is not one of `colours`.
+
+    """
+    if colours is None:
+        colours = centre_colours(cubes[0]) if cubes else ()
+    codes = {colour: code for code, colour in enumerate(colours)}
+    try:
+        return np.array(
+            [[codes[sticker] for sticker in cube.stickers] for cube in cubes],
+            dtype=np.uint8,
+        ).reshape(len(cubes), STICKER_COUNT)
+    except KeyError as err:
+        raise ValueError(f"Unknown colour {err.args[0]!r}") from None
+
+
+def decode(states: np.ndarray, colours: Sequence[str]) -> List[Cube]:
+    """Return the `Cube` for each row of `states`."""
+    lookup = np.array(colours, dtype=object)
+    return [Cube.from_stickers(tuple(row)) for row in lookup[states].tolist()]
+
+
+def expand(states: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Return every successor of every state.
+
+    Args:
+        states: An `(N, 54)` array of sticker codes.
+
+    Returns:
+        The `(N * 18, 54)` successors, the index in `MOVES` of the move that made each
+        one and the index in `states` of its parent. The successors of `states[i]` are
+        rows `18 * i` to `18 * i + 17`, in the order of `MOVES`.
+
+    """
+    count = len(states)
+    successors = states[:, MOVE_PERMUTATIONS].reshape(count * len(MOVES), STICKER_COUNT)
+    move_ids = np.tile(np.arange(len(MOVES), dtype=np.uint8), count)
+    parents = np.repeat(np.arange(count, dtype=np.intp), len(MOVES))
+    return successors, move_ids, parents
+
+
+def state_keys(states: np.ndarray) -> np.ndarray:
+    """Return a 1-d array with one hashable, comparable 54 byte key per state."""
+    states = np.ascontiguousarray(states, dtype=np.uint8)
+    return states.view(np.dtype((np.void, STICKER_COUNT))).ravel()
+
+
+def unique_states(states: np.ndarray) -> np.ndarray:
+    """Return the index of the first occurrence of each distinct state, in order."""
+    _, first = np.unique(state_keys(states), return_index=True)
+    first.sort()
+    return first
@@ -0,0 +1,283 @@
+"""Iterative-deepening A* (IDA*) search.
+
+Each iteration is a depth-first search that abandons any path whose cost so far plus
+the heuristic estimate exceeds the current bound, the next iteration uses the smallest
+estimate that went over. Only the current path is kept, so memory is linear in the
+depth of the search.
+
+Any admissible heuristic (one that never overestimates the number of moves left) can
+be plugged in, the first solution found is then as short as possible.
+
+"""
+
+from __future__ import annotations
+
+import math
+import time
+from pathlib import Path
+from typing import Any, Callable, Iterable, List, Optional, Sequence, Tuple
+
+import attr
+
+from py_rubiks.cube import Cube, Move
+from py_rubiks.cubie import N_SLICE, CubieCube
+from py_rubiks.tables import get_pruning_tables
+from py_rubiks.transposition import TranspositionTable
+from py_rubiks.tree import Node
+from py_rubiks.visited import state_key
+
+
+# States are `Cube` instances by default, but the search only passes them between
+# the heuristic, goal test and successor functions, so any state type can be used
+Heuristic = Callable[[Any], int]
+GoalTest = Callable[[Any], bool]
+Successors = Callable[[Any, Optional[Move]], Iterable[Tuple[Move, Any]]]
+StateKey = Callable[[Any], int]
+
+
+@attr.s(auto_attribs=True, frozen=True, slots=True)
+class Iteration:
+    """Stats for a single iteration of the search."""
+
+    bound: int
+    nodes: int
+    elapsed: float
+
+
+@attr.s(auto_attribs=True, frozen=True, slots=True)
+class SearchResult:
+    moves: List[Move]
+    iterations: List[Iteration]
+    # The search tree of the last iteration, for searches that can build one
+    tree: Optional[Node] = None
+
+    @property
+    def nodes(self) -> int:
+        """Return the total number of nodes generated."""
+        return sum(iteration.nodes for iteration in self.iterations)
+
+    @property
+    def elapsed(self) -> float:
+        return sum(iteration.elapsed for iteration in self.iterations)
+
+    @property
+    def nodes_per_second(self) -> float:
+        return self.nodes / self.elapsed if self.elapsed else 0.0
+
+
+class SearchTimeout(TimeoutError):
+    """Raised when the search runs out of time.
+
+    The `iterations` attribute holds the stats of the iterations so far, the last one
+    being the iteration that was interrupted.
+
+    """
+
+    def __init__(self, iterations: List[Iteration]) -> None:
+        super().__init__("No solution found in time")
+        self.iterations = iterations
+
+
+class _Expired(Exception):
+    """Raised to unwind the search once the deadline has passed."""
+
+
+def cube_successors(
+    cube: Cube, last_move: Optional[Move]
+) -> Iterable[Tuple[Move, Cube]]:
+    """Yield `(move, successor)` pairs using `Cube.successors` in canonical order."""
+    if cube.from_move != last_move:
+        cube = Cube.from_stickers(cube.stickers, from_move=last_move)
+    for successor in cube.successors(canonical=True):
+        yield successor.from_move, successor  # type: ignore
+
+
+def is_solved(cube: Cube) -> bool:
+    return cube.is_solved
+
+
+def zero_heuristic(state: Any) -> int:
+    """Return 0, this turns IDA* into a plain iterative-deepening search."""
+    return 0
+
+
+def misplaced_stickers_heuristic(cube: Cube) -> int:
+    """Return a lower bound from the number of stickers that do not match their centre.
+
+    A single move changes at most 20 stickers, this is cheap but weak.
+
+    """
+    stickers = cube.stickers
+    misplaced = 0
+    for offset in range(0, 54, 9):
+        centre = stickers[offset + 4]
+        for idx in range(offset, offset + 9):
+            if stickers[idx] != centre:
+                misplaced += 1
+    return math.ceil(misplaced / 20)
+
+
+@attr.s(auto_attribs=True, frozen=True, slots=True)
+class OrientationHeuristic:
+    """A heuristic using the two-phase solver's phase 1 pruning tables.
+
+    The tables give the number of moves needed to orient the corners and edges and
+    bring the middle layer edges into the middle layer, which is a lower bound on the
+    number of moves to solve the cube.
+
+    Instances can be pickled, worker processes load the tables from the cache.
+
+    """
+
+    cache_dir: Optional[Path] = None
+
+    def __call__(self, cube: Cube) -> int:
+        return self.estimate(cube.stickers)
+
+    def estimate(self, stickers: Sequence[str]) -> int:
+        """Return the estimate for a flat sequence of stickers."""
+        pruning_tables = get_pruning_tables(self.cache_dir)
+        cubie = CubieCube.from_stickers(stickers)
+        slice_ = cubie.slice
+        return max(
+            pruning_tables.twist_slice[N_SLICE * cubie.twist + slice_],
+            pruning_tables.flip_slice[N_SLICE * cubie.flip + slice_],
+        )
+
+
+def orientation_heuristic(cache_dir: Optional[Path] = None) -> OrientationHeuristic:
+    """Return an `OrientationHeuristic` with the tables loaded."""
+    get_pruning_tables(cache_dir)
+    return OrientationHeuristic(cache_dir)
+
+
+def bounded_search(
+    start: Any,
+    bound: int,
+    heuristic: Heuristic = zero_heuristic,
+    successors: Successors = cube_successors,
+    is_goal: GoalTest = is_solved,
+    depth: int = 0,
+    last_move: Optional[Move] = None,
+    check: Optional[Callable[[int], None]] = None,
+    transpositions: Optional[TranspositionTable] = None,
+    key: StateKey = state_key,
+) -> Tuple[Optional[List[Move]], int, float]:
+    """Run a single IDA* iteration below `start`.
+
+    Args:
+        start: The state to search from.
+        bound: Paths whose cost plus estimate go over this are abandoned.
+        heuristic, successors, is_goal, transpositions, key: As for `ida_star`.
+        depth: The number of moves already made to reach `start`.
+        last_move: The move that reached `start`.
+        check: Called with the number of nodes generated so far before each state is
+            expanded, it may raise to stop the search.
+
+    Returns:
+        The moves from `start` to a goal or `None`, the number of nodes generated and
+        the smallest estimate that went over the bound.
+
+    """
+    path: List[Move] = []
+    nodes = 0
+    next_bound = math.inf
+
+    def search(state: Any, depth: int, last_move: Optional[Move]) -> bool:
+        nonlocal nodes, next_bound
+        estimate = depth + heuristic(state)
+        if estimate > bound:
+            if estimate < next_bound:
+                next_bound = estimate
+            return False
+        if is_goal(state):
+            return True
+        if transpositions is not None and not transpositions.visit(key(state), depth):
+            return False
+        if check:
+            check(nodes)
+        for move, successor in successors(state, last_move):
+            nodes += 1
+            path.append(move)
+            if search(successor, depth + 1, move):
+                return True
+            path.pop()
+        return False
+
+    found = search(start, depth, last_move)
+    return (path if found else None), nodes, next_bound
+
+
+def ida_star(
+    start: Any,
+    heuristic: Heuristic = zero_heuristic,
+    successors: Successors = cube_successors,
+    is_goal: GoalTest = is_solved,
+    max_depth: int = 30,
+    on_iteration: Optional[Callable[[Iteration], None]] = None,
+    timeout: Optional[float] = None,
+    transpositions: Optional[TranspositionTable] = None,
+    key: StateKey = state_key,
+) -> SearchResult:
+    """Return the moves from `start` to a goal state.
+
+    Args:
+        start: The state to search from.
+        heuristic: An admissible estimate of the number of moves left.
+        successors: Yields the `(move, successor)` pairs of a state given the move
+            that reached it.
+        is_goal: Returns `True` for goal states.
+        max_depth: Give up once the bound goes over this.
+        on_iteration: Called with the stats of each iteration as it completes.
+        timeout: Give up after this many seconds.
+        transpositions: Skip states that have already been reached at the same or a
+            shallower depth in the current iteration.
+        key: Returns the key of a state for `transpositions`.
+
+    Raises:
+        RuntimeError: If there is no solution within `max_depth` moves.
+        SearchTimeout: If there is no solution within `timeout` seconds.
+
+    """
+    iterations: List[Iteration] = []
+    check: Optional[Callable[[int], None]] = None
+    if timeout is not None:
+        deadline = time.monotonic() + timeout
+
+        def check_deadline(nodes: int) -> None:
+            if time.monotonic() > deadline:
+                raise _Expired(nodes)
+
+        check = check_deadline
+
+    bound = heuristic(start)
+    while bound <= max_depth:
+        start_time = time.monotonic()
+        if transpositions is not None:
+            transpositions.new_generation()
+        try:
+            path, nodes, next_bound = bounded_search(
+                start,
+                bound,
+                heuristic,
+                successors,
+                is_goal,
+                check=check,
+                transpositions=transpositions,
+                key=key,
+            )
+        except _Expired as expired:
+            nodes = expired.args[0]
+            iterations.append(Iteration(bound, nodes, time.monotonic() - start_time))
+            raise SearchTimeout(iterations) from None
+        iteration = Iteration(bound, nodes, time.monotonic() - start_time)
+        iterations.append(iteration)
+        if on_iteration:
+            on_iteration(iteration)
+        if path is not None:
+            return SearchResult(path, iterations)
+        if next_bound == math.inf:
+            break  # Every path has been exhausted
+        bound = int(next_bound)
+
+    raise RuntimeError("No solution found")
@@ -0,0 +1,459 @@
+"""Last layer algorithm index.
+
+Once the first two layers are solved, the state of the last (top) layer is one of
+62208 cases: the permutation and orientation of its four corners and four edges.
+`CaseIndex` maps each case to an algorithm that solves it, so finishing a solve is a
+lookup rather than a search.
+
+The algorithms are generated offline by a uniform cost breadth-first search over the
+last layer states, where the moves are U turns and a set of short algorithms that
+keep the first two layers solved, such as Sune and the T permutation, along with
+their inverses. Corners and edges move independently, so the search steps through
+small transition tables for each algorithm rather than moving cubes. The search
+finds the shortest combination of the algorithms for every case, this is short
+rather than optimal.
+
+Turning U before or after an algorithm is free, so the cases are normalised by those
+AUF (adjust U face) turns: the key of a case is the smallest coordinate of the case
+with any U turns before and after it. This leaves 3916 cases. They are written to a
+compact open addressing hash table keyed by the canonical coordinate, which is read
+through `mmap`, so a lookup is a hash probe.
+
+"""
+
+from __future__ import annotations
+
+import argparse
+import mmap
+import os
+import struct
+import time
+from collections import defaultdict
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from py_rubiks.cube import MOVES, Cube, FaceRef, Move
+from py_rubiks.cubie import (
+    MOVE_CUBES,
+    SOLVED_CUBIE,
+    CubieCube,
+    perm_from_rank,
+    perm_rank,
+)
+from py_rubiks.notation import parse_moves
+from py_rubiks.tables import CACHE_VERSION, default_cache_dir
+
+
+# Short algorithms that keep the first two layers solved, the search combines these
+# and their inverses with U turns
+LAST_LAYER_ALGORITHMS = (
+    "R U R' U R U2 R'",  # Sune
+    "L' U' L U' L' U2 L",  # Left Sune
+    "F R U R' U' F'",
+    "F' L' U' L U F",
+    "R U R' U' R' F R F'",
+    "R' U' R' F R F' U R",
+    "F R U R' U' R U R' U' F'",
+    "R U2 R' U' R U R' U' R U' R'",
+    "R U2 R2 U' R2 U' R2 U2 R",
+    "R2 D R' U2 R D' R' U2 R'",
+    "R U' L' U R' U' L",  # Niklas
+    "R U' R U R U R U' R' U' R2",  # Ua permutation
+    "R U R' U' R' F R2 U' R' U' R U R' F'",  # T permutation
+    "R U R' F' R U R' U' R' F R2 U' R'",  # Jb permutation
+    "F R U' R' U' R U R' F' R U R' U' R' F R F'",  # Y permutation
+)
+
+# Coordinates of the four corners and four edges of the last layer, the rank of
+# their permutation then the orientations of the first three pieces, the last one
+# follows from them
+N_LL_CORNERS = 24 * 3 ** 3
+N_LL_EDGES = 24 * 2 ** 3
+
+INDEX_MAGIC = b"PYRUBLLI"
+_HEADER = struct.Struct("<8sIII")  # magic, version, number of slots, number of cases
+_SLOT = struct.Struct("<IIBB")  # key, offset of the moves, number of moves, U turns
+_DATA_OFFSET = 64
+_EMPTY = 0xFFFFFFFF
+
+_U_MOVES = tuple(Move(FaceRef.U, steps) for steps in range(1, 4))
+
+# The last layer state of a piece type, its permutation and orientation
+_Pieces = Tuple[Tuple[int, ...], Tuple[int, ...]]
+
+
+def _encode(pieces: _Pieces, modulus: int) -> int:
+    perm, orientation = pieces
+    coord = perm_rank(perm)
+    for twist in orientation[:3]:
+        coord = coord * modulus + twist
+    return coord
+
+
+def _decode(coord: int, modulus: int) -> _Pieces:
+    rank, coord = divmod(coord, modulus ** 3)
+    orientation = []
+    for _ in range(3):
+        coord, twist = divmod(coord, modulus)
+        orientation.append(twist)
+    orientation.reverse()
+    orientation.append(-sum(orientation) % modulus)
+    return perm_from_rank(rank, 4), tuple(orientation)
+
+
+def _multiply(first: _Pieces, second: _Pieces, modulus: int) -> _Pieces:
+    """Return the state reached by applying `second` to `first`."""
+    perm, orientation = first
+    return (
+        tuple(perm[idx] for idx in second[0]),
+        tuple(
+            (orientation[idx] + twist) % modulus
+            for idx, twist in zip(second[0], second[1])
+        ),
+    )
+
+
+def _split(cubie: CubieCube) -> Tuple[_Pieces, _Pieces]:
+    """Return the last layer corners and edges of `cubie`.
+
+    Raises:
+        ValueError: If the first two layers are not solved.
+
+    """
+    if (
+        cubie.cp[4:] != SOLVED_CUBIE.cp[4:]
+        or cubie.ep[4:] != SOLVED_CUBIE.ep[4:]
+        or any(cubie.co[4:])
+        or any(cubie.eo[4:])
+    ):
+        raise ValueError("The first two layers are not solved")
+    return (cubie.cp[:4], cubie.co[:4]), (cubie.ep[:4], cubie.eo[:4])
+
+
+def _transition_tables(cubie: CubieCube) -> Tuple[List[int], List[int]]:
+    """Return the corner and edge coordinates after applying `cubie` to each one."""
+    corners, edges = _split(cubie)
+    return (
+        [
+            _encode(_multiply(_decode(coord, 3), corners, 3), 3)
+            for coord in range(N_LL_CORNERS)
+        ],
+        [
+            _encode(_multiply(_decode(coord, 2), edges, 2), 2)
+            for coord in range(N_LL_EDGES)
+        ],
+    )
+
+
+@lru_cache(maxsize=None)
+def _auf_tables() -> Tuple[List[List[int]], ...]:
+    """Return the corner and edge coordinates with U turns before and after.
+
+    The tables are indexed by the number of quarter turns, then by coordinate.
+
+    """
+    before_corners, before_edges, after_corners, after_edges = [], [], [], []
+    for steps in range(4):
+        turn = _split(MOVE_CUBES[(FaceRef.U, steps)])
+        before_corners.append(
+            [
+                _encode(_multiply(turn[0], _decode(coord, 3), 3), 3)
+                for coord in range(N_LL_CORNERS)
+            ]
+        )
+        before_edges.append(
+            [
+                _encode(_multiply(turn[1], _decode(coord, 2), 2), 2)
+                for coord in range(N_LL_EDGES)
+            ]
+        )
+        after_corners.append(
+            [
+                _encode(_multiply(_decode(coord, 3), turn[0], 3), 3)
+                for coord in range(N_LL_CORNERS)
+            ]
+        )
+        after_edges.append(
+            [
+                _encode(_multiply(_decode(coord, 2), turn[1], 2), 2)
+                for coord in range(N_LL_EDGES)
+            ]
+        )
+    return before_corners, before_edges, after_corners, after_edges
+
+
+def _canonical(corners: int, edges: int) -> Tuple[int, int, int]:
+    """Return the key of a case and the U turns before and after that reach it."""
+    before_corners, before_edges, after_corners, after_edges = _auf_tables()
+    return min(
+        (
+            after_corners[after][before_corners[before][corners]] * N_LL_EDGES
+            + after_edges[after][before_edges[before][edges]],
+            before,
+            after,
+        )
+        for before in range(4)
+        for after in range(4)
+    )
+
+
+def case_key(cubie: CubieCube) -> int:
+    """Return the canonical coordinate of the last layer case of `cubie`.
+
+    Cases that differ only by U turns before or after them have the same key.
+
+    Raises:
+        ValueError: If the first two layers are not solved.
+
+    """
+    corners, edges = _split(cubie)
+    return _canonical(_encode(corners, 3), _encode(edges, 2))[0]
+
+
+def _simplify(moves: Sequence[Move]) -> List[Move]:
+    """Return `moves` with consecutive turns of the same face merged."""
+    result: List[Move] = []
+    for move in moves:
+        if result and result[-1].face_ref == move.face_ref:
+            steps = (result.pop().steps + move.steps) % 4
+            if steps:
+                result.append(Move(move.face_ref, steps))
+        else:
+            result.append(move)
+    return result
+
+
+def _u_turns(steps: int) -> List[Move]:
+    return [Move(FaceRef.U, steps % 4)] if steps % 4 else []
+
+
+def _hash_slot(key: int, mask: int) -> int:
+    # Fibonacci hashing, the coordinates are dense so spread them out
+    return (key * 0x9E3779B1 & 0xFFFFFFFF) & mask
+
+
+def _search(algorithms: Sequence[str]) -> Dict[int, Tuple[List[Move], int]]:
+    """Return the moves for each state, and the U turns that they finish with.
+
+    The states are keyed by `corners * N_LL_EDGES + edges`.
+
+    Raises:
+        ValueError: If an algorithm does not keep the first two layers solved.
+
+    """
+    generators: List[Tuple[List[Move], List[int], List[int]]] = []
+    for text in algorithms:
+        moves = parse_moves(text)
+        inverse = [move.reverse() for move in reversed(moves)]
+        for sequence in (moves, inverse):
+            cubie = SOLVED_CUBIE
+            for move in sequence:
+                cubie = cubie.rotate_layer(move.face_ref, move.steps)
+            try:
+                generators.append((sequence, *_transition_tables(cubie)))
+            except ValueError:
+                raise ValueError(f"{text} does not keep the first two layers") from None
+    for move in _U_MOVES:
+        cubie = MOVE_CUBES[(move.face_ref, move.steps)]
+        generators.append(([move], *_transition_tables(cubie)))
+
+    # Uniform cost search from the U turns of the solved state, with a bucket per
+    # number of moves. Each state records the generator that reached it and the state
+    # that it was reached from, or the U turns if it is a start state.
+    parents: Dict[int, Tuple[int, int]] = {}
+    buckets: Dict[int, List[Tuple[int, int, int]]] = defaultdict(list)
+    for steps in range(4):
+        turn = _split(MOVE_CUBES[(FaceRef.U, steps)])
+        buckets[0].append(
+            (_encode(turn[0], 3) * N_LL_EDGES + _encode(turn[1], 2), -1, steps)
+        )
+    cost = 0
+    while buckets:
+        for state, generator, parent in buckets.pop(cost, ()):
+            if state in parents:
+                continue
+            parents[state] = (generator, parent)
+            corners, edges = divmod(state, N_LL_EDGES)
+            for idx, (moves, corner_table, edge_table) in enumerate(generators):
+                successor = corner_table[corners] * N_LL_EDGES + edge_table[edges]
+                if successor not in parents:
+                    buckets[cost + len(moves)].append((successor, idx, state))
+        cost += 1
+
+    # Following the parents from a state gives the generators that reach it from a U
+    # turn of the solved state, their inverses in reverse order solve it
+    solutions = {}
+    for state in parents:
+        solution: List[Move] = []
+        generator, parent = parents[state]
+        while generator >= 0:
+            solution.extend(
+                move.reverse() for move in reversed(generators[generator][0])
+            )
+            generator, parent = parents[parent]
+        solutions[state] = (solution, parent)
+    return solutions
+
+
+def build_case_index(
+    path: Path, algorithms: Sequence[str] = LAST_LAYER_ALGORITHMS
+) -> None:
+    """Build the index of every last layer case and write it to `path`.
+
+    Args:
+        path: Where to write the index.
+        algorithms: The algorithms that the search combines, in standard notation.
+
+    Raises:
+        ValueError: If an algorithm does not keep the first two layers solved.
+
+    """
+    cases: Dict[int, Tuple[List[Move], int]] = {}
+    for state, (moves, finish) in _search(algorithms).items():
+        key, before, after = _canonical(*divmod(state, N_LL_EDGES))
+        # The state with U turns before and after is the key's state, the moves for
+        # the key's state undo the turn after and then solve this state
+        moves = _simplify(_u_turns(-after) + moves)
+        if key not in cases or len(moves) < len(cases[key][0]):
+            cases[key] = (moves, (before + finish) % 4)
+
+    capacity = 1 << (2 * len(cases) - 1).bit_length()
+    slots = [(_EMPTY, 0, 0, 0)] * capacity
+    data = bytearray()
+    for key, (moves, finish) in sorted(cases.items()):
+        slot = _hash_slot(key, capacity - 1)
+        while slots[slot][0] != _EMPTY:
+            slot = (slot + 1) & (capacity - 1)
+        slots[slot] = (key, len(data), len(moves), finish)
+        data.extend(MOVES.index(move) for move in moves)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with tmp_path.open("wb") as handle:
+        header = _HEADER.pack(INDEX_MAGIC, CACHE_VERSION, capacity, len(cases))
+        handle.write(header.ljust(_DATA_OFFSET, b"\0"))
+        for slot_values in slots:
+            handle.write(_SLOT.pack(*slot_values))
+        handle.write(data)
+    os.chmod(tmp_path, 0o644)
+    os.replace(tmp_path, path)
+
+
+class CaseIndex:
+    """A read-only, memory-mapped index of the last layer cases."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        with path.open("rb") as handle:
+            self._mmap = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        header = self._mmap[: _HEADER.size].ljust(_HEADER.size, b"\0")
+        magic, version, self._capacity, self._cases = _HEADER.unpack(header)
+        if magic != INDEX_MAGIC or version != CACHE_VERSION:
+            self._mmap.close()
+            raise ValueError(f"{path} is not a version {CACHE_VERSION} case index")
+        self._moves_offset = _DATA_OFFSET + self._capacity * _SLOT.size
+
+    def __len__(self) -> int:
+        return self._cases
+
+    def items(self) -> Iterator[Tuple[int, List[Move], int]]:
+        """Yield the key, moves and U turns of every case, as for `find`."""
+        for slot in range(self._capacity):
+            key, offset, length, finish = _SLOT.unpack_from(
+                self._mmap, _DATA_OFFSET + slot * _SLOT.size
+            )
+            if key != _EMPTY:
+                yield key, self._moves(offset, length), finish
+
+    def _moves(self, offset: int, length: int) -> List[Move]:
+        start = self._moves_offset + offset
+        return [MOVES[idx] for idx in self._mmap[start : start + length]]
+
+    def find(self, key: int) -> Optional[Tuple[List[Move], int]]:
+        """Return the moves for the case with `key` and the U turns they finish with.
+
+        The moves solve the case's canonical state apart from the U turns.
+
+        """
+        mask = self._capacity - 1
+        slot = _hash_slot(key, mask)
+        while True:
+            slot_key, offset, length, finish = _SLOT.unpack_from(
+                self._mmap, _DATA_OFFSET + slot * _SLOT.size
+            )
+            if slot_key == key:
+                return self._moves(offset, length), finish
+            if slot_key == _EMPTY:
+                return None
+            slot = (slot + 1) & mask
+
+    def lookup(self, cubie: CubieCube) -> List[Move]:
+        """Return the moves that solve `cubie`, whose first two layers are solved.
+
+        Raises:
+            ValueError: If the first two layers are not solved.
+            KeyError: If the case is not in the index.
+
+        """
+        corners, edges = _split(cubie)
+        key, before, after = _canonical(_encode(corners, 3), _encode(edges, 2))
+        found = self.find(key)
+        if found is None:
+            raise KeyError(key)
+        moves, finish = found
+        # The turn after reaches the key's state apart from the turn before, which is
+        # left over at the end along with the key's own U turns
+        return _simplify(_u_turns(after) + moves + _u_turns(before - finish))
+
+    def close(self) -> None:
+        self._mmap.close()
+
+
+@lru_cache(maxsize=None)
+def get_case_index(cache_dir: Optional[Path] = None) -> CaseIndex:
+    """Return the last layer index, building and caching it if needed."""
+    path = (cache_dir or default_cache_dir()) / f"last_layer.v{CACHE_VERSION}.lli"
+    try:
+        return CaseIndex(path)
+    except (OSError, ValueError, struct.error):
+        pass  # Missing, stale or corrupt, rebuild it
+    build_case_index(path)
+    return CaseIndex(path)
+
+
+def solve_last_layer(cube: Cube, cache_dir: Optional[Path] = None) -> List[Move]:
+    """Return the moves that solve `cube`, whose first two layers are solved.
+
+    The faces are identified by their centre colours, the last layer is U.
+
+    Raises:
+        ValueError: If `cube` is not a solvable state or its first two layers are
+            not solved.
+
+    """
+    return get_case_index(cache_dir).lookup(CubieCube.from_cube(cube))
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--cache-dir", type=Path, help="Defaults to the cache")
+    args = parser.parse_args(argv)
+
+    path = (args.cache_dir or default_cache_dir()) / f"last_layer.v{CACHE_VERSION}.lli"
+    start = time.monotonic()
+    build_case_index(path)
+    elapsed = time.monotonic() - start
+
+    index = CaseIndex(path)
+    lengths = [len(moves) for _, moves, _ in index.items()]
+    print(
+        f"{len(index)} cases in {elapsed:.1f}s, {path.stat().st_size} bytes, "
+        f"{sum(lengths) / len(lengths):.1f} moves on average and {max(lengths)} at "
+        f"most, written to {path}"
+    )
+    index.close()
+
+
+if __name__ == "__main__":
+    main()
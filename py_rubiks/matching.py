@@ -0,0 +1,186 @@
+"""Compiled wildcard patterns.
+
+A pattern is a `Cube` where `"*"` stickers match any colour, as for
+`Cube.fuzzy_match`. Compiling it gives each colour a one byte code, see
+`ColourCodes`, and packs the 54 sticker codes into a single integer, along with a
+care mask that has `0xFF` bytes where the pattern is not a wildcard. A state matches
+when its packed codes agree with the pattern's under the care mask, a couple of
+integer operations.
+
+`PatternIndex` holds many patterns sharing one colour coding. Patterns with the same
+care mask, such as the same partial pattern in different colours, are grouped and
+looked up by the masked state in a `dict`, so a state is matched against all of them
+with one lookup per distinct care mask.
+
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Generic, Hashable, List, Optional, Tuple, TypeVar
+
+import attr
+
+from py_rubiks.cube import STICKER_COUNT, Cube
+
+
+WILDCARD = "*"
+
+# Colour codes are single bytes, 0 is for colours without a code and 0xFF is for
+# wildcards
+MAX_COLOURS = 0xFE
+_UNKNOWN = 0
+_WILDCARD_CODE = 0xFF
+
+# Maps wildcard codes to 0x00 and every other code to 0xFF
+_CARE_TABLE = bytes([0xFF] * _WILDCARD_CODE + [0x00])
+
+Key = TypeVar("Key", bound=Hashable)
+
+
+class ColourCodes:
+    """The one byte code of each colour, shared by the patterns it compiles."""
+
+    def __init__(self) -> None:
+        self._codes: Dict[str, int] = {}
+        # Translates single character colours straight from `Cube.state_str`
+        self._table = bytearray(256)
+        self._table[ord(WILDCARD)] = _WILDCARD_CODE
+
+    def __len__(self) -> int:
+        return len(self._codes)
+
+    def add(self, colour: str) -> None:
+        """Give `colour` the next free code if it does not have one.
+
+        Raises:
+            ValueError: If there are already `MAX_COLOURS` colours.
+
+        """
+        if colour == WILDCARD or colour in self._codes:
+            return
+        if len(self._codes) >= MAX_COLOURS:
+            raise ValueError(f"More than {MAX_COLOURS} colours")
+        code = self._codes[colour] = len(self._codes) + 1
+        if len(colour) == 1 and ord(colour) < 256:
+            self._table[ord(colour)] = code
+
+    def encode(self, cube: Cube) -> bytes:
+        """Return the code of each sticker, `_UNKNOWN` for colours without a code."""
+        text = cube.state_str
+        if len(text) == STICKER_COUNT and "" not in cube.stickers:
+            try:
+                return text.encode("latin-1").translate(self._table)
+            except UnicodeEncodeError:
+                pass
+        codes = self._codes
+        return bytes(
+            _WILDCARD_CODE if sticker == WILDCARD else codes.get(sticker, _UNKNOWN)
+            for sticker in cube.stickers
+        )
+
+
+def _pack(data: bytes) -> Tuple[int, Optional[int]]:
+    """Return the packed codes and, if there are wildcards, the care mask."""
+    value = int.from_bytes(data, "little")
+    if _WILDCARD_CODE not in data:
+        return value, None
+    care = int.from_bytes(data.translate(_CARE_TABLE), "little")
+    return value & care, care
+
+
+@attr.s(auto_attribs=True, frozen=True, slots=True)
+class CubePattern:
+    """A wildcard `Cube` compiled for matching.
+
+    Attributes:
+        cube: The pattern.
+        value: The packed colour codes, zero where the pattern has a wildcard.
+        care: `0xFF` bytes where the pattern is not a wildcard.
+
+    """
+
+    cube: Cube
+    value: int
+    care: int
+    _codes: ColourCodes = attr.ib(eq=False, repr=False)
+
+    @classmethod
+    def compile(cls, cube: Cube, codes: Optional[ColourCodes] = None) -> CubePattern:
+        """Compile `cube` as a pattern.
+
+        Args:
+            cube: The pattern, `"*"` stickers match anything.
+            codes: The colour codes to share with other patterns, new colours are
+                added to it.
+
+        Raises:
+            ValueError: If there are more than `MAX_COLOURS` colours.
+
+        """
+        codes = ColourCodes() if codes is None else codes
+        for colour in set(cube.stickers):
+            codes.add(colour)
+        value, care = _pack(codes.encode(cube))
+        if care is None:
+            care = (1 << (8 * STICKER_COUNT)) - 1
+        return cls(cube, value, care, codes)
+
+    def matches(self, cube: Cube) -> bool:
+        """Return `True` if `cube` matches, as `cube.fuzzy_match(self.cube)`."""
+        value, care = _pack(self._codes.encode(cube))
+        if care is None:
+            return not (value ^ self.value) & self.care
+        return not (value ^ self.value) & self.care & care
+
+
+class PatternIndex(Generic[Key]):
+    """Matches a state against many patterns at once.
+
+    Each pattern is added with a key, `match` returns the keys of the patterns that
+    a state matches in the order that they were added.
+
+    """
+
+    def __init__(self) -> None:
+        self._codes = ColourCodes()
+        self._patterns: List[CubePattern] = []
+        self._keys: List[Key] = []
+        # Care mask -> masked value -> the indices of the patterns
+        self._groups: Dict[int, Dict[int, List[int]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._patterns)
+
+    def add(self, pattern: Cube, key: Key) -> None:
+        """Add a pattern, `"*"` stickers match anything.
+
+        Raises:
+            ValueError: If the patterns use more than `MAX_COLOURS` colours.
+
+        """
+        compiled = CubePattern.compile(pattern, self._codes)
+        self._groups.setdefault(compiled.care, {}).setdefault(
+            compiled.value, []
+        ).append(len(self._patterns))
+        self._patterns.append(compiled)
+        self._keys.append(key)
+
+    def match(self, cube: Cube) -> List[Key]:
+        """Return the keys of the patterns that `cube` matches."""
+        value, care = _pack(self._codes.encode(cube))
+        if care is not None:
+            # The state's own wildcards match anything, check every pattern
+            matched = [
+                idx
+                for idx, pattern in enumerate(self._patterns)
+                if not (value ^ pattern.value) & pattern.care & care
+            ]
+        else:
+            matched = []
+            for pattern_care, by_value in self._groups.items():
+                indices = by_value.get(value & pattern_care)
+                if indices:
+                    matched.extend(indices)
+            matched.sort()
+        keys = self._keys
+        return [keys[idx] for idx in matched]
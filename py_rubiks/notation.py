@@ -0,0 +1,50 @@
+"""Standard move notation.
+
+A move is a face letter, `F R B L U D`, optionally followed by `2` for a half turn or
+`'` for an anticlockwise quarter turn, for example `R U R' U2`. Turns are clockwise
+looking at the face, as for `Move.steps`. The typographic prime `’` is accepted as
+well as `'`, and `R2'` is the same as `R2`.
+
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Iterable, List
+
+from py_rubiks.cube import FaceRef, Move
+
+
+_SUFFIX_STEPS = {"": 1, "2": 2, "2'": 2, "2’": 2, "'": 3, "’": 3}
+_STEPS_SUFFIX = {1: "", 2: "2", 3: "'"}
+
+_TOKEN = re.compile(r"\s*([FRBLUD])(2['’]|2|['’]|)")
+
+
+def parse_moves(text: str) -> List[Move]:
+    """Return the moves of a sequence in standard notation.
+
+    Whitespace between moves is optional.
+
+    Raises:
+        ValueError: If `text` is not a valid sequence.
+
+    """
+    moves = []
+    position = 0
+    end = len(text.rstrip())
+    while position < end:
+        match = _TOKEN.match(text, position)
+        if not match:
+            raise ValueError(f"Invalid move at position {position} of {text!r}")
+        face, suffix = match.groups()
+        moves.append(Move(FaceRef[face], _SUFFIX_STEPS[suffix]))
+        position = match.end()
+    return moves
+
+
+def format_moves(moves: Iterable[Move]) -> str:
+    """Return a move sequence in standard notation, separated by spaces."""
+    return " ".join(
+        f"{move.face_ref.name}{_STEPS_SUFFIX[move.steps]}" for move in moves
+    )
@@ -0,0 +1,109 @@
+"""Optimal solver.
+
+IDA* with the maximum of several pattern database lookups as the heuristic, as in
+Korf's "Finding Optimal Solutions to Rubik's Cube Using Pattern Databases". Every
+database is an admissible heuristic so their maximum is too, and the first solution
+found is as short as possible in the half turn metric.
+
+The search state is the stickers along with the index of each pattern, the pattern
+indices follow the moves through their move tables so each node costs one lookup per
+database rather than a `CubieCube` conversion.
+
+With the default databases the corner database alone has 88 million entries, building
+it takes a while the first time it is needed, after that it is loaded from the cache.
+
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Callable, Iterable, Optional, Sequence, Tuple
+
+from py_rubiks.cube import CANONICAL_NEXT_MOVES, MOVE_GETTERS, MOVES, Cube, Move
+from py_rubiks.cubie import CubieCube
+from py_rubiks.ida import Iteration, SearchResult, ida_star
+from py_rubiks.pattern_db import (
+    CORNERS,
+    EDGES_FIRST_HALF,
+    EDGES_SECOND_HALF,
+    Pattern,
+    get_pattern_database,
+)
+
+
+KORF_PATTERNS: Tuple[Pattern, ...] = (CORNERS, EDGES_FIRST_HALF, EDGES_SECOND_HALF)
+
+# God's number, every state can be solved in this many moves
+MAX_OPTIMAL_LENGTH = 20
+
+_State = Tuple[Tuple[str, ...], Tuple[int, ...]]
+
+
+def solve_optimal(
+    cube: Cube,
+    patterns: Sequence[Pattern] = KORF_PATTERNS,
+    timeout: Optional[float] = None,
+    cache_dir: Optional[Path] = None,
+    workers: Optional[int] = None,
+    on_iteration: Optional[Callable[[Iteration], None]] = None,
+) -> SearchResult:
+    """Return a shortest solution of `cube` along with the search stats.
+
+    Args:
+        cube: The state to solve, the faces are identified by their centre colours.
+        patterns: The pattern databases to take the maximum of.
+        timeout: Give up after this many seconds.
+        cache_dir: The cache directory for the pattern databases.
+        workers: The number of processes used to build missing pattern databases.
+        on_iteration: Called with the stats of each iteration as it completes.
+
+    Raises:
+        ValueError: If `cube` is not a solvable state.
+        SearchTimeout: If the search runs out of time.
+
+    """
+    cubie = CubieCube.from_cube(cube)
+    patterns = tuple(patterns)
+    databases = [
+        get_pattern_database(pattern, cache_dir, workers) for pattern in patterns
+    ]
+    for pattern in patterns:
+        pattern.prepare(cache_dir)
+
+    centres = [cube.stickers[offset + 4] for offset in range(0, 54, 9)]
+    solved = tuple(centre for centre in centres for _ in range(9))
+
+    def heuristic(state: _State) -> int:
+        return max(
+            (database[index] for database, index in zip(databases, state[1])),
+            default=0,
+        )
+
+    def is_goal(state: _State) -> bool:
+        return state[0] == solved
+
+    def successors(
+        state: _State, last_move: Optional[Move]
+    ) -> Iterable[Tuple[Move, _State]]:
+        stickers, indices = state
+        moved = [
+            pattern.successors(index, cache_dir)
+            for pattern, index in zip(patterns, indices)
+        ]
+        last_face = last_move.face_ref if last_move else None
+        for move_idx in CANONICAL_NEXT_MOVES[last_face]:
+            yield MOVES[move_idx], (
+                MOVE_GETTERS[move_idx](stickers),
+                tuple(indices_after[move_idx] for indices_after in moved),
+            )
+
+    start = (cube.stickers, tuple(pattern.index(cubie) for pattern in patterns))
+    return ida_star(
+        start,
+        heuristic=heuristic,
+        successors=successors,
+        is_goal=is_goal,
+        max_depth=MAX_OPTIMAL_LENGTH,
+        on_iteration=on_iteration,
+        timeout=timeout,
+    )
@@ -0,0 +1,225 @@
+"""Parallel IDA* over the subtrees below a shallow split.
+
+Each iteration expands the top `split_depth` levels of the search tree in the current
+process and hands the subtrees below to a pool of worker processes, which search them
+with the iteration's bound. The iteration's stats are the totals over every subtree,
+so they match a sequential search that visited the same nodes.
+
+As soon as a worker finds a solution an event shared with all the workers is set,
+the subtrees that have not started are cancelled and the running ones stop at their
+next check. Any solution within the bound is as short as the sequential one.
+
+The heuristic, successor and goal functions are sent to the workers, so they must be
+picklable, for example module level functions or `OrientationHeuristic`.
+
+"""
+
+from __future__ import annotations
+
+import math
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing.synchronize import Event
+from typing import Any, Callable, List, Optional, Tuple
+
+from py_rubiks.cube import Move
+from py_rubiks.ida import (
+    GoalTest,
+    Heuristic,
+    Iteration,
+    SearchResult,
+    SearchTimeout,
+    Successors,
+    bounded_search,
+    cube_successors,
+    is_solved,
+    zero_heuristic,
+)
+
+
+# Workers check the cancel event once every this many expanded states
+_CHECK_INTERVAL = 256
+
+_Subtree = Tuple[List[Move], Any, Optional[Move]]  # path from the start, state, move
+
+_cancelled: Optional[Event] = None
+
+
+class _Cancelled(Exception):
+    """Raised with the number of nodes generated to unwind a cancelled subtree."""
+
+
+def _init_worker(cancelled: Event) -> None:
+    global _cancelled
+    _cancelled = cancelled
+
+
+def _search_subtree(
+    start: Any,
+    bound: int,
+    heuristic: Heuristic,
+    successors: Successors,
+    is_goal: GoalTest,
+    depth: int,
+    last_move: Optional[Move],
+) -> Tuple[Optional[List[Move]], int, float]:
+    """Run `bounded_search` in a worker, returning no solution once cancelled."""
+    # Queued subtrees can not always be cancelled, they are skipped here instead
+    if _cancelled and _cancelled.is_set():
+        return None, 0, math.inf
+    expansions = 0
+
+    def check(nodes: int) -> None:
+        nonlocal expansions
+        expansions += 1
+        if expansions % _CHECK_INTERVAL == 0 and _cancelled and _cancelled.is_set():
+            raise _Cancelled(nodes)
+
+    try:
+        return bounded_search(
+            start, bound, heuristic, successors, is_goal, depth, last_move, check
+        )
+    except _Cancelled as cancelled:
+        return None, cancelled.args[0], math.inf
+
+
+def _split(
+    start: Any,
+    bound: int,
+    heuristic: Heuristic,
+    successors: Successors,
+    is_goal: GoalTest,
+    split_depth: int,
+) -> Tuple[Optional[List[Move]], List[_Subtree], int, float]:
+    """Expand the tree to `split_depth`.
+
+    Returns:
+        The path to a goal found above the split or `None`, the subtrees at the split,
+        the number of nodes generated and the smallest estimate that went over the
+        bound.
+
+    """
+    subtrees: List[_Subtree] = []
+    path: List[Move] = []
+    nodes = 0
+    next_bound = math.inf
+
+    def expand(state: Any, depth: int, last_move: Optional[Move]) -> bool:
+        nonlocal nodes, next_bound
+        estimate = depth + heuristic(state)
+        if estimate > bound:
+            if estimate < next_bound:
+                next_bound = estimate
+            return False
+        if is_goal(state):
+            return True
+        for move, successor in successors(state, last_move):
+            nodes += 1
+            path.append(move)
+            if depth + 1 == split_depth:
+                subtrees.append((path[:], successor, move))
+            elif expand(successor, depth + 1, move):
+                return True
+            path.pop()
+        return False
+
+    found = expand(start, 0, None)
+    return (path if found else None), subtrees, nodes, next_bound
+
+
+def parallel_ida_star(
+    start: Any,
+    heuristic: Heuristic = zero_heuristic,
+    successors: Successors = cube_successors,
+    is_goal: GoalTest = is_solved,
+    max_depth: int = 30,
+    on_iteration: Optional[Callable[[Iteration], None]] = None,
+    timeout: Optional[float] = None,
+    workers: Optional[int] = None,
+    split_depth: int = 2,
+) -> SearchResult:
+    """Return the moves from `start` to a goal state using several processes.
+
+    Args:
+        start, heuristic, successors, is_goal, max_depth, on_iteration, timeout: As
+            for `ida_star`.
+        workers: The number of worker processes, defaults to the number of CPUs.
+        split_depth: The depth of the subtrees handed to the workers, there are about
+            `15 ** split_depth` of them.
+
+    Raises:
+        RuntimeError: If there is no solution within `max_depth` moves.
+        SearchTimeout: If there is no solution within `timeout` seconds.
+
+    """
+    workers = workers or os.cpu_count() or 1
+    deadline = time.monotonic() + timeout if timeout is not None else math.inf
+    iterations: List[Iteration] = []
+    cancelled = multiprocessing.Event()
+    executor = ProcessPoolExecutor(
+        workers, initializer=_init_worker, initargs=(cancelled,)
+    )
+    try:
+        bound = heuristic(start)
+        while bound <= max_depth:
+            start_time = time.monotonic()
+            path, subtrees, nodes, next_bound = _split(
+                start, bound, heuristic, successors, is_goal, split_depth
+            )
+            pending = {
+                executor.submit(
+                    _search_subtree,
+                    state,
+                    bound,
+                    heuristic,
+                    successors,
+                    is_goal,
+                    split_depth,
+                    last_move,
+                ): subtree_path
+                for subtree_path, state, last_move in subtrees
+            }
+            timed_out = False
+            while pending and path is None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    timed_out = True
+                    break
+                done, _ = wait(
+                    pending,
+                    timeout=remaining if remaining != math.inf else None,
+                    return_when=FIRST_COMPLETED,
+                )
+                for future in done:
+                    subtree_path = pending.pop(future)
+                    found, subtree_nodes, subtree_bound = future.result()
+                    nodes += subtree_nodes
+                    next_bound = min(next_bound, subtree_bound)
+                    if found is not None and path is None:
+                        path = subtree_path + found
+            if pending:
+                # Stop the remaining subtrees, waiting for the running ones to notice
+                cancelled.set()
+                for future in pending:
+                    if not future.cancel():
+                        nodes += future.result()[1]
+                cancelled.clear()
+
+            iteration = Iteration(bound, nodes, time.monotonic() - start_time)
+            iterations.append(iteration)
+            if timed_out:
+                raise SearchTimeout(iterations)
+            if on_iteration:
+                on_iteration(iteration)
+            if path is not None:
+                return SearchResult(path, iterations)
+            if next_bound == math.inf:
+                break  # Every path has been exhausted
+            bound = int(next_bound)
+    finally:
+        cancelled.set()
+        executor.shutdown(cancel_futures=True)
+
+    raise RuntimeError("No solution found")
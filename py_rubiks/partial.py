@@ -0,0 +1,516 @@
+"""Solving to partial goals.
+
+A partial goal is a `Cube` pattern where `"*"` stickers may be any colour, as for
+`Cube.fuzzy_match`, such as the cross or the first two layers. `solve_partial` finds
+a shortest sequence of moves to a state that matches it.
+
+Only the pieces that the goal cares about are searched. A corner or edge position
+where the goal gives every sticker must hold one particular piece, and the search
+follows where that piece goes. A position where the goal gives only some of the
+stickers, such as the top sticker for oriented corners, just needs a piece with the
+right colour there, so the search follows every sticker of that colour on pieces of
+the same kind. The search state is the positions of the followed stickers, and the
+goal is a condition on those positions.
+
+The heuristic is the maximum of pruning tables generated for the goal. Each table
+covers a few of the followed pieces and gives the exact number of moves to bring
+just those pieces to the goal, found by a breadth-first search over their positions.
+A corner is covered along with edges next to it, such as a pair of the first two
+layers, as pieces that are solved together give a much closer bound than separate
+tables of corners and of edges.
+The tables are cached by goal, so solving many cubes to the same goal builds them
+once.
+
+"""
+
+from __future__ import annotations
+
+import time
+from collections import defaultdict
+from functools import lru_cache
+from typing import (
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+import attr
+
+from py_rubiks.algorithm import invert
+from py_rubiks.cube import (
+    CANONICAL_NEXT_MOVES,
+    FACE_AXES,
+    FACE_ORDER,
+    LAYER_PERMUTATIONS,
+    MOVES,
+    Cube,
+    FaceRef,
+    Move,
+    Stickers,
+)
+from py_rubiks.cubie import CORNER_FACES, CORNER_STICKERS, EDGE_FACES, EDGE_STICKERS
+from py_rubiks.ida import Iteration, SearchResult, ida_star
+from py_rubiks.matching import WILDCARD
+
+
+# Each pruning table follows at most this many whole pieces, a corner and two edges
+TABLE_PIECES = 3
+
+_SLOTS = CORNER_STICKERS + EDGE_STICKERS
+_SLOT_FACES = CORNER_FACES + EDGE_FACES
+_CENTRES = tuple(range(4, 54, 9))
+
+# `_DESTINATIONS[move_idx][idx]` is where `MOVES[move_idx]` takes the sticker at `idx`
+_DESTINATIONS = tuple(
+    invert(LAYER_PERMUTATIONS[(move.face_ref, move.steps)]) for move in MOVES
+)
+
+# A followed sticker is labelled by the kind of piece that it is on, the colours of
+# the piece if it is a particular piece and otherwise `()`, and its colour
+_Label = Tuple[str, Tuple[str, ...], str]
+
+# The sorted positions of the stickers with each label
+_State = Tuple[Tuple[int, ...], ...]
+
+
+def _kind(slot: Sequence[int]) -> str:
+    return "corner" if len(slot) == 3 else "edge"
+
+
+def _colour_pairs(
+    colours: Union[Mapping[str, str], Iterable[Tuple[str, str]]]
+) -> Tuple[Tuple[str, str], ...]:
+    return tuple(sorted(dict(colours).items()))
+
+
+@attr.s(auto_attribs=True, frozen=True, slots=True)
+class PartialGoal:
+    """A wildcard pattern to solve to.
+
+    Attributes:
+        pattern: The goal, `"*"` stickers match any colour.
+        colours: Maps cube colours to the colours of the pattern, so that several
+            colours can count as one, as `(colour, pattern_colour)` pairs. A mapping
+            can be passed. Colours that are not mapped are compared as they are.
+
+    """
+
+    pattern: Cube
+    colours: Tuple[Tuple[str, str], ...] = attr.ib(default=(), converter=_colour_pairs)
+
+    def recolour(self, stickers: Stickers) -> Stickers:
+        """Return `stickers` in the colours of the pattern."""
+        if not self.colours:
+            return stickers
+        colours = dict(self.colours)
+        return tuple(colours.get(sticker, sticker) for sticker in stickers)
+
+    def matches(self, cube: Cube) -> bool:
+        """Return `True` if `cube` has reached the goal."""
+        return Cube.from_stickers(self.recolour(cube.stickers)).fuzzy_match(
+            self.pattern
+        )
+
+
+@attr.s(auto_attribs=True, frozen=True, slots=True)
+class _CompiledGoal:
+    labels: Dict[_Label, int]
+    # The positions that must hold a sticker with each label
+    required: Tuple[FrozenSet[int], ...]
+    # The labels of each pruning table
+    chunks: Tuple[Tuple[int, ...], ...]
+    # The sorted colours of each piece that is followed as a whole
+    pieces: FrozenSet[Tuple[str, ...]]
+    # A pruning table for each chunk, keyed by chunk index
+    tables: Dict[int, Dict[_State, int]] = attr.ib(factory=dict)
+
+
+@lru_cache(maxsize=64)
+def _compile(goal: PartialGoal) -> _CompiledGoal:
+    pattern = goal.pattern.stickers
+    required: Dict[_Label, List[int]] = defaultdict(list)
+    pieces = set()
+    for slot in _SLOTS:
+        colours = tuple(pattern[idx] for idx in slot)
+        cared = [idx for idx in slot if pattern[idx] != WILDCARD]
+        if len(cared) == len(slot):
+            piece = tuple(sorted(colours))
+            if piece in pieces or len(set(piece)) < len(piece):
+                raise ValueError(f"The goal's {'/'.join(piece)} piece is ambiguous")
+            pieces.add(piece)
+            required[(_kind(slot), piece, colours[0])].append(slot[0])
+        else:
+            for idx in cared:
+                required[(_kind(slot), (), pattern[idx])].append(idx)
+
+    labels = {label: idx for idx, label in enumerate(required)}
+    return _CompiledGoal(
+        labels,
+        tuple(frozenset(positions) for positions in required.values()),
+        _chunks(labels),
+        frozenset(pieces),
+    )
+
+
+def _chunks(labels: Mapping[_Label, int]) -> Tuple[Tuple[int, ...], ...]:
+    """Return the labels of each pruning table.
+
+    Each corner followed as a whole shares a table with up to `TABLE_PIECES - 1` of
+    the whole edges that have two of its colours. Edges that are not yet in a table
+    are taken first, then those next to fewer corners, so a corner of the first two
+    layers is followed along with the edge of its slot and an edge of the cross. The
+    edges left over share tables, and each other label has a table to itself.
+
+    """
+    whole = {piece: idx for (_, piece, _), idx in labels.items() if piece}
+    corners = [piece for piece in whole if len(piece) == 3]
+    edges = [piece for piece in whole if len(piece) == 2]
+    neighbours = {
+        edge: sum(set(edge) <= set(corner) for corner in corners) for edge in edges
+    }
+    # An ordered set, so the leftover edges are grouped in slot order
+    unpaired = dict.fromkeys(edges)
+    chunks = []
+    for corner in corners:
+        paired = sorted(
+            (edge for edge in edges if set(edge) <= set(corner)),
+            key=lambda edge: (edge not in unpaired, neighbours[edge]),
+        )[: TABLE_PIECES - 1]
+        for edge in paired:
+            unpaired.pop(edge, None)
+        chunks.append(tuple(whole[piece] for piece in (corner, *paired)))
+    rest = [whole[edge] for edge in unpaired]
+    chunks.extend(
+        tuple(rest[start : start + TABLE_PIECES])
+        for start in range(0, len(rest), TABLE_PIECES)
+    )
+    chunks.extend((idx,) for (_, piece, _), idx in labels.items() if not piece)
+    return tuple(chunks)
+
+
+def _start_state(goal: PartialGoal, compiled: _CompiledGoal, cube: Cube) -> _State:
+    """Return the positions of the followed stickers of `cube`.
+
+    Raises:
+        ValueError: If `cube` cannot reach the goal.
+
+    """
+    stickers = goal.recolour(cube.stickers)
+    for idx in _CENTRES:
+        if goal.pattern.stickers[idx] not in (WILDCARD, stickers[idx]):
+            raise ValueError("The cube's centres do not match the goal")
+
+    positions: List[List[int]] = [[] for _ in compiled.labels]
+    for slot in _SLOTS:
+        colours = tuple(stickers[idx] for idx in slot)
+        piece = tuple(sorted(colours))
+        if piece not in compiled.pieces:
+            piece = ()
+        for idx, colour in zip(slot, colours):
+            label = compiled.labels.get((_kind(slot), piece, colour))
+            if label is not None:
+                positions[label].append(idx)
+
+    for (_, piece, _), found, needed in zip(
+        compiled.labels, positions, compiled.required
+    ):
+        # A whole piece is followed by one sticker, the others by every sticker that
+        # may fill the positions
+        expected = len(found) == 1 if piece else len(found) >= len(needed)
+        if not expected:
+            raise ValueError("The cube does not have the pieces of the goal")
+    return tuple(tuple(sorted(found)) for found in positions)
+
+
+def _move(state: _State, destinations: Sequence[int]) -> _State:
+    return tuple(
+        (destinations[entry[0]],)
+        if len(entry) == 1
+        else tuple(sorted([destinations[idx] for idx in entry]))
+        for entry in state
+    )
+
+
+def _is_goal(state: _State, required: Sequence[FrozenSet[int]]) -> bool:
+    for entry, needed in zip(state, required):
+        if not needed.issubset(entry):
+            return False
+    return True
+
+
+def build_pruning_table(
+    start: _State, required: Sequence[FrozenSet[int]]
+) -> Dict[_State, int]:
+    """Return the number of moves to the goal from every state reachable from `start`.
+
+    The reachable states are found by a breadth-first search from `start`, then the
+    distances by a breadth-first search back from the states that reach the goal.
+    Every move's inverse is also a move, so the searches use the same neighbours.
+
+    Args:
+        start: The positions of the followed stickers with each label.
+        required: The positions that must hold a sticker with each label.
+
+    Returns:
+        The distance of each state, `-1` if it cannot reach the goal.
+
+    """
+    index = {start: 0}
+    states = [start]
+    neighbours: List[List[int]] = []
+    for state in states:  # Grows as new states are found
+        found = []
+        for destinations in _DESTINATIONS:
+            successor = _move(state, destinations)
+            successor_idx = index.get(successor)
+            if successor_idx is None:
+                successor_idx = index[successor] = len(states)
+                states.append(successor)
+            found.append(successor_idx)
+        neighbours.append(found)
+
+    distances = [-1] * len(states)
+    frontier = [idx for idx, state in enumerate(states) if _is_goal(state, required)]
+    for idx in frontier:
+        distances[idx] = 0
+    depth = 0
+    while frontier:
+        depth += 1
+        next_frontier = []
+        for idx in frontier:
+            for successor_idx in neighbours[idx]:
+                if distances[successor_idx] < 0:
+                    distances[successor_idx] = depth
+                    next_frontier.append(successor_idx)
+        frontier = next_frontier
+    return dict(zip(states, distances))
+
+
+def _pruning_tables(
+    compiled: _CompiledGoal, state: _State
+) -> List[Tuple[Tuple[int, ...], Dict[_State, int]]]:
+    """Return the labels and table of each chunk, building any that are missing.
+
+    A cached table covers every state reachable from the one it was built from, a
+    state that is not in it cannot reach the states in it, so the table is rebuilt.
+
+    """
+    tables = []
+    for chunk_idx, chunk in enumerate(compiled.chunks):
+        chunk_state = tuple(state[label] for label in chunk)
+        table = compiled.tables.get(chunk_idx)
+        if table is None or chunk_state not in table:
+            table = compiled.tables[chunk_idx] = build_pruning_table(
+                chunk_state, [compiled.required[label] for label in chunk]
+            )
+        tables.append((chunk, table))
+    return tables
+
+
+def solve_partial(
+    cube: Cube,
+    goal: Union[Cube, PartialGoal],
+    max_depth: int = 20,
+    timeout: Optional[float] = None,
+    on_iteration: Optional[Callable[[Iteration], None]] = None,
+) -> SearchResult:
+    """Return a shortest sequence of moves that brings `cube` to a partial goal.
+
+    Args:
+        cube: The state to solve from.
+        goal: The goal, a pattern as for `Cube.fuzzy_match` or a `PartialGoal`.
+        max_depth: Give up once the bound goes over this.
+        timeout: Give up after this many seconds.
+        on_iteration: Called with the stats of each iteration as it completes.
+
+    Raises:
+        ValueError: If the goal is ambiguous or `cube` cannot reach it.
+        RuntimeError: If there is no solution within `max_depth` moves.
+        SearchTimeout: If there is no solution within `timeout` seconds.
+
+    """
+    if isinstance(goal, Cube):
+        goal = PartialGoal(goal)
+    compiled = _compile(goal)
+    start = _start_state(goal, compiled, cube)
+    tables = _pruning_tables(compiled, start)
+    for chunk, table in tables:
+        if table[tuple(start[label] for label in chunk)] < 0:
+            raise ValueError("The cube cannot reach the goal")
+
+    def heuristic(state: _State) -> int:
+        return max(
+            (table[tuple(state[label] for label in chunk)] for chunk, table in tables),
+            default=0,
+        )
+
+    def is_goal(state: _State) -> bool:
+        return _is_goal(state, compiled.required)
+
+    def successors(
+        state: _State, last_move: Optional[Move]
+    ) -> Iterable[Tuple[Move, _State]]:
+        last_face = last_move.face_ref if last_move else None
+        for move_idx in CANONICAL_NEXT_MOVES[last_face]:
+            yield MOVES[move_idx], _move(state, _DESTINATIONS[move_idx])
+
+    return ida_star(
+        start,
+        heuristic=heuristic,
+        successors=successors,
+        is_goal=is_goal,
+        max_depth=max_depth,
+        on_iteration=on_iteration,
+        timeout=timeout,
+    )
+
+
+def _opposite(face_ref: FaceRef) -> FaceRef:
+    return next(
+        other
+        for other in FACE_ORDER
+        if other != face_ref and FACE_AXES[other] == FACE_AXES[face_ref]
+    )
+
+
+def pieces_goal(
+    cube: Cube, keep: Callable[[Tuple[FaceRef, ...]], bool]
+) -> PartialGoal:
+    """Return the goal of solving some of the pieces, in the colours of `cube`.
+
+    Args:
+        cube: Gives the colour of each face by its centre.
+        keep: Given the faces of a corner or edge position, returns `True` if the
+            piece there must be solved.
+
+    """
+    stickers = [WILDCARD] * len(cube.stickers)
+    for idx in _CENTRES:
+        stickers[idx] = cube.stickers[idx]
+    for slot, faces in zip(_SLOTS, _SLOT_FACES):
+        if keep(faces):
+            for idx in slot:
+                stickers[idx] = cube.stickers[idx // 9 * 9 + 4]
+    return PartialGoal(Cube.from_stickers(tuple(stickers)))
+
+
+def cross_goal(cube: Cube, face_ref: FaceRef = FaceRef.D) -> PartialGoal:
+    """Return the goal of solving the edges around `face_ref`."""
+    return pieces_goal(cube, lambda faces: len(faces) == 2 and face_ref in faces)
+
+
+def first_two_layers_goal(cube: Cube, face_ref: FaceRef = FaceRef.D) -> PartialGoal:
+    """Return the goal of solving the layer of `face_ref` and the middle layer.
+
+    From a scrambled cube this is too deep to search for in one go, even with the
+    cross solved, use `solve_first_two_layers` to solve it a pair at a time.
+
+    """
+    opposite = _opposite(face_ref)
+    return pieces_goal(cube, lambda faces: opposite not in faces)
+
+
+def first_two_layers_slots(
+    face_ref: FaceRef = FaceRef.D,
+) -> List[Tuple[FaceRef, FaceRef]]:
+    """Return the slots of the first two layers around `face_ref`.
+
+    A slot is given by its two side faces, and holds the corner of those faces and
+    `face_ref` and the edge between the two faces.
+
+    """
+    sides = [other for other in FACE_ORDER if FACE_AXES[other] != FACE_AXES[face_ref]]
+    return [
+        (first, second)
+        for idx, first in enumerate(sides)
+        for second in sides[idx + 1 :]
+        if FACE_AXES[first] != FACE_AXES[second]
+    ]
+
+
+def pairs_goal(
+    cube: Cube,
+    slots: Iterable[Tuple[FaceRef, FaceRef]],
+    face_ref: FaceRef = FaceRef.D,
+) -> PartialGoal:
+    """Return the goal of solving the cross of `face_ref` and the pairs of `slots`.
+
+    With every slot from `first_two_layers_slots` this is `first_two_layers_goal`.
+
+    """
+    opposite = _opposite(face_ref)
+    solved = [set(slot) for slot in slots]
+
+    def keep(faces: Tuple[FaceRef, ...]) -> bool:
+        if len(faces) == 2 and face_ref in faces:
+            return True  # An edge of the cross
+        return opposite not in faces and any(slot <= set(faces) for slot in solved)
+
+    return pieces_goal(cube, keep)
+
+
+def solve_first_two_layers(
+    cube: Cube,
+    face_ref: FaceRef = FaceRef.D,
+    timeout: Optional[float] = None,
+    on_iteration: Optional[Callable[[Iteration], None]] = None,
+) -> SearchResult:
+    """Return moves that solve the cross of `face_ref` and then each pair in turn.
+
+    Each stage is a shortest sequence of moves to `pairs_goal` with one more slot,
+    so the stages are short searches, but the whole is not a shortest solution to
+    `first_two_layers_goal`.
+
+    Args:
+        cube: The state to solve from.
+        face_ref: The face of the first layer.
+        timeout: Give up after this many seconds in total.
+        on_iteration: Called with the stats of each iteration of every stage.
+
+    Raises:
+        ValueError: If `cube` cannot reach the goal.
+        SearchTimeout: If the stages are not done within `timeout` seconds.
+
+    """
+    deadline = time.monotonic() + timeout if timeout is not None else None
+    slots = first_two_layers_slots(face_ref)
+    goals = [cross_goal(cube, face_ref)]
+    goals.extend(
+        pairs_goal(cube, slots[:count], face_ref) for count in range(1, len(slots) + 1)
+    )
+    moves: List[Move] = []
+    iterations: List[Iteration] = []
+    for goal in goals:
+        remaining = None if deadline is None else max(deadline - time.monotonic(), 0)
+        result = solve_partial(cube, goal, timeout=remaining, on_iteration=on_iteration)
+        for move in result.moves:
+            cube = cube.rotate_layer(move.face_ref, move.steps)
+        moves.extend(result.moves)
+        iterations.extend(result.iterations)
+    return SearchResult(moves, iterations)
+
+
+def corners_oriented_goal(cube: Cube, face_ref: FaceRef = FaceRef.U) -> PartialGoal:
+    """Return the goal of orienting the corners about the axis of `face_ref`.
+
+    The corners are oriented when each has the colour of `face_ref` or of the
+    opposite face on one of those two faces, whichever corners are where.
+
+    """
+    axis = (face_ref, _opposite(face_ref))
+    colour, opposite_colour = (
+        cube.stickers[FACE_ORDER.index(ref) * 9 + 4] for ref in axis
+    )
+    stickers = [WILDCARD] * len(cube.stickers)
+    for slot in CORNER_STICKERS:
+        for idx in slot:
+            if FACE_ORDER[idx // 9] in axis:
+                stickers[idx] = colour
+    return PartialGoal(Cube.from_stickers(tuple(stickers)), {opposite_colour: colour})
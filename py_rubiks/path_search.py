@@ -0,0 +1,139 @@
+"""IDA* over a preallocated path stack.
+
+`ida_star` is generic over the state type, so every node costs a `Cube`, a generator
+frame for its successors and a level of recursion. This search is specialised to
+sticker tuples: the current path is held in stacks allocated once per search, one
+slot per depth for the state, the canonical moves that may follow it and the
+position reached in them, and the search loops over those stacks rather than
+recursing. The only object made per node is the successor's sticker tuple.
+
+Passing `tree=True` also builds a `tree.Node` for every generated state, the tree of
+the last iteration is returned with the result. This is for inspecting small
+searches, it costs far more than the search itself.
+
+"""
+
+from __future__ import annotations
+
+import math
+import time
+from typing import Callable, List, Optional, Sequence
+
+from py_rubiks.cube import CANONICAL_NEXT_MOVES, MOVE_GETTERS, MOVES, Cube, Stickers
+from py_rubiks.ida import Iteration, SearchResult, SearchTimeout, zero_heuristic
+from py_rubiks.tree import Node
+
+
+# Check the deadline once every this many generated states
+_CHECK_INTERVAL = 1024
+
+# The moves that may follow each move index, the extra last entry is for the start
+_NEXT_MOVES = tuple(CANONICAL_NEXT_MOVES[move.face_ref] for move in MOVES) + (
+    CANONICAL_NEXT_MOVES[None],
+)
+_START = len(MOVES)
+
+
+def path_stack_search(
+    cube: Cube,
+    heuristic: Callable[[Stickers], int] = zero_heuristic,
+    max_depth: int = 30,
+    on_iteration: Optional[Callable[[Iteration], None]] = None,
+    timeout: Optional[float] = None,
+    tree: bool = False,
+) -> SearchResult:
+    """Return the moves that solve `cube`, searching with IDA*.
+
+    Args:
+        cube: The state to solve, the faces are identified by their centre colours.
+        heuristic: An admissible estimate of the number of moves left, given the
+            stickers of a state, such as `OrientationHeuristic.estimate`.
+        max_depth: Give up once the bound goes over this.
+        on_iteration: Called with the stats of each iteration as it completes.
+        timeout: Give up after this many seconds.
+        tree: Build the search tree of each iteration for debugging.
+
+    Raises:
+        RuntimeError: If there is no solution within `max_depth` moves.
+        SearchTimeout: If there is no solution within `timeout` seconds.
+
+    """
+    deadline = time.monotonic() + timeout if timeout is not None else math.inf
+    start = cube.stickers
+    solved = tuple(start[offset + 4] for offset in range(0, 54, 9) for _ in range(9))
+
+    # Slot `depth` holds the state at that depth, the moves that may be made from it,
+    # the position of the next one to try and the move that reached the state
+    size = max_depth + 2
+    states: List[Stickers] = [start] * size
+    options: List[Sequence[int]] = [()] * size
+    positions = [0] * size
+    moves = [_START] * size
+    nodes_stack: List[Optional[Node]] = [None] * size
+
+    iterations: List[Iteration] = []
+    root = None
+    bound = heuristic(start)
+    while bound <= max_depth:
+        start_time = time.monotonic()
+        nodes = 0
+        next_bound = math.inf
+        found = -1
+        if tree:
+            root = Node(cube)
+            root.visited = True
+            nodes_stack[0] = root
+        if start == solved:
+            found = 0
+        else:
+            options[0] = _NEXT_MOVES[_START]
+            positions[0] = 0
+            depth = 0
+            while depth >= 0:
+                position = positions[depth]
+                if position == len(options[depth]):
+                    depth -= 1
+                    continue
+                positions[depth] = position + 1
+                move_idx = options[depth][position]
+                state = MOVE_GETTERS[move_idx](states[depth])
+                nodes += 1
+                if nodes % _CHECK_INTERVAL == 0 and time.monotonic() > deadline:
+                    elapsed = time.monotonic() - start_time
+                    iterations.append(Iteration(bound, nodes, elapsed))
+                    raise SearchTimeout(iterations)
+
+                child = depth + 1
+                moves[child] = move_idx
+                if tree:
+                    node = Node(Cube.from_stickers(state, from_move=MOVES[move_idx]))
+                    nodes_stack[depth].add(node)  # type: ignore
+                    nodes_stack[child] = node
+
+                estimate = child + heuristic(state)
+                if estimate > bound:
+                    if estimate < next_bound:
+                        next_bound = estimate
+                    continue
+                if state == solved:
+                    found = child
+                    break
+                if tree:
+                    node.visited = True
+                states[child] = state
+                options[child] = _NEXT_MOVES[move_idx]
+                positions[child] = 0
+                depth = child
+
+        iteration = Iteration(bound, nodes, time.monotonic() - start_time)
+        iterations.append(iteration)
+        if on_iteration:
+            on_iteration(iteration)
+        if found >= 0:
+            path = [MOVES[move_idx] for move_idx in moves[1 : found + 1]]
+            return SearchResult(path, iterations, root)
+        if next_bound == math.inf:
+            break  # Every path has been exhausted
+        bound = int(next_bound)
+
+    raise RuntimeError("No solution found")
@@ -0,0 +1,378 @@
+"""Pattern databases.
+
+A pattern database stores, for every arrangement of a subset of the pieces, the number
+of moves needed to solve just those pieces. This is a lower bound on the number of
+moves to solve the whole cube, so the databases make admissible heuristics.
+
+The databases are built by a breadth-first search over the pattern's states. Each
+level is expanded in parallel by a process pool, the workers scan chunks of a shared
+byte-per-entry table for the states at the current depth and mark the unseen
+successors with the next depth. The finished table is packed to 4 bits per entry and
+read through `mmap`, so several solver processes share one copy in the page cache.
+
+"""
+
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+from abc import ABC, abstractmethod
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import attr
+
+from py_rubiks.cube import MOVES
+from py_rubiks.cubie import MOVE_CUBES, N_CORNERS, N_TWIST, SOLVED_CUBIE, CubieCube
+from py_rubiks.tables import (
+    CACHE_VERSION,
+    N_MOVES,
+    default_cache_dir,
+    get_move_tables,
+    load_or_build,
+)
+
+
+PDB_MAGIC = b"PYRUBPDB"
+_HEADER = struct.Struct("<8sIQ")  # magic, version, number of entries
+_DATA_OFFSET = 64
+_UNSEEN = 0xFF
+
+# Each worker task scans this many entries of the table
+_CHUNK_SIZE = 1 << 22
+
+
+class Pattern(ABC):
+    """The subset of the pieces tracked by a pattern database.
+
+    Each state of the pattern maps to an index `0 <= index < size`.
+
+    """
+
+    name: str
+    size: int
+
+    @abstractmethod
+    def index(self, cubie: CubieCube) -> int:
+        """Return the index of the pattern's state in `cubie`."""
+
+    def prepare(self, cache_dir: Optional[Path]) -> None:
+        """Build and cache any move tables needed by `successors`."""
+
+    @abstractmethod
+    def successors(self, index: int, cache_dir: Optional[Path]) -> List[int]:
+        """Return the index reached by each of the 18 moves."""
+
+
+@attr.s(frozen=True, slots=True)
+class CornerPattern(Pattern):
+    """The permutation and orientation of all 8 corners."""
+
+    name = "corners"
+    size = N_CORNERS * N_TWIST
+
+    def index(self, cubie: CubieCube) -> int:
+        return cubie.corners * N_TWIST + cubie.twist
+
+    def prepare(self, cache_dir: Optional[Path]) -> None:
+        get_move_tables(cache_dir)
+
+    def successors(self, index: int, cache_dir: Optional[Path]) -> List[int]:
+        move_tables = get_move_tables(cache_dir)
+        corners, twist = divmod(index, N_TWIST)
+        corners *= N_MOVES
+        twist *= N_MOVES
+        return [
+            new_corners * N_TWIST + new_twist
+            for new_corners, new_twist in zip(
+                move_tables.corners[corners : corners + N_MOVES],
+                move_tables.twist[twist : twist + N_MOVES],
+            )
+        ]
+
+
+def arrangement_rank(positions: Tuple[int, ...], total: int) -> int:
+    """Return the rank of an ordered selection of distinct positions below `total`."""
+    rank = 0
+    used = 0
+    for idx, position in enumerate(positions):
+        smaller_unused = position - bin(used & ((1 << position) - 1)).count("1")
+        rank = rank * (total - idx) + smaller_unused
+        used |= 1 << position
+    return rank
+
+
+def arrangement_from_rank(rank: int, count: int, total: int) -> Tuple[int, ...]:
+    digits = [0] * count
+    for idx in range(count - 1, -1, -1):
+        rank, digits[idx] = divmod(rank, total - idx)
+    available = list(range(total))
+    return tuple(available.pop(digit) for digit in digits)
+
+
+def _edge_destinations() -> Tuple[Tuple[Tuple[int, int], ...], ...]:
+    """Return `(new_position, flip)` for an edge at each position under each move."""
+    destinations = []
+    for move in MOVES:
+        move_cube = MOVE_CUBES[(move.face_ref, move.steps)]
+        by_position: Dict[int, Tuple[int, int]] = {}
+        for new_position, (old_position, flip) in enumerate(
+            zip(move_cube.ep, move_cube.eo)
+        ):
+            by_position[old_position] = (new_position, flip)
+        destinations.append(tuple(by_position[position] for position in range(12)))
+    return tuple(destinations)
+
+
+@attr.s(auto_attribs=True, frozen=True, slots=True)
+class EdgePattern(Pattern):
+    """The positions and orientations of a subset of the edges.
+
+    The index is `arrangement_rank(positions) << len(edges) | flips` where bit `j` of
+    `flips` is the orientation of `edges[j]`.
+
+    """
+
+    edges: Tuple[int, ...]
+
+    @property
+    def name(self) -> str:  # type: ignore
+        return "edges_" + "_".join(str(edge) for edge in self.edges)
+
+    @property
+    def arrangements(self) -> int:
+        size = 1
+        for idx in range(len(self.edges)):
+            size *= 12 - idx
+        return size
+
+    @property
+    def size(self) -> int:  # type: ignore
+        return self.arrangements << len(self.edges)
+
+    def index(self, cubie: CubieCube) -> int:
+        positions = tuple(cubie.ep.index(edge) for edge in self.edges)
+        flips = 0
+        for bit, position in enumerate(positions):
+            flips |= cubie.eo[position] << bit
+        return arrangement_rank(positions, 12) << len(self.edges) | flips
+
+    def build_move_table(self) -> array:
+        """Build the move table, indexed by `18 * arrangement_rank + move_idx`.
+
+        Each entry is the new rank shifted up by `len(edges)` with the mask of flipped
+        edges in the low bits, so XOR-ing an entry with the current flips gives the
+        index of the successor.
+
+        """
+        count = len(self.edges)
+        destinations = _edge_destinations()
+        table = array("I", bytes(4 * self.arrangements * N_MOVES))
+        for rank in range(self.arrangements):
+            positions = arrangement_from_rank(rank, count, 12)
+            for move_idx, destination in enumerate(destinations):
+                moved = [destination[position] for position in positions]
+                mask = 0
+                for bit, (_, flip) in enumerate(moved):
+                    mask |= flip << bit
+                new_rank = arrangement_rank(
+                    tuple(position for position, _ in moved), 12
+                )
+                table[N_MOVES * rank + move_idx] = new_rank << count | mask
+        return table
+
+    def move_table(self, cache_dir: Optional[Path]) -> array:
+        return _edge_move_table(self, cache_dir)
+
+    def prepare(self, cache_dir: Optional[Path]) -> None:
+        self.move_table(cache_dir)
+
+    def successors(self, index: int, cache_dir: Optional[Path]) -> List[int]:
+        count = len(self.edges)
+        flips = index & ((1 << count) - 1)
+        offset = N_MOVES * (index >> count)
+        return [
+            entry ^ flips
+            for entry in self.move_table(cache_dir)[offset : offset + N_MOVES]
+        ]
+
+
+@lru_cache(maxsize=None)
+def _edge_move_table(pattern: EdgePattern, cache_dir: Optional[Path]) -> array:
+    tables = load_or_build(
+        f"{pattern.name}_moves.v{CACHE_VERSION}.bin",
+        ["moves"],
+        lambda: {"moves": pattern.build_move_table()},
+        cache_dir,
+    )
+    return tables["moves"]
+
+
+# The databases used by Korf's optimal solver, all the corners and two halves of the
+# edges
+CORNERS = CornerPattern()
+EDGES_FIRST_HALF = EdgePattern(tuple(range(6)))
+EDGES_SECOND_HALF = EdgePattern(tuple(range(6, 12)))
+
+
+@lru_cache(maxsize=None)
+def _open_build_table(path: Path) -> mmap.mmap:
+    """Return a shared, writable mapping of the build table, once per worker."""
+    with path.open("r+b") as handle:
+        return mmap.mmap(handle.fileno(), 0)
+
+
+def _expand_chunk(
+    pattern: Pattern,
+    path: Path,
+    cache_dir: Optional[Path],
+    start: int,
+    stop: int,
+    depth: int,
+) -> int:
+    """Mark the unseen successors of the states at `depth` in `[start, stop)`.
+
+    Returns:
+        The number of states marked, states found by two workers at once may be
+        counted twice.
+
+    """
+    table = _open_build_table(path)
+    successors = pattern.successors
+    current = bytes([depth])
+    found = 0
+    index = table.find(current, start, stop)
+    while index != -1:
+        for successor in successors(index, cache_dir):
+            if table[successor] == _UNSEEN:
+                table[successor] = depth + 1
+                found += 1
+        index = table.find(current, index + 1, stop)
+    return found
+
+
+def _pack(table: mmap.mmap, size: int) -> bytes:
+    """Pack a byte per entry into 4 bits per entry, even indices in the low bits."""
+    data = table[:size] + bytes(size % 2)
+    low = int.from_bytes(data[0::2], "little")
+    high = int.from_bytes(
+        data[1::2].translate(bytes((value << 4) & 0xFF for value in range(256))),
+        "little",
+    )
+    return (low | high).to_bytes((size + 1) // 2, "little")
+
+
+def build_pattern_database(
+    pattern: Pattern,
+    path: Path,
+    workers: Optional[int] = None,
+    cache_dir: Optional[Path] = None,
+) -> None:
+    """Build the pattern database for `pattern` and write it to `path`.
+
+    Args:
+        pattern: The pieces to track.
+        path: Where to write the packed database.
+        workers: The number of worker processes, each level is expanded in the
+            current process if this is 1. Defaults to the number of CPUs.
+        cache_dir: The cache directory for any move tables.
+
+    """
+    workers = workers or os.cpu_count() or 1
+    pattern.prepare(cache_dir)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    build_path = path.with_name(f"{path.name}.{os.getpid()}.build")
+    size = pattern.size
+    with build_path.open("w+b") as handle:
+        handle.truncate(size)
+        table = mmap.mmap(handle.fileno(), size)
+    try:
+        table.write(bytes([_UNSEEN]) * size)
+        table[pattern.index(SOLVED_CUBIE)] = 0
+
+        chunks = [
+            (start, min(start + _CHUNK_SIZE, size))
+            for start in range(0, size, _CHUNK_SIZE)
+        ]
+        executor = ProcessPoolExecutor(workers) if workers > 1 else None
+        try:
+            depth = 0
+            while True:
+                args = [
+                    (pattern, build_path, cache_dir, start, stop, depth)
+                    for start, stop in chunks
+                ]
+                if executor:
+                    tasks = [executor.submit(_expand_chunk, *arg) for arg in args]
+                    found = sum(task.result() for task in tasks)
+                else:
+                    found = sum(_expand_chunk(*arg) for arg in args)
+                if not found:
+                    break
+                depth += 1
+        finally:
+            if executor:
+                executor.shutdown()
+            _open_build_table.cache_clear()
+
+        if depth > 0xF:
+            raise ValueError(f"{pattern.name} has distances that do not fit in 4 bits")
+
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with tmp_path.open("wb") as handle:
+            header = _HEADER.pack(PDB_MAGIC, CACHE_VERSION, size)
+            handle.write(header.ljust(_DATA_OFFSET, b"\0"))
+            handle.write(_pack(table, size))
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    finally:
+        table.close()
+        build_path.unlink()
+
+
+class PatternDatabase:
+    """A read-only, memory-mapped pattern database."""
+
+    def __init__(self, pattern: Pattern, path: Path) -> None:
+        self.pattern = pattern
+        self.path = path
+        with path.open("rb") as handle:
+            self._mmap = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, size = _HEADER.unpack(self._mmap[: _HEADER.size])
+        if magic != PDB_MAGIC or version != CACHE_VERSION or size != pattern.size:
+            self._mmap.close()
+            raise ValueError(
+                f"{path} is not a version {CACHE_VERSION} {pattern.name} database"
+            )
+
+    def __len__(self) -> int:
+        return self.pattern.size
+
+    def __getitem__(self, index: int) -> int:
+        """Return the number of moves needed to solve the pattern's pieces."""
+        return self._mmap[_DATA_OFFSET + (index >> 1)] >> ((index & 1) << 2) & 0xF
+
+    def distance(self, cubie: CubieCube) -> int:
+        return self[self.pattern.index(cubie)]
+
+    def close(self) -> None:
+        self._mmap.close()
+
+
+@lru_cache(maxsize=None)
+def get_pattern_database(
+    pattern: Pattern, cache_dir: Optional[Path] = None, workers: Optional[int] = None
+) -> PatternDatabase:
+    """Return the database for `pattern`, building and caching it if needed."""
+    path = (cache_dir or default_cache_dir()) / f"{pattern.name}.v{CACHE_VERSION}.pdb"
+    try:
+        return PatternDatabase(pattern, path)
+    except (OSError, ValueError, struct.error):
+        pass  # Missing, stale or corrupt, rebuild it
+    build_pattern_database(pattern, path, workers, cache_dir)
+    return PatternDatabase(pattern, path)
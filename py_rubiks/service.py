@@ -0,0 +1,345 @@
+"""A local solver service.
+
+`SolverService` keeps a pool of worker processes with the two-phase solver's tables
+loaded, so each request only pays for its search. Requests wait in a bounded queue
+and a fixed number of dispatchers, one per worker, hand them to the pool. Each
+request has a deadline, a request that is cancelled or whose deadline passes while
+it is queued is dropped without being solved.
+
+`serve` listens on localhost for a line protocol of JSON objects, one per line:
+
+- `{"id": 1, "scramble": "R U R' U2"}` solves a scramble, as for `batch`, with
+  optional `"deadline"` seconds and `"max_length"`. The response is the `batch`
+  result with the request's id, or `{"id": 1, "error": "..."}`. Responses are sent
+  as requests complete, not in request order.
+- `{"op": "cancel", "id": 1}` cancels a request, which then responds with an error.
+- `{"op": "metrics"}` responds with the queue depth and latency stats.
+
+A request's pending work is cancelled when its connection closes. Run
+`python -m py_rubiks.service --port 8765` to start the service.
+
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Deque, Dict, Optional, Sequence, Set
+
+import attr
+
+from py_rubiks.batch import BatchResult, Scramble, load_tables, solve_scramble
+
+
+# Latency stats are over this many of the most recent requests
+_LATENCY_WINDOW = 1024
+
+
+@attr.s(auto_attribs=True, frozen=True, slots=True)
+class _Request:
+    scramble: Scramble
+    max_length: int
+    deadline: float
+    future: asyncio.Future
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _is_valid(record: Dict[str, Any]) -> bool:
+    """Return whether the fields of a solve request have the expected types."""
+    deadline = record.get("deadline")
+    max_length = record.get("max_length")
+    return (
+        isinstance(record["scramble"], str)
+        and (deadline is None or _is_number(deadline))
+        and (max_length is None or _is_number(max_length))
+    )
+
+
+def _percentile(ordered: Sequence[float], fraction: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(int(fraction * len(ordered)), len(ordered) - 1)]
+
+
+class SolverService:
+    """Solves scrambles on a pool of worker processes with the tables loaded.
+
+    Use it as an async context manager, or call `start` and `close`.
+
+    Args:
+        workers: The number of worker processes, defaults to the number of CPUs.
+        max_queue: The number of requests that may wait for a worker.
+        deadline: The default number of seconds a request may take, queueing
+            included.
+        max_length: The default for `solver.solve`.
+        search_timeout: The most time spent looking for a shorter solution once a
+            solution has been found, as for `solver.solve`.
+        cache_dir: The cache directory for the tables.
+
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        max_queue: int = 1024,
+        deadline: float = 10.0,
+        max_length: int = 22,
+        search_timeout: float = 1.0,
+        cache_dir: Optional[Path] = None,
+    ) -> None:
+        self.workers = workers or os.cpu_count() or 1
+        self.deadline = deadline
+        self.max_length = max_length
+        self.search_timeout = search_timeout
+        self.cache_dir = cache_dir
+        self._queue: asyncio.Queue[_Request] = asyncio.Queue(max_queue)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._dispatchers: Set[asyncio.Task] = set()
+        self._count = 0
+        self._running = 0
+        self._completed = 0
+        self._expired = 0
+        self._cancelled = 0
+        self._rejected = 0
+        self._latencies: Deque[float] = deque(maxlen=_LATENCY_WINDOW)
+
+    async def __aenter__(self) -> SolverService:
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+    async def start(self) -> None:
+        """Start the worker processes and wait for them to load the tables."""
+        loop = asyncio.get_running_loop()
+        self._executor = ProcessPoolExecutor(
+            self.workers, initializer=load_tables, initargs=(self.cache_dir,)
+        )
+        await asyncio.gather(
+            *(
+                loop.run_in_executor(self._executor, load_tables, self.cache_dir)
+                for _ in range(self.workers)
+            )
+        )
+        self._dispatchers = {
+            asyncio.create_task(self._dispatch()) for _ in range(self.workers)
+        }
+
+    async def close(self) -> None:
+        for dispatcher in self._dispatchers:
+            dispatcher.cancel()
+        await asyncio.gather(*self._dispatchers, return_exceptions=True)
+        self._dispatchers = set()
+        if self._executor:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+    async def solve(
+        self,
+        text: str,
+        deadline: Optional[float] = None,
+        max_length: Optional[int] = None,
+        request_id: Any = None,
+    ) -> BatchResult:
+        """Queue a scramble and return its result.
+
+        Args:
+            text: A scramble, as for `batch.parse_scramble`.
+            deadline: Seconds to wait for the result, defaults to `self.deadline`.
+            max_length: Overrides `self.max_length`.
+            request_id: Stored as the id of the result's `Scramble`.
+
+        Raises:
+            asyncio.QueueFull: If the queue is full.
+            TimeoutError: If the deadline passes first.
+
+        """
+        loop = asyncio.get_running_loop()
+        received = time.monotonic()
+        timeout = self.deadline if deadline is None else deadline
+        request = _Request(
+            Scramble(self._count, text, request_id),
+            self.max_length if max_length is None else max_length,
+            received + timeout,
+            loop.create_future(),
+        )
+        try:
+            self._queue.put_nowait(request)
+        except asyncio.QueueFull:
+            self._rejected += 1
+            raise
+        self._count += 1
+
+        try:
+            # Cancelling the future on a timeout or cancellation drops it from the
+            # queue, a request that is already running is left to finish
+            result = await asyncio.wait_for(request.future, timeout)
+        except asyncio.TimeoutError:
+            self._expired += 1
+            raise TimeoutError("Deadline exceeded") from None
+        except asyncio.CancelledError:
+            self._cancelled += 1
+            raise
+        self._completed += 1
+        self._latencies.append(time.monotonic() - received)
+        return result
+
+    async def _dispatch(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            request = await self._queue.get()
+            if request.future.done():
+                continue
+            timeout = min(self.search_timeout, request.deadline - time.monotonic())
+            self._running += 1
+            try:
+                result = await loop.run_in_executor(
+                    self._executor,
+                    solve_scramble,
+                    request.scramble,
+                    request.max_length,
+                    max(timeout, 0.0),
+                    self.cache_dir,
+                )
+            except Exception as err:
+                if not request.future.done():
+                    request.future.set_exception(err)
+            else:
+                if not request.future.done():
+                    request.future.set_result(result)
+            finally:
+                self._running -= 1
+
+    def metrics(self) -> Dict[str, Any]:
+        """Return the queue depth, request counts and latency stats in seconds."""
+        latencies = sorted(self._latencies)
+        return {
+            "queue_depth": self._queue.qsize(),
+            "running": self._running,
+            "completed": self._completed,
+            "expired": self._expired,
+            "cancelled": self._cancelled,
+            "rejected": self._rejected,
+            "latency_mean": sum(latencies) / len(latencies) if latencies else 0.0,
+            "latency_p50": _percentile(latencies, 0.5),
+            "latency_p99": _percentile(latencies, 0.99),
+            "latency_max": latencies[-1] if latencies else 0.0,
+        }
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 0) -> asyncio.Server:
+        """Start listening for connections, port 0 picks a free port."""
+        return await asyncio.start_server(self._handle, host, port)
+
+    async def _handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        tasks: Dict[Any, asyncio.Task] = {}
+
+        async def respond(message: Dict[str, Any]) -> None:
+            if not writer.is_closing():
+                writer.write(json.dumps(message).encode() + b"\n")
+                await writer.drain()
+
+        async def run(key: Any, request_id: Any, record: Dict[str, Any]) -> None:
+            message: Dict[str, Any]
+            try:
+                if not _is_valid(record):
+                    raise ValueError("Invalid request")
+                result = await self.solve(
+                    record["scramble"],
+                    record.get("deadline"),
+                    record.get("max_length"),
+                    request_id,
+                )
+                message = result.to_json()
+                del message["index"]
+            except asyncio.QueueFull:
+                message = {"id": request_id, "error": "Queue full"}
+            except TimeoutError as err:
+                message = {"id": request_id, "error": str(err)}
+            except asyncio.CancelledError:
+                await respond({"id": request_id, "error": "Cancelled"})
+                raise
+            except Exception as err:
+                message = {"id": request_id, "error": str(err) or type(err).__name__}
+            finally:
+                tasks.pop(key, None)
+            await respond(message)
+
+        try:
+            async for line in reader:
+                try:
+                    record = json.loads(line)
+                    op = record.get("op", "solve")
+                    request_id = record.get("id")
+                except (ValueError, AttributeError):
+                    await respond({"error": "Invalid request"})
+                    continue
+                if op == "metrics":
+                    await respond(self.metrics())
+                elif op == "cancel":
+                    if request_id in tasks:
+                        tasks[request_id].cancel()
+                elif op != "solve" or "scramble" not in record:
+                    await respond({"id": request_id, "error": "Invalid request"})
+                elif request_id is not None and request_id in tasks:
+                    await respond({"id": request_id, "error": "Duplicate id"})
+                else:
+                    # Requests without an id can't be cancelled, so they get a key that
+                    # no other request has
+                    key = object() if request_id is None else request_id
+                    tasks[key] = asyncio.create_task(run(key, request_id, record))
+        finally:
+            pending = list(tasks.values())
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            writer.close()
+
+
+async def _serve_forever(args: argparse.Namespace) -> None:
+    async with SolverService(args.workers, args.max_queue, args.deadline) as service:
+        server = await service.serve(args.host, args.port)
+        port = server.sockets[0].getsockname()[1]
+        print(f"Listening on {args.host}:{port}", flush=True)
+        async with server:
+            await server.serve_forever()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument(
+        "--workers", type=int, help="The number of processes, defaults to the CPUs"
+    )
+    parser.add_argument(
+        "--max-queue",
+        type=int,
+        default=1024,
+        help="Requests beyond this many waiting are rejected",
+    )
+    parser.add_argument(
+        "--deadline",
+        type=float,
+        default=10.0,
+        help="The default number of seconds a request may take",
+    )
+    try:
+        asyncio.run(_serve_forever(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
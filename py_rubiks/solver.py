@@ -0,0 +1,208 @@
+"""Two-phase (Kociemba) solver.
+
+Phase 1 moves the cube into the subgroup generated by
+`<U, D, R2, L2, F2, B2>`, where the corners and edges are all oriented and the middle
+layer edges are in the middle layer. Phase 2 then solves the cube using only those
+moves. Both phases are iterative-deepening searches over coordinates, using the move
+tables to follow moves and the pruning tables as lower bounds.
+
+Once a solution is found the search carries on with longer phase 1 solutions looking
+for a shorter total, until the solution is no longer than `max_length` moves or the
+`timeout` is reached.
+
+"""
+
+from __future__ import annotations
+
+import time
+from pathlib import Path
+from typing import List, Optional
+
+from py_rubiks.cube import CANONICAL_NEXT_FACES, FACE_ORDER, MOVES, Cube, Move
+from py_rubiks.cubie import MOVE_CUBES, N_SLICE, CubieCube
+from py_rubiks.tables import (
+    N_MOVES,
+    PHASE_2_MOVES,
+    get_move_tables,
+    get_pruning_tables,
+)
+
+
+# Phase 2 searches are capped at this depth, longer phase 2 solutions are very
+# expensive to find and rarely lead to a shorter total
+MAX_PHASE_2_DEPTH = 12
+
+# An upper bound on the length of any two-phase solution
+_MAX_TOTAL = 31
+
+
+def _allowed_moves(move_idxs: List[int]) -> List[List[int]]:
+    """Return the moves that may follow each face, with the last entry for the start.
+
+    The faces allowed after each face are given by `CANONICAL_NEXT_FACES`.
+
+    """
+    return [
+        [
+            move_idx
+            for move_idx in move_idxs
+            if FACE_ORDER[move_idx // 3] in CANONICAL_NEXT_FACES[last_face]
+        ]
+        for last_face in FACE_ORDER + (None,)
+    ]
+
+
+_PHASE_1_ALLOWED = _allowed_moves(list(range(N_MOVES)))
+# Once in the phase 2 subgroup, phase 1 only continues with moves that leave it
+_PHASE_1_LEAVING = _allowed_moves(
+    [move_idx for move_idx in range(N_MOVES) if move_idx not in PHASE_2_MOVES]
+)
+_PHASE_2_ALLOWED = _allowed_moves(list(PHASE_2_MOVES))
+_PHASE_2_MOVE_SET = frozenset(PHASE_2_MOVES)
+_START = len(FACE_ORDER)  # The "last face" before any moves have been made
+
+
+class _SearchDone(Exception):
+    """Raised to unwind the search once a good enough solution has been found."""
+
+
+def solve(
+    cube: Cube,
+    max_length: int = 22,
+    timeout: float = 1.0,
+    cache_dir: Optional[Path] = None,
+) -> List[Move]:
+    """Return a list of moves that solves `cube`.
+
+    Args:
+        cube: The state to solve, the faces are identified by their centre colours.
+        max_length: Stop searching as soon as a solution this short is found.
+        timeout: Stop searching for shorter solutions after this many seconds and
+            return the best solution so far. The search always runs until the first
+            solution is found.
+        cache_dir: The cache directory for the move and pruning tables.
+
+    Returns:
+        The moves in the order that they should be applied.
+
+    Raises:
+        ValueError: If `cube` is not a solvable state.
+
+    """
+    cubie = CubieCube.from_cube(cube)
+    move_tables = get_move_tables(cache_dir)
+    pruning_tables = get_pruning_tables(cache_dir)
+
+    twist_move = move_tables.twist
+    flip_move = move_tables.flip
+    slice_sorted_move = move_tables.slice_sorted
+    corners_move = move_tables.corners
+    ud_edges_move = move_tables.ud_edges
+    twist_slice = pruning_tables.twist_slice
+    flip_slice = pruning_tables.flip_slice
+    corners_slice = pruning_tables.corners_slice
+    ud_edges_slice = pruning_tables.ud_edges_slice
+    move_eps = [MOVE_CUBES[(move.face_ref, move.steps)].ep for move in MOVES]
+
+    deadline = time.monotonic() + timeout
+    best: List[int] = []
+    best_length = _MAX_TOTAL + 1
+    phase_1_path: List[int] = []
+    phase_2_path: List[int] = []
+
+    def phase_2(
+        corners: int, ud_edges: int, slice_sorted: int, togo: int, last_face: int
+    ) -> bool:
+        if togo == 0:
+            return corners == 0 and ud_edges == 0 and slice_sorted == 0
+        for move_idx in _PHASE_2_ALLOWED[last_face]:
+            new_corners = corners_move[N_MOVES * corners + move_idx]
+            new_slice = slice_sorted_move[N_MOVES * slice_sorted + move_idx]
+            if corners_slice[24 * new_corners + new_slice] >= togo:
+                continue
+            new_edges = ud_edges_move[N_MOVES * ud_edges + move_idx]
+            if ud_edges_slice[24 * new_edges + new_slice] >= togo:
+                continue
+            phase_2_path.append(move_idx)
+            if phase_2(new_corners, new_edges, new_slice, togo - 1, move_idx // 3):
+                return True
+            phase_2_path.pop()
+        return False
+
+    def start_phase_2(slice_sorted: int) -> None:
+        nonlocal best, best_length
+
+        corners = cubie.corners
+        ep = cubie.ep
+        for move_idx in phase_1_path:
+            corners = corners_move[N_MOVES * corners + move_idx]
+            ep = tuple(ep[idx] for idx in move_eps[move_idx])
+        ud_edges = CubieCube(ep=ep).ud_edges
+
+        depth_1 = len(phase_1_path)
+        limit = min(best_length - 1 - depth_1, MAX_PHASE_2_DEPTH)
+        estimate = max(
+            corners_slice[24 * corners + slice_sorted],
+            ud_edges_slice[24 * ud_edges + slice_sorted],
+        )
+        last_face = phase_1_path[-1] // 3 if phase_1_path else _START
+        for togo in range(estimate, limit + 1):
+            phase_2_path.clear()
+            if phase_2(corners, ud_edges, slice_sorted, togo, last_face):
+                best = phase_1_path + phase_2_path
+                best_length = len(best)
+                if best_length <= max_length:
+                    raise _SearchDone()
+                break
+
+    def phase_1(
+        twist: int,
+        flip: int,
+        slice_sorted: int,
+        togo: int,
+        last_face: int,
+        in_subgroup: bool,
+    ) -> None:
+        if togo == 0:
+            # Phase 1 solutions ending in a phase 2 move are found at a lower depth
+            if not phase_1_path or phase_1_path[-1] not in _PHASE_2_MOVE_SET:
+                start_phase_2(slice_sorted)
+                if best and time.monotonic() > deadline:
+                    raise _SearchDone()
+            return
+        allowed = _PHASE_1_LEAVING if in_subgroup else _PHASE_1_ALLOWED
+        for move_idx in allowed[last_face]:
+            new_twist = twist_move[N_MOVES * twist + move_idx]
+            new_flip = flip_move[N_MOVES * flip + move_idx]
+            new_slice_sorted = slice_sorted_move[N_MOVES * slice_sorted + move_idx]
+            new_slice = new_slice_sorted // 24
+            estimate = twist_slice[N_SLICE * new_twist + new_slice]
+            if estimate < togo:
+                estimate = max(estimate, flip_slice[N_SLICE * new_flip + new_slice])
+            if estimate >= togo:
+                continue
+            phase_1_path.append(move_idx)
+            phase_1(
+                new_twist,
+                new_flip,
+                new_slice_sorted,
+                togo - 1,
+                move_idx // 3,
+                estimate == 0,
+            )
+            phase_1_path.pop()
+
+    twist, flip, slice_sorted = cubie.twist, cubie.flip, cubie.slice_sorted
+    start = max(
+        twist_slice[N_SLICE * twist + slice_sorted // 24],
+        flip_slice[N_SLICE * flip + slice_sorted // 24],
+    )
+    try:
+        for depth_1 in range(start, _MAX_TOTAL + 1):
+            if depth_1 >= best_length:
+                break
+            phase_1(twist, flip, slice_sorted, depth_1, _START, start == 0)
+    except _SearchDone:
+        pass
+
+    return [MOVES[move_idx] for move_idx in best]
@@ -0,0 +1,165 @@
+"""The 48 symmetries of the cube.
+
+A symmetry is a rotation or reflection of the whole cube in space. Conjugating a state
+by a symmetry, moving the cube in space and then renaming the colours so the centres
+are back in place, gives a state that is solved by the correspondingly moved solution
+in the same number of moves. States related this way form a symmetry class, and a
+search or table only needs to consider one state of each class.
+
+Each symmetry is precomputed as a sticker permutation and a mapping of the faces, so
+conjugating the face codes of a state is one `bytes.translate` and one `itemgetter`.
+
+"""
+
+from __future__ import annotations
+
+from itertools import permutations, product
+from operator import itemgetter
+from typing import List, Tuple
+
+import attr
+
+from py_rubiks.cube import (
+    FACE_NORMALS,
+    FACE_ORDER,
+    STICKER_POSITIONS,
+    Cube,
+    Move,
+    Permutation,
+)
+
+
+Matrix = Tuple[Tuple[int, int, int], Tuple[int, int, int], Tuple[int, int, int]]
+Vector = Tuple[int, int, int]
+
+
+def _transform(matrix: Matrix, vector: Vector) -> Vector:
+    return tuple(  # type: ignore
+        sum(entry * value for entry, value in zip(row, vector)) for row in matrix
+    )
+
+
+def _transpose(matrix: Matrix) -> Matrix:
+    return tuple(zip(*matrix))  # type: ignore
+
+
+@attr.s(auto_attribs=True, frozen=True, slots=True)
+class Symmetry:
+    """A rotation or reflection of the cube.
+
+    Attributes:
+        matrix: The signed permutation matrix acting on the 3D sticker positions.
+        permutation: The sticker permutation, `new[idx] == old[permutation[idx]]`.
+        face_map: The index in `FACE_ORDER` of the face that each face moves to.
+        is_reflection: Reflections reverse the direction of every turn.
+
+    """
+
+    matrix: Matrix
+    permutation: Permutation
+    face_map: Tuple[int, ...]
+    is_reflection: bool
+
+    @classmethod
+    def from_matrix(cls, matrix: Matrix) -> Symmetry:
+        index_of = {position: idx for idx, position in enumerate(STICKER_POSITIONS)}
+        inverse = _transpose(matrix)
+        permutation = tuple(
+            index_of[_transform(inverse, position)] for position in STICKER_POSITIONS
+        )
+        normals = [FACE_NORMALS[face_ref] for face_ref in FACE_ORDER]
+        face_map = tuple(
+            normals.index(_transform(matrix, normal)) for normal in normals
+        )
+        (a, b, c), (d, e, f), (g, h, i) = matrix
+        determinant = a * (e * i - f * h) - b * (d * i - f * g) + c * (d * h - e * g)
+        return cls(matrix, permutation, face_map, determinant < 0)
+
+    def conjugate(self, cube: Cube) -> Cube:
+        """Return the state of `cube` moved by this symmetry, with the same centres."""
+        colours = [cube.stickers[9 * idx + 4] for idx in range(len(FACE_ORDER))]
+        codes = face_codes(cube)
+        return Cube.from_stickers(
+            tuple(colours[self.face_map[codes[idx]]] for idx in self.permutation)
+        )
+
+    def conjugate_move(self, move: Move) -> Move:
+        """Return the move that this symmetry turns `move` into."""
+        face_ref = FACE_ORDER[self.face_map[FACE_ORDER.index(move.face_ref)]]
+        steps = 4 - move.steps if self.is_reflection else move.steps
+        return Move(face_ref, steps)
+
+
+def _build_symmetries() -> Tuple[Symmetry, ...]:
+    symmetries = []
+    for axes in permutations(range(3)):
+        for signs in product((1, -1), repeat=3):
+            matrix = tuple(
+                tuple(sign if col == axis else 0 for col in range(3))
+                for axis, sign in zip(axes, signs)
+            )
+            symmetries.append(Symmetry.from_matrix(matrix))  # type: ignore
+    return tuple(symmetries)
+
+
+# The identity is the first symmetry
+SYMMETRIES = _build_symmetries()
+
+# `canonical_key` compares this many stickers of every conjugate first, and only
+# builds the full keys of the conjugates with the smallest prefix
+_PREFIX_LENGTH = 8
+
+# For each symmetry, the face code translation, the permutation of the prefix and the
+# full sticker permutation
+_KEY_TRANSFORMS = [
+    (
+        bytes.maketrans(bytes(range(len(FACE_ORDER))), bytes(symmetry.face_map)),
+        itemgetter(*symmetry.permutation[:_PREFIX_LENGTH]),
+        itemgetter(*symmetry.permutation),
+    )
+    for symmetry in SYMMETRIES
+]
+
+
+def face_codes(cube: Cube) -> bytes:
+    """Return each sticker as the index in `FACE_ORDER` of the face of its colour.
+
+    Raises:
+        ValueError: If a sticker does not match any of the centres.
+
+    """
+    stickers = cube.stickers
+    codes = {stickers[9 * idx + 4]: idx for idx in range(len(FACE_ORDER))}
+    try:
+        return bytes(map(codes.__getitem__, stickers))
+    except KeyError as err:
+        raise ValueError(f"{err.args[0]!r} does not match any centre") from None
+
+
+def symmetric_keys(cube: Cube) -> List[bytes]:
+    """Return the face codes of `cube` conjugated by each of `SYMMETRIES`."""
+    codes = face_codes(cube)
+    return [
+        bytes(permute(codes.translate(table))) for table, _, permute in _KEY_TRANSFORMS
+    ]
+
+
+def canonical_key(cube: Cube) -> bytes:
+    """Return a key shared by exactly the states in the symmetry class of `cube`.
+
+    The key is the smallest of the face codes of the conjugated states, so it is also
+    independent of the colour scheme.
+
+    """
+    codes = face_codes(cube)
+    best = None
+    candidates = []
+    for table, permute_prefix, permute in _KEY_TRANSFORMS:
+        translated = codes.translate(table)
+        prefix = permute_prefix(translated)
+        if best is None or prefix < best:
+            best = prefix
+            candidates = [(translated, permute)]
+        elif prefix == best:
+            candidates.append((translated, permute))
+    return min(bytes(permute(translated)) for translated, permute in candidates)
@@ -0,0 +1,352 @@
+"""Precomputed coordinate tables with an on-disk cache.
+
+Each move table maps `18 * coordinate + move_idx` to the coordinate reached by
+applying `MOVES[move_idx]`, so following a move is a single array lookup instead of
+a `Cube` or `CubieCube` rotation.
+
+Building the tables takes several seconds, so they are written to a versioned binary
+cache file the first time they are needed and later processes load them from there.
+
+"""
+
+from __future__ import annotations
+
+import os
+import struct
+import sys
+import tempfile
+import warnings
+from array import array
+from functools import lru_cache, partial
+from pathlib import Path
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+import attr
+
+from py_rubiks.cube import MOVES, FaceRef
+from py_rubiks.cubie import (
+    MOVE_CUBES,
+    N_CORNERS,
+    N_FLIP,
+    N_SLICE,
+    N_SLICE_PERM,
+    N_SLICE_SORTED,
+    N_TWIST,
+    N_UD_EDGES,
+    CubieCube,
+    co_from_twist,
+    eo_from_flip,
+    ep_from_slice_sorted,
+    flip_from_eo,
+    perm_from_rank,
+    perm_rank,
+    slice_sorted_from_ep,
+    twist_from_co,
+)
+
+
+N_MOVES = len(MOVES)
+
+# Moves that keep the middle layer edges in the middle layer and the corner and edge
+# orientations solved, these are the only moves used in the second phase
+PHASE_2_MOVES = tuple(
+    idx
+    for idx, move in enumerate(MOVES)
+    if move.face_ref in (FaceRef.U, FaceRef.D) or move.steps == 2
+)
+
+CACHE_MAGIC = b"PYRUBIKS"
+CACHE_VERSION = 1
+CACHE_DIR_ENV = "PY_RUBIKS_CACHE_DIR"
+
+_HEADER = struct.Struct("<8sII")  # magic, version, number of tables
+_TABLE_HEADER = struct.Struct("<16scQ")  # name, array typecode, number of items
+
+Tables = Dict[str, array]
+
+
+def default_cache_dir() -> Path:
+    """Return the cache directory, this can be overridden with `PY_RUBIKS_CACHE_DIR`."""
+    if cache_dir := os.environ.get(CACHE_DIR_ENV):
+        return Path(cache_dir)
+    return Path.home() / ".cache" / "py_rubiks"
+
+
+def write_tables(path: Path, tables: Tables) -> None:
+    """Write the tables to `path`.
+
+    The file is written to a temporary file first and moved into place so that
+    processes loading the cache concurrently never see a partial file.
+
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=path.name)
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(_HEADER.pack(CACHE_MAGIC, CACHE_VERSION, len(tables)))
+            for name, table in tables.items():
+                handle.write(
+                    _TABLE_HEADER.pack(
+                        name.encode(), table.typecode.encode(), len(table)
+                    )
+                )
+                if sys.byteorder == "big":
+                    table = array(table.typecode, table)
+                    table.byteswap()
+                table.tofile(handle)
+        os.chmod(tmp_name, 0o644)
+        os.replace(tmp_name, path)
+    except BaseException:
+        os.unlink(tmp_name)
+        raise
+
+
+def read_tables(path: Path) -> Tables:
+    """Return the tables stored in `path`.
+
+    Raises:
+        ValueError: If the file is not a cache file of the current version.
+
+    """
+    with path.open("rb") as handle:
+        magic, version, count = _HEADER.unpack(handle.read(_HEADER.size))
+        if magic != CACHE_MAGIC or version != CACHE_VERSION:
+            raise ValueError(f"{path} is not a version {CACHE_VERSION} table cache")
+        tables = {}
+        for _ in range(count):
+            name, typecode, length = _TABLE_HEADER.unpack(
+                handle.read(_TABLE_HEADER.size)
+            )
+            table = array(typecode.decode())
+            table.fromfile(handle, length)
+            if sys.byteorder == "big":
+                table.byteswap()
+            tables[name.rstrip(b"\0").decode()] = table
+    return tables
+
+
+def load_or_build(
+    filename: str,
+    names: Sequence[str],
+    builder: Callable[[], Tables],
+    cache_dir: Optional[Path] = None,
+) -> Tables:
+    """Return the tables from the cache file, building and caching them if needed.
+
+    Args:
+        filename: The name of the cache file within the cache directory.
+        names: The tables that the cache file must contain.
+        builder: Called to build the tables if they are not cached.
+        cache_dir: Overrides `default_cache_dir()`.
+
+    """
+    path = (cache_dir or default_cache_dir()) / filename
+    try:
+        tables = read_tables(path)
+        if all(name in tables for name in names):
+            return tables
+    except (OSError, EOFError, ValueError, struct.error):
+        pass  # Missing, stale or corrupt, rebuild it
+
+    tables = builder()
+    try:
+        write_tables(path, tables)
+    except OSError as err:
+        warnings.warn(f"Unable to cache tables to {path}: {err}")
+    return tables
+
+
+def _build_move_table(
+    size: int,
+    from_coord: Callable[[int], Tuple[int, ...]],
+    to_coord: Callable[[Tuple[int, ...]], int],
+    apply_move: Callable[[Tuple[int, ...], CubieCube], Tuple[int, ...]],
+    move_idxs: Sequence[int] = tuple(range(N_MOVES)),
+) -> array:
+    """Build a move table, moves not in `move_idxs` are left as 0.
+
+    The coordinate is decoded to the raw cubie array it depends on, that array is
+    moved by `apply_move` and encoded again.
+
+    """
+    table = array("H", bytes(2 * size * N_MOVES))
+    move_cubes = [MOVE_CUBES[(move.face_ref, move.steps)] for move in MOVES]
+    for coord in range(size):
+        state = from_coord(coord)
+        offset = N_MOVES * coord
+        for move_idx in move_idxs:
+            moved = apply_move(state, move_cubes[move_idx])
+            table[offset + move_idx] = to_coord(moved)
+    return table
+
+
+def _twist_move(co: Tuple[int, ...], move: CubieCube) -> Tuple[int, ...]:
+    return tuple((co[idx] + twist) % 3 for idx, twist in zip(move.cp, move.co))
+
+
+def _flip_move(eo: Tuple[int, ...], move: CubieCube) -> Tuple[int, ...]:
+    return tuple((eo[idx] + flip) % 2 for idx, flip in zip(move.ep, move.eo))
+
+
+def _corner_move(cp: Tuple[int, ...], move: CubieCube) -> Tuple[int, ...]:
+    return tuple(cp[idx] for idx in move.cp)
+
+
+def _edge_move(ep: Tuple[int, ...], move: CubieCube) -> Tuple[int, ...]:
+    return tuple(ep[idx] for idx in move.ep)
+
+
+@attr.s(auto_attribs=True, frozen=True, slots=True)
+class MoveTables:
+    """Move tables for the standard coordinates of `CubieCube`.
+
+    Each table is indexed by `18 * coordinate + move_idx` where `move_idx` indexes
+    `MOVES`. `ud_edges` is only defined for the moves in `PHASE_2_MOVES`.
+
+    """
+
+    twist: array
+    flip: array
+    slice: array
+    slice_sorted: array
+    corners: array
+    ud_edges: array
+
+
+MOVE_TABLE_NAMES = tuple(field.name for field in attr.fields(MoveTables))
+
+
+def build_move_tables() -> Tables:
+    slice_sorted = _build_move_table(
+        N_SLICE_SORTED, ep_from_slice_sorted, slice_sorted_from_ep, _edge_move,
+    )
+    return {
+        "twist": _build_move_table(N_TWIST, co_from_twist, twist_from_co, _twist_move),
+        "flip": _build_move_table(N_FLIP, eo_from_flip, flip_from_eo, _flip_move),
+        # The order of the middle layer edges does not change their position
+        "slice": array(
+            "H",
+            (
+                slice_sorted[N_MOVES * 24 * slice_ + move_idx] // 24
+                for slice_ in range(N_SLICE)
+                for move_idx in range(N_MOVES)
+            ),
+        ),
+        "slice_sorted": slice_sorted,
+        "corners": _build_move_table(
+            N_CORNERS, partial(perm_from_rank, size=8), perm_rank, _corner_move
+        ),
+        "ud_edges": _build_move_table(
+            N_UD_EDGES,
+            lambda coord: perm_from_rank(coord, 8) + tuple(range(8, 12)),
+            lambda ep: perm_rank(ep[:8]),
+            _edge_move,
+            PHASE_2_MOVES,
+        ),
+    }
+
+
+@lru_cache(maxsize=None)
+def get_move_tables(cache_dir: Optional[Path] = None) -> MoveTables:
+    """Return the move tables, loading them once per process."""
+    tables = load_or_build(
+        f"move_tables.v{CACHE_VERSION}.bin",
+        MOVE_TABLE_NAMES,
+        build_move_tables,
+        cache_dir,
+    )
+    return MoveTables(**{name: tables[name] for name in MOVE_TABLE_NAMES})
+
+
+def _build_pruning_table(
+    size: int,
+    move_table: array,
+    inner_size: int,
+    inner_move_table: array,
+    move_idxs: Sequence[int],
+) -> array:
+    """Build a pruning table over a pair of coordinates by breadth-first search.
+
+    Each entry, at `outer * inner_size + inner`, is the number of moves needed to
+    bring both coordinates back to 0.
+
+    """
+    table = array("B", b"\xff" * (size * inner_size))
+    table[0] = 0
+    frontier = [0]
+    depth = 0
+    while frontier:
+        depth += 1
+        next_frontier = []
+        for idx in frontier:
+            outer, inner = divmod(idx, inner_size)
+            outer *= N_MOVES
+            inner *= N_MOVES
+            for move_idx in move_idxs:
+                new_idx = (
+                    move_table[outer + move_idx] * inner_size
+                    + inner_move_table[inner + move_idx]
+                )
+                if table[new_idx] == 0xFF:
+                    table[new_idx] = depth
+                    next_frontier.append(new_idx)
+        frontier = next_frontier
+    return table
+
+
+@attr.s(auto_attribs=True, frozen=True, slots=True)
+class PruningTables:
+    """Lower bounds on the number of moves to finish each phase of the solver.
+
+    The phase 1 tables are indexed by `twist * N_SLICE + slice` and
+    `flip * N_SLICE + slice`, the phase 2 tables by `corners * 24 + slice_sorted` and
+    `ud_edges * 24 + slice_sorted`.
+
+    """
+
+    twist_slice: array
+    flip_slice: array
+    corners_slice: array
+    ud_edges_slice: array
+
+
+PRUNING_TABLE_NAMES = tuple(field.name for field in attr.fields(PruningTables))
+
+
+def build_pruning_tables(move_tables: MoveTables) -> Tables:
+    all_moves = range(N_MOVES)
+    return {
+        "twist_slice": _build_pruning_table(
+            N_TWIST, move_tables.twist, N_SLICE, move_tables.slice, all_moves
+        ),
+        "flip_slice": _build_pruning_table(
+            N_FLIP, move_tables.flip, N_SLICE, move_tables.slice, all_moves
+        ),
+        "corners_slice": _build_pruning_table(
+            N_CORNERS,
+            move_tables.corners,
+            N_SLICE_PERM,
+            move_tables.slice_sorted,
+            PHASE_2_MOVES,
+        ),
+        "ud_edges_slice": _build_pruning_table(
+            N_UD_EDGES,
+            move_tables.ud_edges,
+            N_SLICE_PERM,
+            move_tables.slice_sorted,
+            PHASE_2_MOVES,
+        ),
+    }
+
+
+@lru_cache(maxsize=None)
+def get_pruning_tables(cache_dir: Optional[Path] = None) -> PruningTables:
+    """Return the two-phase pruning tables, loading them once per process."""
+    move_tables = get_move_tables(cache_dir)
+    tables = load_or_build(
+        f"pruning_tables.v{CACHE_VERSION}.bin",
+        PRUNING_TABLE_NAMES,
+        partial(build_pruning_tables, move_tables),
+        cache_dir,
+    )
+    return PruningTables(**{name: tables[name] for name in PRUNING_TABLE_NAMES})
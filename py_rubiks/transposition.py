@@ -0,0 +1,136 @@
+"""A fixed-size transposition table for depth-first searches.
+
+Many move sequences reach the same state, so a depth-first search expands the same
+subtrees over and over. The table records the shallowest depth at which each state has
+been reached during the current iteration, a state reached again at the same or a
+greater depth has already been searched with at least as many moves to spare and can
+be skipped. Reaching it at a shallower depth expands it again.
+
+The table never grows. Keys hash to a bucket of `BUCKET_SIZE` slots and when a bucket
+is full an entry is chosen for replacement by the `Replacement` policy, so a long
+search runs in the memory given up front and only loses some pruning.
+
+"""
+
+from __future__ import annotations
+
+from array import array
+from enum import Enum
+
+from py_rubiks.visited import hash_key
+
+
+BUCKET_SIZE = 4
+
+# Low key bits, high key bits, depth, generation and reference bit
+SLOT_BYTES = 8 + 1 + 1 + 1 + 1
+
+_MASK_64 = (1 << 64) - 1
+
+
+class Replacement(Enum):
+    # Replace the deepest entry, unless the new state is deeper still. Shallow states
+    # root the largest subtrees so they are the most valuable to keep.
+    DEPTH = "depth"
+    # Replace the first entry not used since the bucket was last swept, clearing the
+    # reference bits of the entries passed over
+    CLOCK = "clock"
+
+
+class TranspositionTable:
+    """The shallowest depth at which each state was reached, in fixed memory.
+
+    Args:
+        max_bytes: The memory to use, rounded down to a power of two number of
+            buckets.
+        replacement: How to choose the entry to evict from a full bucket.
+
+    Attributes:
+        hits: The number of times `visit` found a state that could be skipped.
+        evictions: The number of entries that have been replaced.
+
+    """
+
+    def __init__(
+        self, max_bytes: int = 64 << 20, replacement: Replacement = Replacement.DEPTH
+    ) -> None:
+        buckets = max(max_bytes // (SLOT_BYTES * BUCKET_SIZE), 1)
+        self._bits = buckets.bit_length() - 1
+        size = BUCKET_SIZE << self._bits
+        self.replacement = replacement
+        self._low = array("Q", bytes(8 * size))
+        self._high = bytearray(size)
+        self._depth = bytearray(size)
+        self._generation = bytearray(size)
+        self._referenced = bytearray(size)
+        self._current = 1
+        self.hits = 0
+        self.evictions = 0
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._high) * SLOT_BYTES
+
+    def new_generation(self) -> None:
+        """Forget every entry, in constant time, ready for a new iteration."""
+        self._current += 1
+        if self._current > 0xFF:
+            self._generation = bytearray(len(self._generation))
+            self._current = 1
+
+    def visit(self, key: int, depth: int) -> bool:
+        """Record that the state with `key` was reached at `depth`.
+
+        Args:
+            key: A key below `2 ** 72`, such as `visited.state_key`.
+            depth: The number of moves made to reach the state, below 256.
+
+        Returns:
+            `False` if the state has already been reached at the same or a shallower
+            depth in this generation, so it does not need expanding again.
+
+        """
+        low = key & _MASK_64
+        high = key >> 64
+        current = self._current
+        generation = self._generation
+        start = hash_key(key, self._bits) * BUCKET_SIZE
+        free = -1
+        for slot in range(start, start + BUCKET_SIZE):
+            if generation[slot] != current:
+                if free < 0:
+                    free = slot
+            elif self._low[slot] == low and self._high[slot] == high:
+                self._referenced[slot] = 1
+                if self._depth[slot] <= depth:
+                    self.hits += 1
+                    return False
+                self._depth[slot] = depth
+                return True
+
+        if free < 0:
+            free = self._victim(start, depth)
+            if free < 0:
+                return True
+            self.evictions += 1
+        self._low[free] = low
+        self._high[free] = high
+        self._depth[free] = depth
+        generation[free] = current
+        self._referenced[free] = 1
+        return True
+
+    def _victim(self, start: int, depth: int) -> int:
+        """Return the slot to replace in the full bucket at `start`, or -1 for none."""
+        if self.replacement == Replacement.DEPTH:
+            victim = max(
+                range(start, start + BUCKET_SIZE), key=self._depth.__getitem__
+            )
+            return victim if self._depth[victim] >= depth else -1
+
+        referenced = self._referenced
+        for slot in range(start, start + BUCKET_SIZE):
+            if not referenced[slot]:
+                return slot
+            referenced[slot] = 0
+        return start
@@ -1,73 +1,129 @@
 from __future__ import annotations
 
 import weakref
-from functools import cached_property
-from typing import List, Optional
+from typing import Iterable, List, Optional
 
 import attr
 
 from py_rubiks.cube import Cube
 
 
-@attr.s(auto_attribs=True)
+@attr.s(auto_attribs=True, slots=True, eq=False)
 class Node:
+    """A node of an explicit search tree.
+
+    Each node counts the unvisited nodes in its subtree, itself included, and the
+    counts of its ancestors are updated whenever a node is visited, added or deleted.
+    This makes `is_fully_visited` an O(1) lookup, while visiting, adding or deleting a
+    node and `highest_fully_visited_node` walk up the ancestors and take O(depth).
+    Every operation is iterative, so deep paths do not hit the recursion limit.
+    Change `children` with `add`, `delete` or by assigning a new list, not by
+    mutating it in place.
+
+    Nodes compare by identity.
+
+    """
+
     cube: Cube
 
     parent: Optional[Node] = attr.ib(init=False, repr=False, default=None)
-    children: List[Node] = attr.ib(factory=list, init=False, repr=False)
-    visited: bool = attr.ib(default=False, init=False)
+    # The depth in the tree, this is zero-indexed and set when the node is added
+    depth: int = attr.ib(init=False, repr=False, default=0)
+    _children: List[Node] = attr.ib(factory=list, init=False, repr=False)
+    _visited: bool = attr.ib(default=False, init=False, repr=False)
+    _unvisited: int = attr.ib(default=1, init=False, repr=False)
+
+    @property
+    def children(self) -> List[Node]:
+        return self._children
 
-    @cached_property
-    def depth(self) -> int:
-        """Return the depth of `self` in the tree, this is zero-indexed."""
-        if self.parent:
-            return 1 + self.parent.depth
-        return 0
+    @children.setter
+    def children(self, children: Iterable[Node]) -> None:
+        self._update_counts(int(not self._visited) - self._unvisited)
+        self._children = []
+        for child in children:
+            self.add(child)
+
+    @property
+    def visited(self) -> bool:
+        return self._visited
+
+    @visited.setter
+    def visited(self, visited: bool) -> None:
+        if visited != self._visited:
+            self._visited = visited
+            self._update_counts(-1 if visited else 1)
 
     @property
     def is_fully_visited(self) -> bool:
-        if not self.visited:
-            return False
-        for child in self.children:
-            if not child.is_fully_visited:
-                return False
-        return True
+        return not self._unvisited
+
+    def _update_counts(self, delta: int) -> None:
+        """Add `delta` to the unvisited counts of `self` and its ancestors."""
+        node: Optional[Node] = self
+        while node is not None:
+            node._unvisited += delta
+            node = node.parent
 
     def add(self, child: Node) -> None:
+        """Add `child` and its subtree below `self`.
+
+        Takes O(depth) to update the counts of the ancestors, plus the size of the
+        subtree of `child` to set the depths in it.
+
+        """
         child.parent = weakref.proxy(self)
-        self.children.append(child)
+        self._children.append(child)
+        self._update_counts(child._unvisited)
+
+        child.depth = self.depth + 1
+        stack = list(child._children)
+        while stack:
+            node = stack.pop()
+            node.depth = node.parent.depth + 1  # type: ignore
+            stack.extend(node._children)
 
     def backtrace(self) -> List[Node]:
         """Return the path back up to the root from `self`, not including the root."""
-        if not self.parent:
-            return []
-        path: List[Node] = [self]
-        path.extend(self.parent.backtrace())
+        path: List[Node] = []
+        node = self
+        while node.parent is not None:
+            path.append(node)
+            node = node.parent
         return path
 
     def delete(self) -> None:
         """Break the reference cycle to allow `self` and all children to be gc'd."""
-        if self.parent:
-            self.parent.children.remove(self)
         self.children = []
+        if self.parent is not None:
+            self.parent._children.remove(self)
+            self.parent._update_counts(-self._unvisited)
+            self.parent = None
 
     def highest_fully_visited_node(self) -> Optional[Node]:
-        if parent := self.parent:
-            if parent.is_fully_visited:
-                return parent.highest_fully_visited_node()
-            else:
-                return self
-        else:
-            if self.is_fully_visited:
-                return self
-            else:
-                return None
+        """Return the highest fully visited node on the path from `self` to the root.
 
-    def prune(self, previous: Optional[Node] = None) -> None:
-        if not self.parent:
+        Returns `None` if there is none. Takes O(depth) as it walks up the ancestors.
+
+        """
+        node = self
+        while node.parent is not None and node.parent.is_fully_visited:
+            node = node.parent
+        if node.parent is None and not node.is_fully_visited:
             return None
-        if self.is_fully_visited:
-            self.parent.prune(self)
-        else:
-            if previous:
-                previous.delete()
+        return node
+
+    def prune(self, previous: Optional[Node] = None) -> None:
+        """Delete the highest fully visited node on the path from `self` to the root.
+
+        The root itself is never deleted.
+
+        """
+        node = self
+        while node.parent is not None:
+            if not node.is_fully_visited:
+                if previous:
+                    previous.delete()
+                return
+            previous = node
+            node = node.parent
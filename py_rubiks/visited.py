@@ -0,0 +1,238 @@
+"""Compact state keys and an open-addressing set for visited states.
+
+Keeping every visited state as a sticker string or tuple in a `set` costs well over
+100 bytes per state. Here a state is ranked to a single integer from its cubie
+coordinates, and `VisitedSet` stores the keys in flat arrays, 9 bytes per slot, so
+tens of millions of states fit in a few hundred MB.
+
+The cube group has about 4.3e19 states, more than fit in 64 bits, so a key is the low
+64 bits in an `array("Q")` with the few remaining high bits in a `bytearray`.
+
+"""
+
+from __future__ import annotations
+
+from array import array
+from math import factorial
+from operator import itemgetter
+from typing import Iterable, Iterator, Sequence, Tuple
+
+from py_rubiks.cube import FACE_ORDER, Cube
+from py_rubiks.cubie import (
+    CORNER_FACES,
+    CORNER_STICKERS,
+    EDGE_FACES,
+    EDGE_STICKERS,
+    N_CORNERS,
+    N_FLIP,
+    N_TWIST,
+    CubieCube,
+    co_from_twist,
+    eo_from_flip,
+    flip_from_eo,
+    perm_from_rank,
+    perm_rank,
+    twist_from_co,
+)
+from py_rubiks.symmetry import face_codes
+
+
+N_EDGE_PERMS = factorial(12)
+
+# Keys are below this, 67 bits
+N_STATE_KEYS = N_CORNERS * N_TWIST * N_EDGE_PERMS * N_FLIP
+
+_INVALID = 0xFF
+
+
+def _slot_tables() -> Tuple[bytes, bytes]:
+    """Return translation tables from `6 * first + second` face codes to pieces.
+
+    The first two stickers of a corner or edge position identify the piece in it and
+    its orientation, the tables give `3 * corner + twist` and `2 * edge + flip`.
+
+    """
+    corners = bytearray([_INVALID]) * 256
+    for corner, corner_faces in enumerate(CORNER_FACES):
+        codes = [FACE_ORDER.index(face_ref) for face_ref in corner_faces]
+        for twist in range(3):
+            # As in `CubieCube.from_cube`, the sticker at `twist` is the top or bottom
+            corners[6 * codes[-twist % 3] + codes[(1 - twist) % 3]] = 3 * corner + twist
+    edges = bytearray([_INVALID]) * 256
+    for edge, edge_faces in enumerate(EDGE_FACES):
+        codes = [FACE_ORDER.index(face_ref) for face_ref in edge_faces]
+        edges[6 * codes[0] + codes[1]] = 2 * edge
+        edges[6 * codes[1] + codes[0]] = 2 * edge + 1
+    return bytes(corners), bytes(edges)
+
+
+_CORNER_TABLE, _EDGE_TABLE = _slot_tables()
+_TIMES_SIX = bytes((6 * value) & 0xFF for value in range(256))
+
+_SLOTS = CORNER_STICKERS + EDGE_STICKERS
+_FIRST_STICKERS = itemgetter(*(stickers[0] for stickers in _SLOTS))
+_SECOND_STICKERS = itemgetter(*(stickers[1] for stickers in _SLOTS))
+
+
+def state_key(cube: Cube) -> int:
+    """Return the rank of the state of `cube`, `0 <= key < N_STATE_KEYS`.
+
+    The faces are identified by their centre colours, so the key is independent of
+    the colour scheme. Permutation parity is not checked, the key of an unsolvable
+    state with valid pieces is that of the state with the same pieces and
+    orientations.
+
+    Raises:
+        ValueError: If the stickers do not describe a set of valid pieces.
+
+    """
+    return codes_key(face_codes(cube))
+
+
+def codes_key(codes: bytes) -> int:
+    """Return the `state_key` of stickers given as face codes, see `face_codes`.
+
+    Raises:
+        ValueError: If the codes do not describe a set of valid pieces.
+
+    """
+    first = bytes(_FIRST_STICKERS(codes)).translate(_TIMES_SIX)
+    second = bytes(_SECOND_STICKERS(codes))
+    # Each byte is below 36, so adding the integers adds the bytes without carries
+    pairs = (
+        int.from_bytes(first, "big") + int.from_bytes(second, "big")
+    ).to_bytes(len(_SLOTS), "big")
+    corners = pairs[:8].translate(_CORNER_TABLE)
+    edges = pairs[8:].translate(_EDGE_TABLE)
+    if _INVALID in corners or _INVALID in edges:
+        raise ValueError("Invalid sticker combination")
+
+    cp = [value // 3 for value in corners]
+    co = [value % 3 for value in corners]
+    ep = [value >> 1 for value in edges]
+    eo = [value & 1 for value in edges]
+    if len(set(cp)) != 8 or len(set(ep)) != 12:
+        raise ValueError("Each piece must appear exactly once")
+    if sum(co) % 3 or sum(eo) % 2:
+        raise ValueError("Invalid corner or edge orientation")
+
+    key = perm_rank(cp) * N_TWIST + twist_from_co(co)
+    key = key * N_EDGE_PERMS + perm_rank(ep)
+    return key * N_FLIP + flip_from_eo(eo)
+
+
+def cubie_from_key(key: int) -> CubieCube:
+    """Return the `CubieCube` with the given `state_key`."""
+    key, flip = divmod(key, N_FLIP)
+    key, edges = divmod(key, N_EDGE_PERMS)
+    corners, twist = divmod(key, N_TWIST)
+    return CubieCube(
+        perm_from_rank(corners, 8),
+        co_from_twist(twist),
+        perm_from_rank(edges, 12),
+        eo_from_flip(flip),
+    )
+
+
+def cube_from_key(key: int, centres: Sequence[str]) -> Cube:
+    """Return the `Cube` with the given `state_key` and centre colours."""
+    return cubie_from_key(key).to_cube(centres)
+
+
+_MASK_64 = (1 << 64) - 1
+_GOLDEN = 0x9E3779B97F4A7C15
+
+
+def hash_key(key: int, bits: int) -> int:
+    """Return a well mixed `bits` bit hash of an integer key."""
+    low = key & _MASK_64
+    return ((low ^ (key >> 64) ^ (low >> 29)) * _GOLDEN & _MASK_64) >> (64 - bits)
+
+
+class VisitedSet:
+    """An open-addressing hash set of integer keys below `2 ** 72 - 2 ** 64`.
+
+    Slots are probed linearly. The low 64 bits of a key are stored in an
+    `array("Q")` and the rest plus one in a `bytearray`, where 0 marks an empty slot.
+    The table doubles in size when it is more than `max_load` full.
+
+    """
+
+    def __init__(
+        self, keys: Iterable[int] = (), capacity: int = 1 << 16, max_load: float = 0.75
+    ) -> None:
+        bits = max(capacity - 1, 1).bit_length()
+        self.max_load = max_load
+        self._allocate(bits)
+        self._len = 0
+        for key in keys:
+            self.add(key)
+
+    def _allocate(self, bits: int) -> None:
+        self._bits = bits
+        self._mask = (1 << bits) - 1
+        self._low = array("Q", bytes(8 << bits))
+        self._high = bytearray(1 << bits)
+        self._limit = int(self.max_load * (1 << bits))
+
+    def _slot(self, key: int) -> int:
+        """Return the slot holding `key` or the empty slot where it would go."""
+        low = key & _MASK_64
+        high = (key >> 64) + 1
+        slot = hash_key(key, self._bits)
+        stored_low = self._low
+        stored_high = self._high
+        mask = self._mask
+        while True:
+            stored = stored_high[slot]
+            if not stored or (stored == high and stored_low[slot] == low):
+                return slot
+            slot = (slot + 1) & mask
+
+    def add(self, key: int) -> bool:
+        """Add `key`, returning `True` if it was not already in the set.
+
+        Raises:
+            ValueError: If `key` is out of range.
+
+        """
+        if not 0 <= key < 0xFF << 64:
+            raise ValueError(f"{key} is out of range")
+        slot = self._slot(key)
+        if self._high[slot]:
+            return False
+        self._low[slot] = key & _MASK_64
+        self._high[slot] = (key >> 64) + 1
+        self._len += 1
+        if self._len > self._limit:
+            self._grow()
+        return True
+
+    def _grow(self) -> None:
+        low, high = self._low, self._high
+        self._allocate(self._bits + 1)
+        for slot, stored in enumerate(high):
+            if stored:
+                key = (stored - 1) << 64 | low[slot]
+                new_slot = self._slot(key)
+                self._low[new_slot] = low[slot]
+                self._high[new_slot] = stored
+
+    def __contains__(self, key: object) -> bool:
+        if not isinstance(key, int) or not 0 <= key < 0xFF << 64:
+            return False
+        return bool(self._high[self._slot(key)])
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __iter__(self) -> Iterator[int]:
+        low = self._low
+        for slot, stored in enumerate(self._high):
+            if stored:
+                yield (stored - 1) << 64 | low[slot]
+
+    @property
+    def nbytes(self) -> int:
+        """Return the memory used by the table."""
+        return len(self._low) * self._low.itemsize + len(self._high)
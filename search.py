@@ -1,18 +1,14 @@
+import argparse
 import time
-from typing import List, Set
+from typing import Optional
 
+from py_rubiks.bidirectional import bidirectional_search
 from py_rubiks.cube import Cube, CubeFace
-from py_rubiks.tree import Node
-
-
-GOAL_CUBE = Cube(
-    front=CubeFace([["B", "B", "B"], ["B", "B", "B"], ["B", "B", "B"],]),
-    right=CubeFace([["R", "R", "R"], ["R", "R", "R"], ["R", "R", "R"],]),
-    back=CubeFace([["G", "G", "G"], ["G", "G", "G"], ["G", "G", "G"],]),
-    left=CubeFace([["O", "O", "O"], ["O", "O", "O"], ["O", "O", "O"],]),
-    top=CubeFace([["Y", "Y", "Y"], ["Y", "Y", "Y"], ["Y", "Y", "Y"],]),
-    bottom=CubeFace([["W", "W", "W"], ["W", "W", "W"], ["W", "W", "W"],]),
-)
+from py_rubiks.ida import Iteration, SearchResult, orientation_heuristic
+from py_rubiks.optimal import solve_optimal
+from py_rubiks.parallel import parallel_ida_star
+from py_rubiks.path_search import path_stack_search
+from py_rubiks.solver import solve
 
 
 # INITIAL_CUBE = Cube(
@@ -35,45 +31,102 @@ INITIAL_CUBE = Cube(
 )
 
 
-def depth_limited_search(tree: Node) -> Node:
-    visited_nodes: Set[str] = set()
-    frontier: List[Node] = [tree]
-
-    while frontier:
-        node = frontier.pop()
-        node.visited = True
-
-        if node.depth == 30:
-            node.prune()
-            continue
-
-        state_str = node.cube.state_str
-        if state_str not in visited_nodes:
-            if node.cube == GOAL_CUBE:
-                return node
-
-            visited_nodes.add(state_str)
-            for successor in node.cube.successors():
-                successor_node = Node(successor)
-                node.add(successor_node)
-                frontier.append(successor_node)
-
-    raise RuntimeError("No solution found")
+def print_iteration(iteration: Iteration) -> None:
+    print(
+        f"Searched to f-bound {iteration.bound}: {iteration.nodes} nodes "
+        f"in {iteration.elapsed:.2f} seconds"
+    )
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument(
+        "--optimal",
+        action="store_true",
+        help="Use the pattern databases to find a shortest solution",
+    )
+    mode.add_argument(
+        "--bidirectional",
+        action="store_true",
+        help="Search from both the start and the goal until the searches meet",
+    )
+    mode.add_argument(
+        "--ida",
+        action="store_true",
+        help="Run IDA* with the orientation heuristic, only practical for short "
+        "scrambles",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        help="Give up after this many seconds, the two-phase solver stops looking "
+        "for shorter solutions after this, one second by default",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Split the IDA* search across this many processes",
+    )
+    parser.add_argument(
+        "--tree",
+        action="store_true",
+        help="Build the search tree of the IDA* search for debugging",
+    )
+    args = parser.parse_args()
+
     start_time = time.time()
 
-    root = Node(INITIAL_CUBE)
-    goal_node = depth_limited_search(root)
+    result: Optional[SearchResult] = None
+    if args.optimal:
+        result = solve_optimal(
+            INITIAL_CUBE, timeout=args.timeout, on_iteration=print_iteration
+        )
+    elif args.bidirectional:
+        result = bidirectional_search(
+            INITIAL_CUBE, timeout=args.timeout, on_iteration=print_iteration
+        )
+    elif args.ida and args.workers > 1:
+        result = parallel_ida_star(
+            INITIAL_CUBE,
+            heuristic=orientation_heuristic(),
+            on_iteration=print_iteration,
+            timeout=args.timeout,
+            workers=args.workers,
+        )
+    elif args.ida:
+        result = path_stack_search(
+            INITIAL_CUBE,
+            heuristic=orientation_heuristic().estimate,
+            on_iteration=print_iteration,
+            timeout=args.timeout,
+            tree=args.tree,
+        )
+        if result.tree:
+            size = 0
+            stack = [result.tree]
+            while stack:
+                node = stack.pop()
+                size += 1
+                stack.extend(node.children)
+            print(f"Built a tree of {size} nodes in the last iteration")
+    else:
+        # The two-phase solver, stopping the search for shorter solutions after a
+        # second by default
+        timeout = 1.0 if args.timeout is None else args.timeout
+        moves = solve(INITIAL_CUBE, timeout=timeout)
+
+    if result is not None:
+        moves = result.moves
 
     print(f"Found solution in {time.time() - start_time} seconds")
-    print(f"at depth: {goal_node.depth}")
-
-    for node in goal_node.backtrace():
-        if node.cube.from_move:
-            print(
-                f"{node.cube.from_move.face_ref} --> turns: {node.cube.from_move.steps}"
-            )
-        else:
-            print("Something went wrong...")
+    print(f"at depth: {len(moves)}")
+    if result is not None:
+        print(
+            f"Generated {result.nodes} nodes "
+            f"({result.nodes_per_second:.0f} nodes per second)"
+        )
+
+    for move in moves:
+        print(f"{move.face_ref} --> turns: {move.steps}")
@@ -0,0 +1,36 @@
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+from py_rubiks.tables import CACHE_DIR_ENV
+
+import pytest
+
+
+_cache_dir = Path(tempfile.mkdtemp(prefix="py_rubiks-cache-"))
+_previous = os.environ.get(CACHE_DIR_ENV)
+
+
+def pytest_configure(config):
+    """Build the tables into a temporary cache rather than the user's cache.
+
+    The variable is set before the tests are collected, so tables built at import or
+    collection time do not reach the user's cache either.
+
+    """
+    os.environ[CACHE_DIR_ENV] = str(_cache_dir)
+
+
+def pytest_unconfigure(config):
+    if _previous is None:
+        os.environ.pop(CACHE_DIR_ENV, None)
+    else:
+        os.environ[CACHE_DIR_ENV] = _previous
+    shutil.rmtree(_cache_dir, ignore_errors=True)
+
+
+@pytest.fixture(scope="session")
+def cache_dir():
+    """The temporary cache that the tables are built into."""
+    return _cache_dir
@@ -0,0 +1,28 @@
+from py_rubiks.cube import FACE_ORDER, MOVES, Cube, FaceRef, Move
+
+
+solved_cube = Cube.from_stickers(
+    tuple(face_ref.name for face_ref in FACE_ORDER for _ in range(9))
+)
+
+# No prefix of the scramble can be solved in fewer moves than it has, the short one
+# is for the slower searches
+scramble = [
+    Move(FaceRef.R, 1),
+    Move(FaceRef.U, 2),
+    Move(FaceRef.F, 3),
+    Move(FaceRef.L, 1),
+    Move(FaceRef.D, 3),
+    Move(FaceRef.B, 2),
+]
+short_scramble = scramble[:3]
+
+
+def apply_moves(cube, moves):
+    for move in moves:
+        cube = cube.rotate_layer(move.face_ref, move.steps)
+    return cube
+
+
+def random_moves(rng, length):
+    return [rng.choice(MOVES) for _ in range(length)]
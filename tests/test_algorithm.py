@@ -0,0 +1,124 @@
+from py_rubiks.algorithm import (
+    IDENTITY,
+    Algorithm,
+    apply_algorithm,
+    compile_algorithm,
+    cycles,
+    invert,
+    order,
+    power,
+)
+from py_rubiks.cube import MOVES, Cube, FaceRef, Move
+from py_rubiks.notation import parse_moves
+from tests.helpers import apply_moves, solved_cube
+
+import pytest
+
+
+t_perm = "R U R' U' R' F R2 U' R' U' R U R' F'"
+
+
+class TestCompileAlgorithm:
+    def test_empty(self):
+        algorithm = compile_algorithm("")
+        assert algorithm.moves == ()
+        assert algorithm.permutation == IDENTITY
+        assert algorithm.apply(solved_cube) == solved_cube
+
+    @pytest.mark.parametrize("text", ("R", "R U R' U2", t_perm))
+    def test_matches_rotate_layer(self, text):
+        moves = parse_moves(text)
+        cube = apply_moves(solved_cube, MOVES[::5])
+        assert apply_algorithm(cube, text) == apply_moves(cube, moves)
+        assert apply_algorithm(cube, moves) == apply_moves(cube, moves)
+
+    def test_cached_by_sequence(self):
+        moves = parse_moves(t_perm)
+        assert compile_algorithm(t_perm) is compile_algorithm(t_perm)
+        assert compile_algorithm(moves) is compile_algorithm(iter(moves))
+        assert compile_algorithm(moves) == Algorithm.from_moves(moves)
+
+    def test_keeps_cube_attributes(self):
+        cube = Cube.from_stickers(
+            solved_cube.stickers, FaceRef.R, from_move=Move(FaceRef.U, 1)
+        )
+        moved = apply_algorithm(cube, "F2")
+        assert moved.universal_front_face == FaceRef.R
+        assert moved.from_move == Move(FaceRef.U, 1)
+
+    def test_invalid_notation(self):
+        with pytest.raises(ValueError):
+            compile_algorithm("R U Q")
+
+
+numbered_cube = Cube.from_stickers(tuple(str(idx) for idx in range(54)))
+
+
+class TestAlgebra:
+    @pytest.mark.parametrize(
+        "text, expected",
+        (
+            ("", 1),
+            ("R", 4),
+            ("R2", 2),
+            ("R U R' U'", 6),
+            ("R U", 105),
+            ("R U2 D' B D'", 1260),
+            (t_perm, 2),
+        ),
+    )
+    def test_order(self, text, expected):
+        algorithm = compile_algorithm(text)
+        assert algorithm.order == expected
+        assert (algorithm ** expected).is_identity
+        if expected > 1:
+            assert not (algorithm ** (expected - 1)).is_identity
+
+    def test_compose(self):
+        first, second = compile_algorithm("R U"), compile_algorithm("F' D2")
+        composed = first * second
+        assert composed == compile_algorithm("R U F' D2")
+        assert composed.apply(numbered_cube) == second.apply(first.apply(numbered_cube))
+
+    def test_inverse(self):
+        algorithm = compile_algorithm("R U2 F")
+        inverse = algorithm.inverse()
+        assert inverse.moves == tuple(parse_moves("F' U2 R'"))
+        assert (algorithm * inverse).is_identity
+        assert inverse.permutation == invert(algorithm.permutation)
+
+    @pytest.mark.parametrize("exponent", (0, 1, 2, 7, 64, -1, -5))
+    def test_power(self, exponent):
+        algorithm = compile_algorithm("R U F'")
+        expected = compile_algorithm("")
+        step = algorithm if exponent >= 0 else algorithm.inverse()
+        for _ in range(abs(exponent)):
+            expected = expected * step
+        result = algorithm ** exponent
+        assert result.permutation == expected.permutation
+        assert len(result.moves) < algorithm.order * len(algorithm.moves)
+        assert power(algorithm.permutation, exponent) == expected.permutation
+
+    def test_power_of_large_exponent(self):
+        permutation = compile_algorithm("R U").permutation
+        assert power(permutation, 105 * 10 ** 12 + 1) == permutation
+
+    def test_algorithm_power_reduces_exponent(self):
+        algorithm = compile_algorithm("R U")
+        assert algorithm ** (105 * 10 ** 12 + 1) == algorithm
+        assert algorithm ** 10 ** 8 == algorithm ** 100
+
+    def test_cycles(self):
+        algorithm = compile_algorithm("R U")
+        found = algorithm.cycles()
+        assert sum(map(len, found)) == sum(
+            1 for idx, source in enumerate(algorithm.permutation) if idx != source
+        )
+        moved = algorithm.apply(numbered_cube).stickers
+        for cycle in found:
+            for idx, target in zip(cycle, cycle[1:] + cycle[:1]):
+                assert moved[target] == str(idx)
+
+    def test_identity_has_no_cycles(self):
+        assert cycles(IDENTITY) == []
+        assert order(IDENTITY) == 1
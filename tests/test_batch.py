@@ -0,0 +1,86 @@
+import json
+
+from py_rubiks.batch import (
+    Scramble,
+    main,
+    parse_scramble,
+    read_scrambles,
+    solve_batch,
+)
+from py_rubiks.notation import parse_moves
+from tests.helpers import apply_moves, solved_cube
+
+import pytest
+
+
+scrambles = ["R U R' U2", "F2 B' L D", "D L2 B' R U' F2 L' D2 B R'"]
+
+
+class TestParseScramble:
+    def test_moves(self):
+        assert parse_scramble("R U R' U2") == apply_moves(
+            solved_cube, parse_moves("R U R' U2")
+        )
+
+    def test_facelets(self):
+        cube = apply_moves(solved_cube, parse_moves("F2 B' L D"))
+        assert parse_scramble(cube.to_facelets()) == cube
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            parse_scramble("R U X")
+
+
+class TestReadScrambles:
+    def test_lines(self):
+        lines = ["R U\n", "\n", '{"id": 7, "scramble": "F2"}\n', "{not json\n"]
+        assert list(read_scrambles(lines)) == [
+            Scramble(0, "R U"),
+            Scramble(1, "F2", 7),
+            Scramble(2, "{not json"),
+        ]
+
+    def test_scramble_must_be_a_string(self):
+        line = '{"id": "a", "scramble": 123}'
+        (scramble,) = read_scrambles([line])
+        assert scramble.id == "a"
+        assert scramble.error
+
+
+class TestSolveBatch:
+    @pytest.mark.parametrize("workers", (1, 2))
+    def test_results_in_input_order(self, workers):
+        results = list(solve_batch(read_scrambles(scrambles), workers=workers))
+        assert [result.scramble.index for result in results] == [0, 1, 2]
+        for text, result in zip(scrambles, results):
+            assert result.error is None
+            assert result.elapsed >= 0
+            assert apply_moves(parse_scramble(text), result.moves).is_solved
+
+    def test_errors_are_reported_per_scramble(self):
+        invalid = "F" * 54  # Every sticker the same colour
+        lines = ["R U X", invalid, "R"]
+        results = list(solve_batch(read_scrambles(lines), workers=1))
+        assert [result.moves is None for result in results] == [True, True, False]
+        assert all(result.error for result in results[:2])
+
+    @pytest.mark.parametrize("workers", (1, 2))
+    def test_malformed_record_is_reported_per_scramble(self, workers):
+        lines = ['{"id": "a", "scramble": 123}', "R U", '{"id": "b", "scramble": "F2"}']
+        results = list(solve_batch(read_scrambles(lines), workers=workers))
+        assert [result.scramble.id for result in results] == ["a", None, "b"]
+        assert results[0].moves is None
+        assert results[0].error
+        for line, result in zip(["R U", "F2"], results[1:]):
+            assert result.error is None
+            assert apply_moves(parse_scramble(line), result.moves).is_solved
+
+    def test_main(self, tmp_path, capsys):
+        path = tmp_path / "scrambles.txt"
+        path.write_text('R U\n{"id": "x", "scramble": "nope"}\n')
+        main([str(path), "--workers", "1"])
+        lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+        assert lines[0]["index"] == 0
+        assert lines[0]["length"] == len(parse_moves(lines[0]["solution"]))
+        assert lines[1]["id"] == "x"
+        assert "error" in lines[1]
@@ -0,0 +1,54 @@
+from py_rubiks.bidirectional import bidirectional_search
+from py_rubiks.cube import Cube, FaceRef
+from py_rubiks.ida import SearchTimeout, ida_star
+from tests.helpers import apply_moves, scramble, solved_cube
+
+import pytest
+
+
+class TestBidirectionalSearch:
+    def test_solved_start(self):
+        result = bidirectional_search(solved_cube)
+        assert result.moves == []
+
+    @pytest.mark.parametrize("length", range(1, len(scramble) + 1))
+    def test_finds_shortest_solution(self, length):
+        cube = apply_moves(solved_cube, scramble[:length])
+        result = bidirectional_search(cube)
+        assert len(result.moves) == length
+        assert apply_moves(cube, result.moves).is_solved
+
+    def test_matches_ida_star(self):
+        cube = apply_moves(solved_cube, scramble[:3])
+        assert len(bidirectional_search(cube).moves) == len(ida_star(cube).moves)
+
+    def test_explicit_goal(self):
+        start = apply_moves(solved_cube, scramble[:2])
+        goal = apply_moves(solved_cube, scramble[:4])
+        result = bidirectional_search(start, goal)
+        assert result.moves == scramble[2:4]
+
+    def test_fewer_nodes_than_one_sided_search(self):
+        cube = apply_moves(solved_cube, scramble[:4])
+        assert bidirectional_search(cube).nodes < ida_star(cube).nodes
+
+    def test_different_centres(self):
+        goal = solved_cube.rotate_cube(FaceRef.R)
+        with pytest.raises(ValueError):
+            bidirectional_search(solved_cube, goal)
+
+    def test_invalid_cube(self):
+        stickers = list(solved_cube.stickers)
+        stickers[1], stickers[37] = stickers[37], stickers[1]  # Flip a single edge
+        with pytest.raises(ValueError):
+            bidirectional_search(Cube.from_stickers(tuple(stickers)))
+
+    def test_no_solution(self):
+        cube = apply_moves(solved_cube, scramble)
+        with pytest.raises(RuntimeError):
+            bidirectional_search(cube, max_depth=4)
+
+    def test_timeout(self):
+        cube = apply_moves(solved_cube, scramble)
+        with pytest.raises(SearchTimeout):
+            bidirectional_search(cube, timeout=0)
@@ -1,4 +1,14 @@
-from py_rubiks.cube import Cube, CubeFace, EdgeRef, FaceRef, Move
+import pickle
+
+from py_rubiks.cube import (
+    CUBE_BYTES,
+    MOVES,
+    Cube,
+    CubeFace,
+    EdgeRef,
+    FaceRef,
+    Move,
+)
 
 import pytest
 
@@ -120,12 +130,29 @@ class TestMove:
             (Move(FaceRef.F, 1), Move(FaceRef.R, 3), False),
             (Move(FaceRef.F, 1), Move(FaceRef.F, 3), True),
             (Move(FaceRef.F, 2), Move(FaceRef.F, 2), True),
+            (Move(FaceRef.F, 3), Move(FaceRef.F, 1), True),
+            (Move(FaceRef.F, 1), Move(FaceRef.F, 1), False),
+        ),
+        ids=(
+            "Different faces",
+            "True reverse 1",
+            "True reverse 2",
+            "True reverse 3",
+            "Same move",
         ),
-        ids=("Different faces", "True reverse 1", "True reverse 2"),
     )
     def test_is_reverse(self, left, right, expected):
         assert left.is_reverse(right) is expected
 
+    @pytest.mark.parametrize("steps", (1, 2, 3))
+    def test_reverse_undoes_move(self, steps):
+        move = Move(FaceRef.R, steps)
+        reverse = move.reverse()
+        assert move.is_reverse(reverse)
+        cube = Cube(*shuffled_cube_state)
+        moved = cube.rotate_layer(move.face_ref, move.steps)
+        assert moved.rotate_layer(reverse.face_ref, reverse.steps) == cube
+
 
 initial_cube_state = [
     CubeFace([["O", "O", "O"], ["O", "O", "O"], ["O", "O", "O"],]),  # Front
@@ -922,3 +949,186 @@ class TestCube:
         successor = successors[0]
         successors = list(successor.successors())
         assert len(successors) == 15
+
+    def test_stickers_view(self):
+        cube = Cube(*shuffled_cube_state)
+        assert cube.stickers == tuple(str(idx) for idx in range(1, 55))
+        assert Cube.from_stickers(cube.stickers) == cube
+        assert cube.front == shuffled_cube_state[0]
+        assert cube.bottom == shuffled_cube_state[5]
+
+    @pytest.mark.parametrize("face_ref", list(FaceRef))
+    def test_layer_rotation_steps_compose(self, face_ref):
+        cube = Cube(*shuffled_cube_state)
+        once = cube.rotate_layer(face_ref, 1)
+        assert cube.rotate_layer(face_ref, 2) == once.rotate_layer(face_ref, 1)
+        assert cube.rotate_layer(face_ref, 3) == once.rotate_layer(face_ref, 2)
+        assert once.rotate_layer(face_ref, 3) == cube
+
+    def test_layer_rotation_preserves_centres(self):
+        cube = Cube(*shuffled_cube_state)
+        for face_ref in FaceRef:
+            cube = cube.rotate_layer(face_ref, 1)
+        assert [cube.stickers[idx] for idx in range(4, 54, 9)] == [
+            "5",
+            "14",
+            "23",
+            "32",
+            "41",
+            "50",
+        ]
+
+    def test_commutator_order(self):
+        """The commutator R U R' U' returns to the start after six repetitions."""
+        cube = Cube(*shuffled_cube_state)
+        rotated = cube
+        for repetition in range(6):
+            assert repetition == 0 or rotated != cube
+            rotated = (
+                rotated.rotate_layer(FaceRef.R, 1)
+                .rotate_layer(FaceRef.U, 1)
+                .rotate_layer(FaceRef.R, 3)
+                .rotate_layer(FaceRef.U, 3)
+            )
+        assert rotated == cube
+
+    def test_successors_match_rotate_layer(self):
+        cube = Cube(*shuffled_cube_state)
+        for successor in cube.successors():
+            move = successor.from_move
+            assert successor == cube.rotate_layer(move.face_ref, move.steps)
+
+    def test_is_solved(self):
+        cube = Cube(*initial_cube_state)
+        assert cube.is_solved
+        assert not cube.rotate_layer(FaceRef.R, 1).is_solved
+        assert not Cube(*shuffled_cube_state).is_solved
+
+    @pytest.mark.parametrize(
+        "face_ref, canonical, expected",
+        (
+            (FaceRef.F, True, 15),
+            (FaceRef.B, True, 12),
+            (FaceRef.B, False, 15),
+            (FaceRef.U, True, 15),
+            (FaceRef.D, True, 12),
+        ),
+        ids=(
+            "Before opposite face",
+            "After opposite face",
+            "Non-canonical",
+            "Top",
+            "Bottom",
+        ),
+    )
+    def test_canonical_successors(self, face_ref, canonical, expected):
+        cube = Cube(*shuffled_cube_state).rotate_layer(face_ref, 1)
+        cube = Cube.from_stickers(cube.stickers, from_move=Move(face_ref, 1))
+        assert len(list(cube.successors(canonical))) == expected
+
+    def test_successors_are_not_canonical_by_default(self):
+        cube = Cube(*shuffled_cube_state).rotate_layer(FaceRef.B, 1)
+        cube = Cube.from_stickers(cube.stickers, from_move=Move(FaceRef.B, 1))
+        assert len(list(cube.successors())) == 15
+
+    def test_canonical_sequences_are_distinct(self):
+        """Every canonical sequence of up to 3 moves reaches a different state."""
+        cube = Cube(*shuffled_cube_state)
+        seen = {cube}
+        frontier = [cube]
+        for expected in (18, 243, 3240):
+            frontier = [
+                successor
+                for state in frontier
+                for successor in state.successors(canonical=True)
+            ]
+            assert len(frontier) == expected
+            seen.update(frontier)
+        assert len(seen) == 1 + 18 + 243 + 3240
+
+
+solved_facelets = "UUUUUUUUURRRRRRRRRFFFFFFFFFDDDDDDDDDLLLLLLLLLBBBBBBBBB"
+initial_colours = {
+    FaceRef.F: "O",
+    FaceRef.R: "G",
+    FaceRef.B: "R",
+    FaceRef.L: "B",
+    FaceRef.U: "W",
+    FaceRef.D: "Y",
+}
+
+
+class TestCubeEquality:
+    def test_equal_cubes_have_equal_hashes(self):
+        cube = Cube(*shuffled_cube_state)
+        other = Cube.from_stickers(tuple(cube.stickers), FaceRef.R, Move(FaceRef.U, 1))
+        assert cube == other
+        assert hash(cube) == hash(other)
+        assert len({cube, other}) == 1
+
+    def test_unequal_cubes(self):
+        cube = Cube(*shuffled_cube_state)
+        assert cube != cube.rotate_layer(FaceRef.F, 1)
+        assert cube != cube.stickers
+        assert cube != Cube(*initial_cube_state)
+
+    def test_state_str(self):
+        cube = Cube(*initial_cube_state)
+        assert cube.state_str == "".join(cube.stickers)
+        assert cube.state_str is cube.state_str
+
+    def test_pickle(self):
+        cube = Cube.from_stickers(
+            Cube(*shuffled_cube_state).stickers, FaceRef.B, Move(FaceRef.L, 3)
+        )
+        loaded = pickle.loads(pickle.dumps(cube))
+        assert loaded == cube
+        assert hash(loaded) == hash(cube)
+        assert loaded.universal_front_face == FaceRef.B
+        assert loaded.from_move == Move(FaceRef.L, 3)
+
+
+class TestSerialisation:
+    def test_from_facelets(self):
+        cube = Cube.from_facelets(solved_facelets, initial_colours)
+        assert cube == Cube(*initial_cube_state)
+        assert Cube.from_facelets(solved_facelets).is_solved
+
+    @pytest.mark.parametrize(
+        "face_ref, expected",
+        (
+            (FaceRef.U, "UUUUUUUUUBBBRRRRRRRRRFFFFFFDDDDDDDDDFFFLLLLLLLLLBBBBBB"),
+            (FaceRef.R, "UUFUUFUUFRRRRRRRRRFFDFFDFFDDDBDDBDDBLLLLLLLLLUBBUBBUBB"),
+        ),
+    )
+    def test_to_facelets(self, face_ref, expected):
+        cube = Cube(*initial_cube_state).rotate_layer(face_ref, 1)
+        assert cube.to_facelets() == expected
+        assert Cube.from_facelets(expected, initial_colours) == cube
+
+    @pytest.mark.parametrize(
+        "facelets", (solved_facelets[:-1], solved_facelets[:-1] + "X", "")
+    )
+    def test_invalid_facelets(self, facelets):
+        with pytest.raises(ValueError):
+            Cube.from_facelets(facelets)
+
+    def test_to_facelets_unknown_colour(self):
+        with pytest.raises(ValueError):
+            Cube(*shuffled_cube_state).to_facelets()
+
+    def test_bytes_round_trip(self):
+        cube = Cube(*initial_cube_state)
+        for move in MOVES[::4]:
+            cube = cube.rotate_layer(move.face_ref, move.steps)
+            data = cube.to_bytes()
+            assert len(data) == CUBE_BYTES
+            assert Cube.from_bytes(data) == cube
+
+    def test_invalid_bytes(self):
+        with pytest.raises(ValueError):
+            Cube(*shuffled_cube_state).to_bytes()
+        with pytest.raises(ValueError):
+            Cube.from_bytes(b"OGRBWY")
+        with pytest.raises(ValueError):
+            Cube.from_bytes(b"OGRBWY" + b"\xff" * 9)
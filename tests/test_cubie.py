@@ -0,0 +1,73 @@
+from py_rubiks.cube import FACE_ORDER, MOVES, Cube, CubeFace, FaceRef
+from py_rubiks.cubie import MOVE_CUBES, SOLVED_CUBIE, Corner, CubieCube, Edge
+
+import pytest
+
+
+centres = ("O", "G", "R", "B", "W", "Y")
+solved_cube = Cube(
+    *[CubeFace([[colour] * 3 for _ in range(3)]) for colour in centres]  # type: ignore
+)
+
+
+def scramble(cube, length=25):
+    for idx in range(length):
+        move = MOVES[(idx * 7 + length) % len(MOVES)]
+        cube = cube.rotate_layer(move.face_ref, move.steps)
+    return cube
+
+
+class TestCubieCube:
+    def test_solved_round_trip(self):
+        assert CubieCube.from_cube(solved_cube) == SOLVED_CUBIE
+        assert SOLVED_CUBIE.to_cube(centres) == solved_cube
+
+    @pytest.mark.parametrize("length", (1, 7, 25, 40))
+    def test_scrambled_round_trip(self, length):
+        cube = scramble(solved_cube, length)
+        cubie = CubieCube.from_cube(cube)
+        assert cubie.to_cube(centres) == cube
+
+    def test_up_move(self):
+        cubie = MOVE_CUBES[(FaceRef.U, 1)]
+        assert cubie.cp[Corner.URF] == Corner.UBR
+        assert cubie.ep[Edge.UF] == Edge.UR
+        assert cubie.co == (0,) * 8
+        assert cubie.eo == (0,) * 12
+
+    @pytest.mark.parametrize("face_ref", list(FaceRef))
+    def test_moves_match_facelet_moves(self, face_ref):
+        cube = scramble(solved_cube)
+        cubie = CubieCube.from_cube(cube)
+        for steps in range(1, 4):
+            expected = cube.rotate_layer(face_ref, steps)
+            assert cubie.rotate_layer(face_ref, steps).to_cube(centres) == expected
+
+    def test_inverse(self):
+        cubie = CubieCube.from_cube(scramble(solved_cube))
+        assert cubie.multiply(cubie.inverse()) == SOLVED_CUBIE
+        assert cubie.inverse().multiply(cubie) == SOLVED_CUBIE
+
+    def test_centres_identify_faces(self):
+        """The conversion is independent of the colour scheme."""
+        recoloured = Cube.from_stickers(
+            tuple(FACE_ORDER[idx // 9].name for idx in range(54))
+        )
+        assert CubieCube.from_cube(recoloured) == SOLVED_CUBIE
+
+    @pytest.mark.parametrize(
+        "swap",
+        ((0, 1), (45, 46), (2, 9)),
+        ids=("Front edge and corner", "Bottom corner and edge", "Twisted corner"),
+    )
+    def test_invalid_states(self, swap):
+        stickers = list(scramble(solved_cube).stickers)
+        first, second = swap
+        stickers[first], stickers[second] = stickers[second], stickers[first]
+        with pytest.raises(ValueError):
+            CubieCube.from_cube(Cube.from_stickers(tuple(stickers)))
+
+    def test_wildcards_are_invalid(self):
+        stickers = ("*",) + solved_cube.stickers[1:]
+        with pytest.raises(ValueError):
+            CubieCube.from_cube(Cube.from_stickers(stickers))
@@ -0,0 +1,76 @@
+from py_rubiks.cube import FACE_ORDER, MOVES, FaceRef, Move
+from tests.helpers import apply_moves, solved_cube
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from py_rubiks.frontier import (  # noqa: E402
+    decode,
+    encode,
+    expand,
+    state_keys,
+    unique_states,
+)
+
+
+colours = tuple(face_ref.name for face_ref in FACE_ORDER)
+
+
+scrambled_cube = apply_moves(
+    solved_cube, [Move(FaceRef.R, 1), Move(FaceRef.U, 2), Move(FaceRef.F, 3)]
+)
+
+
+class TestFrontier:
+    def test_encode_decode_round_trip(self):
+        cubes = [solved_cube, scrambled_cube]
+        states = encode(cubes)
+        assert states.shape == (2, 54)
+        assert states.dtype == np.uint8
+        assert decode(states, colours) == cubes
+
+    def test_encode_unknown_colour(self):
+        with pytest.raises(ValueError):
+            encode([solved_cube], colours[:5])
+
+    def test_encode_empty(self):
+        assert encode([]).shape == (0, 54)
+
+    def test_expand_matches_rotate_layer(self):
+        cubes = [solved_cube, scrambled_cube]
+        successors, move_ids, parents = expand(encode(cubes, colours))
+        assert successors.shape == (2 * len(MOVES), 54)
+        expected = [
+            cube.rotate_layer(move.face_ref, move.steps)
+            for cube in cubes
+            for move in MOVES
+        ]
+        assert decode(successors, colours) == expected
+        assert move_ids.tolist() == list(range(len(MOVES))) * 2
+        assert parents.tolist() == [0] * len(MOVES) + [1] * len(MOVES)
+
+    def test_state_keys(self):
+        states = encode([solved_cube, scrambled_cube, solved_cube], colours)
+        keys = state_keys(states)
+        assert keys[0] == keys[2]
+        assert keys[0] != keys[1]
+        assert keys[1].tobytes() == states[1].tobytes()
+
+    def test_breadth_first_levels(self):
+        """The number of new states at each depth matches the known counts."""
+        frontier = encode([solved_cube], colours)
+        seen = {key.tobytes() for key in state_keys(frontier)}
+        counts = []
+        for _ in range(3):
+            successors, _, _ = expand(frontier)
+            successors = successors[unique_states(successors)]
+            new = [
+                idx
+                for idx, key in enumerate(state_keys(successors))
+                if key.tobytes() not in seen
+            ]
+            frontier = successors[new]
+            seen.update(key.tobytes() for key in state_keys(frontier))
+            counts.append(len(frontier))
+        assert counts == [18, 243, 3240]
@@ -0,0 +1,84 @@
+from py_rubiks.cube import MOVES, Cube
+from py_rubiks.ida import (
+    SearchTimeout,
+    ida_star,
+    misplaced_stickers_heuristic,
+    orientation_heuristic,
+    zero_heuristic,
+)
+from tests.helpers import apply_moves, short_scramble, solved_cube
+
+import pytest
+
+
+class TestIDAStar:
+    def test_solved_start(self):
+        result = ida_star(solved_cube)
+        assert result.moves == []
+        assert [iteration.bound for iteration in result.iterations] == [0]
+
+    @pytest.mark.parametrize(
+        "make_heuristic",
+        (
+            lambda: zero_heuristic,
+            lambda: misplaced_stickers_heuristic,
+            orientation_heuristic,
+        ),
+        ids=("Zero", "Misplaced stickers", "Orientation"),
+    )
+    def test_finds_shortest_solution(self, make_heuristic):
+        # The orientation tables are built in the test, once the cache is set up
+        cube = apply_moves(solved_cube, short_scramble)
+        result = ida_star(cube, heuristic=make_heuristic())
+        assert len(result.moves) == len(short_scramble)
+        assert apply_moves(cube, result.moves).is_solved
+
+    def test_reports_each_iteration(self):
+        reported = []
+        cube = apply_moves(solved_cube, short_scramble)
+        result = ida_star(cube, on_iteration=reported.append)
+        assert reported == result.iterations
+        assert [iteration.bound for iteration in reported] == [0, 1, 2, 3]
+        assert result.nodes == sum(iteration.nodes for iteration in reported)
+
+    def test_better_heuristic_generates_fewer_nodes(self):
+        cube = apply_moves(solved_cube, short_scramble)
+        uninformed = ida_star(cube)
+        informed = ida_star(cube, heuristic=orientation_heuristic())
+        assert informed.nodes < uninformed.nodes
+
+    def test_custom_successors(self):
+        """The search works with any state type and move engine."""
+
+        def successors(stickers, last_move):
+            cube = Cube.from_stickers(stickers)
+            for move in MOVES:
+                if last_move is None or move.face_ref != last_move.face_ref:
+                    yield move, cube.rotate_layer(move.face_ref, move.steps).stickers
+
+        cube = apply_moves(solved_cube, short_scramble[:2])
+        result = ida_star(
+            cube.stickers,
+            successors=successors,
+            is_goal=lambda stickers: stickers == solved_cube.stickers,
+        )
+        assert len(result.moves) == 2
+        assert apply_moves(cube, result.moves).is_solved
+
+    def test_no_solution(self):
+        cube = apply_moves(solved_cube, short_scramble)
+        with pytest.raises(RuntimeError):
+            ida_star(cube, max_depth=2)
+
+    def test_nodes_per_second(self):
+        cube = apply_moves(solved_cube, short_scramble)
+        result = ida_star(cube)
+        elapsed = sum(iteration.elapsed for iteration in result.iterations)
+        assert result.elapsed == elapsed
+        assert result.nodes_per_second == pytest.approx(result.nodes / result.elapsed)
+
+    def test_timeout(self):
+        cube = apply_moves(solved_cube, short_scramble)
+        with pytest.raises(SearchTimeout) as exc_info:
+            ida_star(cube, timeout=0)
+        assert len(exc_info.value.iterations) == 1
@@ -0,0 +1,84 @@
+import random
+
+from py_rubiks.cube import FaceRef
+from py_rubiks.cubie import SOLVED_CUBIE
+from py_rubiks.last_layer import (
+    LAST_LAYER_ALGORITHMS,
+    CaseIndex,
+    build_case_index,
+    case_key,
+    get_case_index,
+    solve_last_layer,
+)
+from py_rubiks.notation import parse_moves
+from tests.helpers import apply_moves, solved_cube
+
+import pytest
+
+
+def last_layer_case(rng, cube=SOLVED_CUBIE):
+    for _ in range(rng.randint(1, 6)):
+        cube = apply_moves(cube, parse_moves(rng.choice(LAST_LAYER_ALGORITHMS)))
+        cube = cube.rotate_layer(FaceRef.U, rng.randint(0, 3))
+    return cube
+
+
+@pytest.fixture(scope="module")
+def index(cache_dir):
+    return get_case_index(cache_dir)
+
+
+class TestCaseKey:
+    def test_auf_normalised(self):
+        rng = random.Random(0)
+        for _ in range(20):
+            cubie = last_layer_case(rng)
+            key = case_key(cubie)
+            for before in range(4):
+                for after in range(4):
+                    turned = SOLVED_CUBIE.rotate_layer(FaceRef.U, before)
+                    turned = turned.multiply(cubie).rotate_layer(FaceRef.U, after)
+                    assert case_key(turned) == key
+
+    def test_first_two_layers_unsolved(self):
+        with pytest.raises(ValueError):
+            case_key(SOLVED_CUBIE.rotate_layer(FaceRef.R, 1))
+
+
+class TestCaseIndex:
+    def test_every_case(self, index):
+        # The 3915 one look last layer cases and the solved case
+        assert len(index) == 3916
+        assert len(list(index.items())) == 3916
+
+    def test_lookup_solves(self, index):
+        rng = random.Random(1)
+        for _ in range(200):
+            cubie = last_layer_case(rng)
+            assert apply_moves(cubie, index.lookup(cubie)) == SOLVED_CUBIE
+
+    def test_solved(self, index):
+        assert index.lookup(SOLVED_CUBIE) == []
+        assert index.lookup(SOLVED_CUBIE.rotate_layer(FaceRef.U, 1)) == parse_moves(
+            "U'"
+        )
+
+    def test_missing_case(self, index):
+        assert index.find(2 ** 31) is None
+
+    def test_solve_last_layer(self, cache_dir):
+        scramble = parse_moves("R U R' U R U2 R' U2 F R U R' U' F'")
+        cube = apply_moves(solved_cube, scramble)
+        assert apply_moves(cube, solve_last_layer(cube, cache_dir)).is_solved
+        with pytest.raises(ValueError):
+            solve_last_layer(solved_cube.rotate_layer(FaceRef.F, 1), cache_dir)
+
+    def test_rejects_other_files(self, tmp_path):
+        path = tmp_path / "last_layer.v1.lli"
+        path.write_bytes(b"stale")
+        with pytest.raises(ValueError):
+            CaseIndex(path)
+
+    def test_rejects_algorithms_that_break_the_first_two_layers(self, tmp_path):
+        with pytest.raises(ValueError):
+            build_case_index(tmp_path / "index.lli", ["R U R'"])
@@ -0,0 +1,123 @@
+import random
+
+from py_rubiks.cube import Cube, FaceRef
+from py_rubiks.matching import (
+    MAX_COLOURS,
+    WILDCARD,
+    ColourCodes,
+    CubePattern,
+    PatternIndex,
+)
+from tests.helpers import solved_cube
+
+import pytest
+
+
+def scrambled(rng, length=20):
+    cube = solved_cube
+    for _ in range(length):
+        cube = cube.rotate_layer(rng.choice(list(FaceRef)), rng.randint(1, 3))
+    return cube
+
+
+def with_wildcards(rng, cube, fraction):
+    return Cube.from_stickers(
+        tuple(
+            WILDCARD if rng.random() < fraction else sticker
+            for sticker in cube.stickers
+        )
+    )
+
+
+class TestCubePattern:
+    def test_agrees_with_fuzzy_match(self):
+        rng = random.Random(0)
+        for _ in range(200):
+            pattern = with_wildcards(rng, scrambled(rng, 2), rng.random())
+            cube = scrambled(rng, rng.randint(0, 3))
+            assert CubePattern.compile(pattern).matches(cube) == cube.fuzzy_match(
+                pattern
+            )
+
+    def test_state_wildcards(self):
+        rng = random.Random(1)
+        for _ in range(200):
+            pattern = with_wildcards(rng, scrambled(rng, 2), 0.5)
+            cube = with_wildcards(rng, scrambled(rng, 1), 0.5)
+            assert CubePattern.compile(pattern).matches(cube) == cube.fuzzy_match(
+                pattern
+            )
+
+    def test_all_wildcards(self):
+        pattern = CubePattern.compile(Cube.from_stickers((WILDCARD,) * 54))
+        assert pattern.care == 0
+        assert pattern.matches(scrambled(random.Random(2)))
+
+    def test_unknown_colours(self):
+        pattern = CubePattern.compile(solved_cube)
+        other = Cube.from_stickers(("X",) + solved_cube.stickers[1:])
+        assert not pattern.matches(other)
+        assert pattern.matches(solved_cube)
+
+    def test_multi_character_colours(self):
+        colours = {"F": "green", "R": "red", "B": "blue", "L": "orange"}
+        colours.update(U="white", D="yellow")
+        cube = Cube.from_stickers(
+            tuple(colours[sticker] for sticker in solved_cube.stickers)
+        )
+        pattern = Cube.from_stickers((WILDCARD,) * 45 + cube.stickers[45:])
+        compiled = CubePattern.compile(pattern)
+        assert compiled.matches(cube)
+        assert not compiled.matches(cube.rotate_layer(FaceRef.F, 1))
+
+    def test_too_many_colours(self):
+        codes = ColourCodes()
+        for idx in range(MAX_COLOURS):
+            codes.add(f"colour {idx}")
+        with pytest.raises(ValueError):
+            CubePattern.compile(solved_cube, codes)
+
+
+class TestPatternIndex:
+    def test_agrees_with_linear_scan(self):
+        rng = random.Random(3)
+        index = PatternIndex()
+        patterns = []
+        masks = [
+            tuple(rng.random() < 0.6 for _ in range(54)) for _ in range(4)
+        ]
+        for key in range(100):
+            mask = rng.choice(masks)
+            pattern = Cube.from_stickers(
+                tuple(
+                    WILDCARD if wild else sticker
+                    for wild, sticker in zip(mask, scrambled(rng, 1).stickers)
+                )
+            )
+            index.add(pattern, key)
+            patterns.append(pattern)
+        assert len(index) == 100
+
+        for _ in range(50):
+            cube = scrambled(rng, rng.randint(0, 2))
+            expected = [
+                key
+                for key, pattern in enumerate(patterns)
+                if cube.fuzzy_match(pattern)
+            ]
+            assert index.match(cube) == expected
+
+    def test_insertion_order(self):
+        index = PatternIndex()
+        index.add(Cube.from_stickers((WILDCARD,) * 54), "any")
+        index.add(solved_cube, "solved")
+        index.add(Cube.from_stickers(solved_cube.stickers[:9] + (WILDCARD,) * 45), "F")
+        assert index.match(solved_cube) == ["any", "solved", "F"]
+        assert index.match(solved_cube.rotate_layer(FaceRef.U, 1)) == ["any"]
+
+    def test_state_wildcards(self):
+        index = PatternIndex()
+        index.add(solved_cube, "solved")
+        index.add(solved_cube.rotate_layer(FaceRef.R, 1), "R")
+        partial = Cube.from_stickers(solved_cube.stickers[:45] + (WILDCARD,) * 9)
+        assert index.match(partial) == ["solved"]
@@ -0,0 +1,38 @@
+from py_rubiks.cube import MOVES, FaceRef, Move
+from py_rubiks.notation import format_moves, parse_moves
+
+import pytest
+
+
+class TestNotation:
+    @pytest.mark.parametrize(
+        "text, expected",
+        (
+            ("", []),
+            ("R", [Move(FaceRef.R, 1)]),
+            (
+                "R U R' U2",
+                [
+                    Move(FaceRef.R, 1),
+                    Move(FaceRef.U, 1),
+                    Move(FaceRef.R, 3),
+                    Move(FaceRef.U, 2),
+                ],
+            ),
+            ("F2'B'", [Move(FaceRef.F, 2), Move(FaceRef.B, 3)]),
+            ("L’ D2’", [Move(FaceRef.L, 3), Move(FaceRef.D, 2)]),
+            ("  L  D' \n", [Move(FaceRef.L, 1), Move(FaceRef.D, 3)]),
+        ),
+    )
+    def test_parse_moves(self, text, expected):
+        assert parse_moves(text) == expected
+
+    @pytest.mark.parametrize("text", ("X", "R3", "R U x", "R''", "r"))
+    def test_parse_invalid(self, text):
+        with pytest.raises(ValueError):
+            parse_moves(text)
+
+    def test_round_trip(self):
+        text = format_moves(MOVES)
+        assert text.startswith("F F2 F' R R2 R'")
+        assert parse_moves(text) == list(MOVES)
@@ -0,0 +1,46 @@
+from py_rubiks.cube import Cube
+from py_rubiks.ida import SearchTimeout, ida_star
+from py_rubiks.optimal import solve_optimal
+from py_rubiks.pattern_db import EdgePattern
+from tests.helpers import apply_moves, scramble, solved_cube
+
+import pytest
+
+
+# Small databases that build in a few seconds, the default ones take much longer
+patterns = (EdgePattern((0, 1, 2, 3)), EdgePattern((8, 9, 10, 11)))
+
+
+class TestSolveOptimal:
+    def test_solved(self, cache_dir):
+        result = solve_optimal(solved_cube, patterns, cache_dir=cache_dir, workers=1)
+        assert result.moves == []
+
+    def test_shortest_solution(self, cache_dir):
+        cube = apply_moves(solved_cube, scramble[:4])
+        result = solve_optimal(cube, patterns, cache_dir=cache_dir, workers=1)
+        assert len(result.moves) == len(ida_star(cube).moves)
+        assert apply_moves(cube, result.moves).is_solved
+
+    def test_fewer_nodes_than_uninformed_search(self, cache_dir):
+        cube = apply_moves(solved_cube, scramble[:4])
+        result = solve_optimal(cube, patterns, cache_dir=cache_dir, workers=1)
+        assert result.nodes < ida_star(cube).nodes
+
+    def test_patterns_need_not_cover_the_cube(self, cache_dir):
+        cube = apply_moves(solved_cube, scramble[:5])
+        result = solve_optimal(cube, patterns[:1], cache_dir=cache_dir, workers=1)
+        assert len(result.moves) == 5
+        assert apply_moves(cube, result.moves).is_solved
+
+    def test_timeout(self, cache_dir):
+        cube = apply_moves(solved_cube, scramble[:5])
+        with pytest.raises(SearchTimeout):
+            solve_optimal(cube, patterns, timeout=0, cache_dir=cache_dir, workers=1)
+
+    def test_invalid_cube(self, cache_dir):
+        stickers = list(apply_moves(solved_cube, scramble[:5]).stickers)
+        stickers[0], stickers[1] = stickers[1], stickers[0]
+        cube = Cube.from_stickers(tuple(stickers))
+        with pytest.raises(ValueError):
+            solve_optimal(cube, patterns, cache_dir=cache_dir)
@@ -0,0 +1,46 @@
+from py_rubiks.ida import SearchTimeout, ida_star, orientation_heuristic
+from py_rubiks.parallel import parallel_ida_star
+from tests.helpers import apply_moves, short_scramble, solved_cube
+
+import pytest
+
+
+class TestParallelIDAStar:
+    def test_solved_start(self):
+        result = parallel_ida_star(solved_cube, workers=2)
+        assert result.moves == []
+
+    @pytest.mark.parametrize("length", (1, 2, 3))
+    def test_finds_shortest_solution(self, length):
+        """Solutions above, at and below the split are all found."""
+        cube = apply_moves(solved_cube, short_scramble[:length])
+        result = parallel_ida_star(cube, workers=2, split_depth=2)
+        assert len(result.moves) == length
+        assert apply_moves(cube, result.moves).is_solved
+
+    def test_picklable_heuristic(self):
+        cube = apply_moves(solved_cube, short_scramble)
+        result = parallel_ida_star(cube, heuristic=orientation_heuristic(), workers=2)
+        assert len(result.moves) == len(short_scramble)
+
+    def test_iterations_match_sequential_search(self):
+        """Iterations without a solution visit exactly the same nodes."""
+        cube = apply_moves(solved_cube, short_scramble)
+        sequential = ida_star(cube)
+        parallel = parallel_ida_star(cube, workers=2)
+        assert [
+            (iteration.bound, iteration.nodes) for iteration in parallel.iterations[:-1]
+        ] == [
+            (iteration.bound, iteration.nodes)
+            for iteration in sequential.iterations[:-1]
+        ]
+
+    def test_no_solution(self):
+        cube = apply_moves(solved_cube, short_scramble)
+        with pytest.raises(RuntimeError):
+            parallel_ida_star(cube, max_depth=2, workers=2)
+
+    def test_timeout(self):
+        cube = apply_moves(solved_cube, short_scramble)
+        with pytest.raises(SearchTimeout):
+            parallel_ida_star(cube, workers=2, timeout=0)
@@ -0,0 +1,150 @@
+import random
+
+from py_rubiks.cube import Cube, FaceRef
+from py_rubiks.ida import SearchTimeout, ida_star
+from py_rubiks.matching import WILDCARD
+from py_rubiks.notation import parse_moves
+from py_rubiks.partial import (
+    PartialGoal,
+    build_pruning_table,
+    corners_oriented_goal,
+    cross_goal,
+    first_two_layers_goal,
+    first_two_layers_slots,
+    pairs_goal,
+    solve_first_two_layers,
+    solve_partial,
+)
+from tests.helpers import apply_moves, solved_cube
+
+import pytest
+
+
+def scrambled(rng, length):
+    cube = solved_cube
+    for _ in range(length):
+        cube = cube.rotate_layer(rng.choice(list(FaceRef)), rng.randint(1, 3))
+    return cube
+
+
+def shortest_length(cube, goal):
+    result = ida_star(
+        Cube.from_stickers(goal.recolour(cube.stickers)),
+        is_goal=lambda state: state.fuzzy_match(goal.pattern),
+    )
+    return len(result.moves)
+
+
+class TestGoals:
+    def test_cross(self):
+        goal = cross_goal(solved_cube)
+        assert goal.matches(solved_cube)
+        assert goal.matches(solved_cube.rotate_layer(FaceRef.U, 1))
+        assert not goal.matches(solved_cube.rotate_layer(FaceRef.F, 1))
+        assert sum(sticker != WILDCARD for sticker in goal.pattern.stickers) == 14
+
+    def test_first_two_layers(self):
+        goal = first_two_layers_goal(solved_cube)
+        assert goal.matches(apply_moves(solved_cube, parse_moves("R U R' U R U2 R' U")))
+        assert not goal.matches(solved_cube.rotate_layer(FaceRef.R, 1))
+
+    @pytest.mark.parametrize("face_ref", (FaceRef.D, FaceRef.F))
+    def test_all_pairs_are_the_first_two_layers(self, face_ref):
+        slots = first_two_layers_slots(face_ref)
+        assert len(slots) == 4
+        assert pairs_goal(solved_cube, slots, face_ref) == first_two_layers_goal(
+            solved_cube, face_ref
+        )
+
+    def test_pairs(self):
+        goal = pairs_goal(solved_cube, [(FaceRef.F, FaceRef.R)])
+        assert goal.matches(apply_moves(solved_cube, parse_moves("L U L'")))
+        assert not goal.matches(apply_moves(solved_cube, parse_moves("R U R'")))
+        assert pairs_goal(solved_cube, []) == cross_goal(solved_cube)
+
+    def test_corners_oriented(self):
+        goal = corners_oriented_goal(solved_cube)
+        assert goal.matches(apply_moves(solved_cube, parse_moves("R2 U F2 L2")))
+        assert not goal.matches(solved_cube.rotate_layer(FaceRef.R, 1))
+
+
+class TestSolvePartial:
+    @pytest.mark.parametrize(
+        "make_goal",
+        (cross_goal, corners_oriented_goal, first_two_layers_goal),
+        ids=("Cross", "CornersOriented", "FirstTwoLayers"),
+    )
+    def test_finds_shortest_solution(self, make_goal):
+        rng = random.Random(0)
+        for _ in range(5):
+            cube = scrambled(rng, 3)
+            goal = make_goal(cube)
+            result = solve_partial(cube, goal)
+            assert goal.matches(apply_moves(cube, result.moves))
+            assert len(result.moves) == shortest_length(cube, goal)
+
+    def test_scrambled_cross(self):
+        rng = random.Random(1)
+        for _ in range(3):
+            cube = scrambled(rng, 25)
+            goal = cross_goal(cube)
+            result = solve_partial(cube, goal)
+            assert len(result.moves) <= 8
+            assert goal.matches(apply_moves(cube, result.moves))
+
+    def test_pattern(self):
+        cube = apply_moves(solved_cube, parse_moves("R U F"))
+        result = solve_partial(cube, solved_cube)
+        assert apply_moves(cube, result.moves).is_solved
+        assert len(result.moves) == 3
+
+    def test_goal_reached(self):
+        goal = cross_goal(solved_cube)
+        cube = solved_cube.rotate_layer(FaceRef.U, 1)
+        assert solve_partial(cube, goal).moves == []
+
+    def test_ambiguous_goal(self):
+        goal = Cube.from_stickers((WILDCARD,) * 53 + ("D",))
+        pattern = list(solved_cube.stickers)
+        pattern[0:9] = ["D"] * 9  # Every front face piece has a second D sticker
+        with pytest.raises(ValueError):
+            solve_partial(solved_cube, Cube.from_stickers(tuple(pattern)))
+        assert solve_partial(solved_cube, goal).moves == []
+
+    def test_centres_must_match(self):
+        goal = PartialGoal(solved_cube)
+        recoloured = Cube.from_stickers(
+            tuple(
+                "X" if sticker == "F" else sticker for sticker in solved_cube.stickers
+            )
+        )
+        with pytest.raises(ValueError):
+            solve_partial(recoloured, goal)
+
+
+class TestSolveFirstTwoLayers:
+    @pytest.mark.parametrize("seed", range(2))
+    def test_scrambled(self, seed):
+        cube = scrambled(random.Random(seed), 25)
+        result = solve_first_two_layers(cube, timeout=60)
+        assert first_two_layers_goal(cube).matches(apply_moves(cube, result.moves))
+
+    def test_timeout(self):
+        cube = scrambled(random.Random(0), 25)
+        with pytest.raises(SearchTimeout):
+            solve_first_two_layers(cube, timeout=0)
+
+
+class TestBuildPruningTable:
+    def test_single_edge(self):
+        goal = cross_goal(solved_cube)
+        cube = solved_cube.rotate_layer(FaceRef.F, 2)
+        result = solve_partial(cube, goal)
+        assert len(result.moves) == 1
+
+        # One edge sticker can be at any of the 24 edge sticker positions
+        start = ((solved_cube.stickers.index("F", 0) + 7,),)
+        table = build_pruning_table(start, [frozenset(start[0])])
+        assert len(table) == 24
+        assert table[start] == 0
+        assert max(table.values()) == 3
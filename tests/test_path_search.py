@@ -0,0 +1,75 @@
+from py_rubiks.ida import SearchTimeout, ida_star, orientation_heuristic
+from py_rubiks.path_search import path_stack_search
+from tests.helpers import apply_moves, short_scramble, solved_cube
+
+import pytest
+
+
+class TestPathStackSearch:
+    def test_solved_start(self):
+        result = path_stack_search(solved_cube)
+        assert result.moves == []
+        assert result.tree is None
+
+    @pytest.mark.parametrize("informed", (False, True), ids=("Zero", "Orientation"))
+    def test_finds_shortest_solution(self, informed):
+        cube = apply_moves(solved_cube, short_scramble)
+        if informed:
+            heuristic = orientation_heuristic().estimate
+            result = path_stack_search(cube, heuristic=heuristic)
+        else:
+            result = path_stack_search(cube)
+        assert len(result.moves) == len(short_scramble)
+        assert apply_moves(cube, result.moves).is_solved
+
+    def test_matches_ida_star(self):
+        """The same nodes are generated in the same order as `ida_star`."""
+        cube = apply_moves(solved_cube, short_scramble)
+        expected = ida_star(cube)
+        result = path_stack_search(cube)
+        assert result.moves == expected.moves
+        assert [iteration.bound for iteration in result.iterations] == [0, 1, 2, 3]
+        assert [iteration.nodes for iteration in result.iterations] == [
+            iteration.nodes for iteration in expected.iterations
+        ]
+
+    def test_reports_each_iteration(self):
+        reported = []
+        cube = apply_moves(solved_cube, short_scramble)
+        result = path_stack_search(cube, on_iteration=reported.append)
+        assert reported == result.iterations
+
+    def test_no_solution(self):
+        cube = apply_moves(solved_cube, short_scramble)
+        with pytest.raises(RuntimeError):
+            path_stack_search(cube, max_depth=2)
+
+    def test_timeout(self):
+        cube = apply_moves(solved_cube, short_scramble)
+        with pytest.raises(SearchTimeout) as exc_info:
+            path_stack_search(cube, timeout=0)
+        assert exc_info.value.iterations[-1].nodes > 0
+
+    def test_tree(self):
+        cube = apply_moves(solved_cube, short_scramble[:2])
+        result = path_stack_search(cube, tree=True)
+        root = result.tree
+        assert root.cube == cube
+        assert root.visited
+        assert 0 < len(root.children) <= 18
+
+        # The last node added is the solved state, at the end of the solution path
+        node = root
+        while node.children:
+            node = node.children[-1]
+        assert node.cube.is_solved
+        assert [n.cube.from_move for n in reversed(node.backtrace())] == result.moves
+
+        # Every generated state is in the tree
+        count = 0
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            count += len(node.children)
+            stack.extend(node.children)
+        assert count == result.iterations[-1].nodes
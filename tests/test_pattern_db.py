@@ -0,0 +1,115 @@
+from collections import deque
+
+from py_rubiks.cube import MOVES
+from py_rubiks.cubie import MOVE_CUBES, SOLVED_CUBIE, Edge
+from py_rubiks.pattern_db import (
+    CORNERS,
+    EdgePattern,
+    Pattern,
+    PatternDatabase,
+    arrangement_from_rank,
+    arrangement_rank,
+    build_pattern_database,
+    get_pattern_database,
+)
+
+import pytest
+
+
+move_cubes = [MOVE_CUBES[(move.face_ref, move.steps)] for move in MOVES]
+pattern = EdgePattern((Edge.UR, Edge.FR, Edge.DB))
+
+
+def scrambled_cubie(length):
+    cubie = SOLVED_CUBIE
+    for idx in range(length):
+        cubie = cubie.multiply(move_cubes[(idx * 7 + 2) % len(move_cubes)])
+    return cubie
+
+
+def brute_force_distances(pattern):
+    distances = {pattern.index(SOLVED_CUBIE): 0}
+    frontier = deque([SOLVED_CUBIE])
+    while frontier:
+        cubie = frontier.popleft()
+        depth = distances[pattern.index(cubie)]
+        for move_cube in move_cubes:
+            successor = cubie.multiply(move_cube)
+            index = pattern.index(successor)
+            if index not in distances:
+                distances[index] = depth + 1
+                frontier.append(successor)
+    return distances
+
+
+class TestPatterns:
+    def test_arrangement_rank_round_trip(self):
+        ranks = set()
+        for rank in range(12 * 11 * 10):
+            positions = arrangement_from_rank(rank, 3, 12)
+            assert arrangement_rank(positions, 12) == rank
+            ranks.add(positions)
+        assert len(ranks) == 12 * 11 * 10
+
+    @pytest.mark.parametrize("length", (0, 1, 9))
+    def test_edge_successors_match_cubie_moves(self, tmp_path, length):
+        cubie = scrambled_cubie(length)
+        successors = pattern.successors(pattern.index(cubie), tmp_path)
+        assert successors == [
+            pattern.index(cubie.multiply(move_cube)) for move_cube in move_cubes
+        ]
+
+    def test_corner_successors_match_cubie_moves(self):
+        cubie = scrambled_cubie(9)
+        successors = CORNERS.successors(CORNERS.index(cubie), None)
+        assert successors == [
+            CORNERS.index(cubie.multiply(move_cube)) for move_cube in move_cubes
+        ]
+
+    def test_overrides_are_required(self):
+        class IndexOnly(Pattern):
+            name = "index_only"
+            size = 1
+
+            def index(self, cubie):
+                return 0
+
+        with pytest.raises(TypeError):
+            IndexOnly()
+
+
+class TestPatternDatabase:
+    @pytest.mark.parametrize("workers", (1, 2))
+    def test_distances_match_breadth_first_search(self, tmp_path, workers):
+        path = tmp_path / "test.pdb"
+        build_pattern_database(pattern, path, workers=workers, cache_dir=tmp_path)
+        database = PatternDatabase(pattern, path)
+        distances = brute_force_distances(pattern)
+        assert len(distances) == len(database) == pattern.size
+        assert all(database[index] == depth for index, depth in distances.items())
+        database.close()
+
+    def test_packed_to_four_bits(self, tmp_path):
+        path = tmp_path / "test.pdb"
+        build_pattern_database(pattern, path, workers=1, cache_dir=tmp_path)
+        assert path.stat().st_size == 64 + pattern.size // 2
+        assert not list(tmp_path.glob("*.build"))
+
+    def test_admissible(self, tmp_path):
+        database = get_pattern_database(pattern, tmp_path, workers=1)
+        for length in range(12):
+            assert database.distance(scrambled_cubie(length)) <= length
+
+    def test_cached(self, tmp_path):
+        database = get_pattern_database(pattern, tmp_path, workers=1)
+        path = database.path
+        modified = path.stat().st_mtime_ns
+        get_pattern_database.cache_clear()
+        reopened = get_pattern_database(pattern, tmp_path, workers=1)
+        assert reopened.path == path
+        assert path.stat().st_mtime_ns == modified
+
+    def test_rejects_other_patterns(self, tmp_path):
+        database = get_pattern_database(pattern, tmp_path, workers=1)
+        with pytest.raises(ValueError):
+            PatternDatabase(EdgePattern((Edge.UR, Edge.UF)), database.path)
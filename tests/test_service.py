@@ -0,0 +1,93 @@
+import asyncio
+import json
+
+from py_rubiks.batch import parse_scramble
+from py_rubiks.notation import parse_moves
+from py_rubiks.service import SolverService
+from tests.helpers import apply_moves
+
+import pytest
+
+
+class TestSolverService:
+    def test_solve(self):
+        async def solve():
+            async with SolverService(workers=2) as service:
+                results = await asyncio.gather(
+                    service.solve("R U R' U2"), service.solve("F2 B' L D")
+                )
+                return results, service.metrics()
+
+        results, metrics = asyncio.run(solve())
+        for text, result in zip(["R U R' U2", "F2 B' L D"], results):
+            assert apply_moves(parse_scramble(text), result.moves).is_solved
+        assert metrics["completed"] == 2
+        assert metrics["queue_depth"] == 0
+        assert 0 < metrics["latency_p50"] <= metrics["latency_max"]
+
+    def test_deadline(self):
+        async def solve():
+            async with SolverService(workers=1) as service:
+                with pytest.raises(TimeoutError):
+                    await service.solve("R", deadline=0)
+                return service.metrics()
+
+        assert asyncio.run(solve())["expired"] == 1
+
+    def test_queue_full_and_cancel(self):
+        """Without starting the service requests stay queued."""
+
+        async def solve():
+            service = SolverService(workers=1, max_queue=1)
+            queued = asyncio.create_task(service.solve("R"))
+            await asyncio.sleep(0)
+            with pytest.raises(asyncio.QueueFull):
+                await service.solve("U")
+            queued.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await queued
+            return service.metrics()
+
+        metrics = asyncio.run(solve())
+        assert metrics["rejected"] == 1
+        assert metrics["cancelled"] == 1
+
+    def test_line_protocol(self):
+        async def session():
+            async with SolverService(workers=1) as service:
+                server = await service.serve()
+                port = server.sockets[0].getsockname()[1]
+                reader, writer = await asyncio.open_connection("127.0.0.1", port)
+                requests = [
+                    {"id": "a", "scramble": "R U"},
+                    {"id": "b", "scramble": "R X"},
+                    "not json",
+                    {"id": "x", "scramble": 123},
+                    {"id": "y", "scramble": "R", "deadline": "x"},
+                    {"id": "z", "scramble": "R", "max_length": True},
+                    {"id": "w"},
+                    {"scramble": "F"},
+                    {"scramble": "U"},
+                ]
+                for request in requests:
+                    writer.write(json.dumps(request).encode() + b"\n")
+                responses = [json.loads(await reader.readline()) for _ in requests]
+                writer.write(b'{"op": "metrics"}\n')
+                metrics = json.loads(await reader.readline())
+                writer.close()
+                server.close()
+                await server.wait_closed()
+                return responses, metrics
+
+        responses, metrics = asyncio.run(session())
+        by_id = {response["id"]: response for response in responses if "id" in response}
+        solution = parse_moves(by_id["a"]["solution"])
+        assert apply_moves(parse_scramble("R U"), solution).is_solved
+        assert "error" in by_id["b"]
+        for request_id in "xyzw":
+            assert by_id[request_id] == {"id": request_id, "error": "Invalid request"}
+        # Requests without an id are not duplicates of each other
+        anonymous = [response for response in responses if "id" not in response]
+        assert {"error": "Invalid request"} in anonymous
+        assert sum("solution" in response for response in anonymous) == 2
+        assert metrics["completed"] == 4
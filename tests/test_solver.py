@@ -0,0 +1,44 @@
+import random
+
+from py_rubiks.cube import Cube
+from py_rubiks.solver import solve
+from tests.helpers import apply_moves, random_moves, solved_cube
+
+import pytest
+
+
+def scramble(seed, length=30):
+    return apply_moves(solved_cube, random_moves(random.Random(seed), length))
+
+
+class TestSolve:
+    def test_solved_cube(self):
+        assert solve(solved_cube) == []
+
+    @pytest.mark.parametrize("length", (1, 2, 5))
+    def test_short_scrambles(self, length):
+        cube = scramble(3, length)
+        solution = solve(cube, max_length=length, timeout=10)
+        assert apply_moves(cube, solution) == solved_cube
+        assert len(solution) <= length
+
+    @pytest.mark.parametrize("seed", range(4))
+    def test_random_states(self, seed):
+        cube = scramble(seed)
+        solution = solve(cube, max_length=22, timeout=10)
+        assert apply_moves(cube, solution) == solved_cube
+        assert len(solution) <= 22
+
+    def test_colour_scheme_is_taken_from_centres(self):
+        colours = dict(zip("FRBLUD", "OGRBWY"))
+        cube = Cube.from_stickers(
+            tuple(colours[sticker] for sticker in scramble(7).stickers)
+        )
+        solved = apply_moves(cube, solve(cube))
+        assert solved.stickers == tuple(colour for colour in "OGRBWY" for _ in range(9))
+
+    def test_unsolvable_state(self):
+        stickers = list(solved_cube.stickers)
+        stickers[1], stickers[37] = stickers[37], stickers[1]  # Flip a single edge
+        with pytest.raises(ValueError):
+            solve(Cube.from_stickers(tuple(stickers)))
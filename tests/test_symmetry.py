@@ -0,0 +1,88 @@
+from py_rubiks.cube import FACE_ORDER, MOVES, Cube, FaceRef, compose
+from py_rubiks.symmetry import (
+    SYMMETRIES,
+    canonical_key,
+    face_codes,
+    symmetric_keys,
+)
+from tests.helpers import apply_moves, short_scramble, solved_cube
+
+import pytest
+
+
+scrambled_cube = apply_moves(solved_cube, short_scramble)
+
+
+class TestSymmetries:
+    def test_count(self):
+        assert len(SYMMETRIES) == 48
+        assert len({symmetry.permutation for symmetry in SYMMETRIES}) == 48
+        assert sum(symmetry.is_reflection for symmetry in SYMMETRIES) == 24
+
+    def test_identity_first(self):
+        identity = SYMMETRIES[0]
+        assert identity.permutation == tuple(range(54))
+        assert not identity.is_reflection
+
+    def test_closed_under_composition(self):
+        permutations = {symmetry.permutation for symmetry in SYMMETRIES}
+        for first in SYMMETRIES:
+            for second in SYMMETRIES:
+                assert compose(first.permutation, second.permutation) in permutations
+
+    def test_solved_is_fixed(self):
+        for symmetry in SYMMETRIES:
+            assert symmetry.conjugate(solved_cube) == solved_cube
+
+    @pytest.mark.parametrize("symmetry", SYMMETRIES)
+    def test_conjugate_commutes_with_moves(self, symmetry):
+        """Moving then conjugating matches conjugating then making the moved move."""
+        conjugated = symmetry.conjugate(scrambled_cube)
+        for move in MOVES:
+            moved = scrambled_cube.rotate_layer(move.face_ref, move.steps)
+            conjugated_move = symmetry.conjugate_move(move)
+            assert symmetry.conjugate(moved) == conjugated.rotate_layer(
+                conjugated_move.face_ref, conjugated_move.steps
+            )
+
+
+class TestCanonicalKey:
+    def test_invariant_under_symmetry(self):
+        key = canonical_key(scrambled_cube)
+        for symmetry in SYMMETRIES:
+            assert canonical_key(symmetry.conjugate(scrambled_cube)) == key
+
+    def test_is_one_of_the_symmetric_keys(self):
+        keys = symmetric_keys(scrambled_cube)
+        assert keys[0] == face_codes(scrambled_cube)
+        assert canonical_key(scrambled_cube) == min(keys)
+
+    def test_independent_of_colours(self):
+        recoloured = Cube.from_stickers(
+            tuple(
+                str(FACE_ORDER.index(FaceRef[sticker]))
+                for sticker in scrambled_cube.stickers
+            )
+        )
+        assert canonical_key(recoloured) == canonical_key(scrambled_cube)
+
+    def test_classes_by_depth(self):
+        """The number of symmetry classes at each distance matches the known counts."""
+        seen = {solved_cube}
+        frontier = [solved_cube]
+        counts = []
+        for _ in range(3):
+            frontier = [
+                successor
+                for state in frontier
+                for successor in state.successors()
+                if successor not in seen
+            ]
+            frontier = list({cube.stickers: cube for cube in frontier}.values())
+            seen.update(frontier)
+            counts.append(len({canonical_key(cube) for cube in frontier}))
+        assert counts == [2, 9, 75]
+
+    def test_wildcards(self):
+        with pytest.raises(ValueError):
+            face_codes(Cube.from_stickers(("*",) + solved_cube.stickers[1:]))
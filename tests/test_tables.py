@@ -0,0 +1,84 @@
+from array import array
+
+from py_rubiks.cube import MOVES
+from py_rubiks.cubie import SOLVED_CUBIE, CubieCube
+from py_rubiks.tables import (
+    CACHE_MAGIC,
+    PHASE_2_MOVES,
+    get_move_tables,
+    load_or_build,
+    read_tables,
+    write_tables,
+)
+
+import pytest
+
+
+def scrambled_cubie(length=30):
+    cubie = SOLVED_CUBIE
+    for idx in range(length):
+        move = MOVES[(idx * 5 + 3) % len(MOVES)]
+        cubie = cubie.rotate_layer(move.face_ref, move.steps)
+    return cubie
+
+
+class TestMoveTables:
+    @pytest.mark.parametrize("coord", ("twist", "flip", "slice_sorted", "corners"))
+    def test_tables_match_cubie_moves(self, coord):
+        table = getattr(get_move_tables(), coord)
+        cubie = scrambled_cubie()
+        for move_idx, move in enumerate(MOVES):
+            moved = cubie.rotate_layer(move.face_ref, move.steps)
+            assert table[18 * getattr(cubie, coord) + move_idx] == getattr(moved, coord)
+
+    def test_ud_edges_table_matches_phase_2_moves(self):
+        table = get_move_tables().ud_edges
+        cubie = SOLVED_CUBIE
+        for idx in range(20):
+            move_idx = PHASE_2_MOVES[(idx * 3 + 1) % len(PHASE_2_MOVES)]
+            move = MOVES[move_idx]
+            moved = cubie.rotate_layer(move.face_ref, move.steps)
+            assert table[18 * cubie.ud_edges + move_idx] == moved.ud_edges
+            cubie = moved
+
+    def test_ud_edges_requires_middle_layer_edges(self):
+        with pytest.raises(ValueError):
+            scrambled_cubie().ud_edges
+
+    @pytest.mark.parametrize(
+        "coord, size",
+        (("twist", 2187), ("flip", 2048), ("slice_sorted", 11880), ("corners", 40320)),
+    )
+    def test_coordinate_round_trip(self, coord, size):
+        from_coord = getattr(CubieCube, f"from_{coord}")
+        for value in range(0, size, 7):
+            assert getattr(from_coord(value), coord) == value
+
+
+class TestCache:
+    def test_round_trip(self, tmp_path):
+        tables = {"small": array("B", [1, 2, 3]), "wide": array("H", [1, 65535])}
+        path = tmp_path / "tables.bin"
+        write_tables(path, tables)
+        assert path.read_bytes().startswith(CACHE_MAGIC)
+        assert read_tables(path) == tables
+
+    def test_builds_once(self, tmp_path):
+        calls = []
+
+        def builder():
+            calls.append(1)
+            return {"table": array("H", [7])}
+
+        first = load_or_build("test.bin", ["table"], builder, tmp_path)
+        second = load_or_build("test.bin", ["table"], builder, tmp_path)
+        assert first == second == {"table": array("H", [7])}
+        assert len(calls) == 1
+
+    def test_rebuilds_stale_cache(self, tmp_path):
+        (tmp_path / "test.bin").write_bytes(b"not a cache file")
+        tables = load_or_build(
+            "test.bin", ["table"], lambda: {"table": array("H", [7])}, tmp_path
+        )
+        assert tables == {"table": array("H", [7])}
+        assert read_tables(tmp_path / "test.bin") == tables
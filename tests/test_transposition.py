@@ -0,0 +1,100 @@
+from py_rubiks.cube import Cube, FaceRef, Move
+from py_rubiks.ida import ida_star
+from py_rubiks.transposition import (
+    BUCKET_SIZE,
+    SLOT_BYTES,
+    Replacement,
+    TranspositionTable,
+)
+from tests.helpers import apply_moves, solved_cube
+
+import pytest
+
+
+def all_successors(cube, last_move):
+    """Every move except turning the same face, so many paths reach each state."""
+    cube = Cube.from_stickers(cube.stickers, from_move=last_move)
+    for successor in cube.successors(canonical=False):
+        yield successor.from_move, successor
+
+
+scramble = [Move(FaceRef.R, 1), Move(FaceRef.L, 1), Move(FaceRef.U, 2)]
+
+
+class TestTranspositionTable:
+    def test_skips_deeper_visits(self):
+        table = TranspositionTable(1 << 12)
+        assert table.visit(42, 3)
+        assert not table.visit(42, 3)
+        assert not table.visit(42, 5)
+        assert table.hits == 2
+
+    def test_revisits_shallower(self):
+        table = TranspositionTable(1 << 12)
+        assert table.visit(42, 5)
+        assert table.visit(42, 3)
+        assert not table.visit(42, 4)
+
+    def test_new_generation_forgets(self):
+        table = TranspositionTable(1 << 12)
+        table.visit(42, 3)
+        table.new_generation()
+        assert table.visit(42, 3)
+
+    def test_many_generations(self):
+        table = TranspositionTable(1 << 12)
+        for _ in range(600):
+            table.new_generation()
+            assert table.visit(42, 3)
+            assert not table.visit(42, 3)
+
+    def test_large_keys(self):
+        table = TranspositionTable(1 << 12)
+        assert table.visit(1 << 70, 1)
+        assert table.visit(1 << 69, 1)
+        assert not table.visit(1 << 70, 1)
+
+    def test_fixed_size(self):
+        table = TranspositionTable(1 << 12)
+        assert table.nbytes <= 1 << 12
+        for key in range(10000):
+            table.visit(key, 5)
+        assert table.nbytes <= 1 << 12
+        assert table.evictions > 0
+
+    def test_depth_replacement_keeps_shallow_entries(self):
+        table = TranspositionTable(SLOT_BYTES * BUCKET_SIZE)
+        for key in range(BUCKET_SIZE):
+            table.visit(key, 2)
+        assert table.visit(100, 7)  # Not stored, the bucket is shallower
+        assert table.evictions == 0
+        assert all(not table.visit(key, 2) for key in range(BUCKET_SIZE))
+        assert table.visit(101, 1)
+        assert table.evictions == 1
+
+    def test_clock_replacement(self):
+        table = TranspositionTable(SLOT_BYTES * BUCKET_SIZE, Replacement.CLOCK)
+        for key in range(BUCKET_SIZE):
+            table.visit(key, 2)
+        assert table.visit(100, 7)
+        assert table.evictions == 1
+        assert not table.visit(100, 7)
+
+
+class TestIDAStarWithTranspositions:
+    @pytest.mark.parametrize("replacement", list(Replacement))
+    def test_finds_shortest_solution(self, replacement):
+        cube = apply_moves(solved_cube, scramble)
+        table = TranspositionTable(1 << 12, replacement)
+        result = ida_star(cube, transpositions=table)
+        assert len(result.moves) == len(scramble)
+        assert apply_moves(cube, result.moves).is_solved
+
+    def test_prunes_transpositions(self):
+        cube = apply_moves(solved_cube, scramble)
+        plain = ida_star(cube, successors=all_successors)
+        table = TranspositionTable(1 << 20)
+        pruned = ida_star(cube, successors=all_successors, transpositions=table)
+        assert len(pruned.moves) == len(plain.moves)
+        assert pruned.nodes < plain.nodes
+        assert table.hits > 0
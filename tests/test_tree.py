@@ -79,3 +79,92 @@ class TestNode:
 
         was_deleted.assert_called_once_with("child deleted")
         assert len(parent.children) == 0
+
+    def test_deep_path_does_not_recurse(self):
+        root = Node(Mock())
+        node = root
+        for _ in range(5000):
+            child = Node(Mock())
+            node.add(child)
+            node = child
+        assert node.depth == 5000
+        assert len(node.backtrace()) == 5000
+
+    def test_add_subtree_sets_depths(self):
+        root = Node(Mock())
+        child = Node(Mock())
+        grandchild = Node(Mock())
+        child.add(grandchild)
+        assert grandchild.depth == 1
+
+        root.add(child)
+        assert child.depth == 1
+        assert grandchild.depth == 2
+
+    def test_is_fully_visited(self):
+        root = Node(Mock())
+        first, second = Node(Mock()), Node(Mock())
+        root.add(first)
+        root.add(second)
+        grandchild = Node(Mock())
+        first.add(grandchild)
+
+        for node in (root, first, grandchild):
+            node.visited = True
+        assert grandchild.is_fully_visited
+        assert first.is_fully_visited
+        assert not root.is_fully_visited
+        assert first.highest_fully_visited_node() is first
+
+        second.visited = True
+        assert root.is_fully_visited
+        assert grandchild.highest_fully_visited_node() == root
+
+        # Adding an unvisited node makes its ancestors unvisited again
+        late = Node(Mock())
+        second.add(late)
+        assert not second.is_fully_visited
+        assert not root.is_fully_visited
+        assert grandchild.highest_fully_visited_node() == first
+
+        late.delete()
+        assert root.is_fully_visited
+
+    def test_highest_fully_visited_node_unvisited_root(self):
+        root = Node(Mock())
+        assert root.highest_fully_visited_node() is None
+        root.visited = True
+        assert root.highest_fully_visited_node() is root
+
+    def test_assigning_children_updates_counts(self):
+        root = Node(Mock())
+        root.visited = True
+        child = Node(Mock())
+        root.add(child)
+        assert not root.is_fully_visited
+
+        root.children = []
+        assert root.is_fully_visited
+
+        root.children = [child]
+        assert child.parent == root
+        assert not root.is_fully_visited
+
+    def test_prune(self):
+        root = Node(Mock())
+        branch = Node(Mock())
+        root.add(branch)
+        first, second = Node(Mock()), Node(Mock())
+        branch.add(first)
+        branch.add(second)
+        leaf = Node(Mock())
+        first.add(leaf)
+        for node in (root, branch, first, leaf):
+            node.visited = True
+
+        leaf.prune()
+        assert branch.children == [second]
+        assert not branch.is_fully_visited
+
+        second.visited = True
+        assert root.is_fully_visited
@@ -0,0 +1,92 @@
+import random
+
+from py_rubiks.cube import Cube
+from py_rubiks.cubie import N_FLIP, N_TWIST, CubieCube
+from py_rubiks.visited import (
+    N_EDGE_PERMS,
+    N_STATE_KEYS,
+    VisitedSet,
+    cube_from_key,
+    state_key,
+)
+from tests.helpers import apply_moves, random_moves, solved_cube
+
+import pytest
+
+
+centres = solved_cube.stickers[4::9]
+
+
+def scramble(length):
+    return apply_moves(solved_cube, random_moves(random.Random(length), length))
+
+
+class TestStateKey:
+    def test_solved(self):
+        assert state_key(solved_cube) == 0
+
+    @pytest.mark.parametrize("length", (1, 7, 25))
+    def test_round_trip(self, length):
+        cube = scramble(length)
+        key = state_key(cube)
+        assert 0 <= key < N_STATE_KEYS
+        assert cube_from_key(key, centres) == cube
+
+    def test_matches_cubie_coordinates(self):
+        cube = scramble(25)
+        cubie = CubieCube.from_cube(cube)
+        key = state_key(cube)
+        assert key // (N_FLIP * N_EDGE_PERMS) == cubie.corners * N_TWIST + cubie.twist
+        assert key % N_FLIP == cubie.flip
+
+    def test_distinct(self):
+        cubes = {cube for cube in solved_cube.successors()}
+        cubes.update(
+            successor for cube in list(cubes) for successor in cube.successors()
+        )
+        assert len({state_key(cube) for cube in cubes}) == len(cubes)
+
+    @pytest.mark.parametrize(
+        "swap", ((0, 1), (45, 46), (2, 9)), ids=("Edge", "Corner", "Twist")
+    )
+    def test_invalid(self, swap):
+        stickers = list(scramble(25).stickers)
+        first, second = swap
+        stickers[first], stickers[second] = stickers[second], stickers[first]
+        with pytest.raises(ValueError):
+            state_key(Cube.from_stickers(tuple(stickers)))
+
+
+class TestVisitedSet:
+    def test_add_and_contains(self):
+        visited = VisitedSet()
+        assert visited.add(5)
+        assert not visited.add(5)
+        assert 5 in visited
+        assert 6 not in visited
+        assert "5" not in visited
+        assert len(visited) == 1
+
+    def test_large_keys(self):
+        keys = [N_STATE_KEYS - 1, 1 << 64, (1 << 64) - 1, 0]
+        visited = VisitedSet(keys)
+        assert all(key in visited for key in keys)
+        assert (1 << 65) not in visited
+        assert sorted(visited) == sorted(keys)
+
+    def test_out_of_range(self):
+        with pytest.raises(ValueError):
+            VisitedSet().add(-1)
+        with pytest.raises(ValueError):
+            VisitedSet().add(0xFF << 64)
+
+    def test_grows(self):
+        generator = random.Random(0)
+        keys = {generator.randrange(N_STATE_KEYS) for _ in range(5000)}
+        visited = VisitedSet(capacity=16)
+        for key in keys:
+            assert visited.add(key)
+        assert len(visited) == len(keys)
+        assert set(visited) == keys
+        assert all(key in visited for key in keys)
+        assert visited.nbytes <= 9 * 4 * len(keys)